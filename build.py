@@ -15,6 +15,10 @@ from pathlib import Path
 class UVMBuilder:
     """Сборщик проекта УВМ"""
 
+    # Модули, необходимые для запуска ассемблера и интерпретатора
+    RUNTIME_FILES = ['uvm_asm.py', 'uvm_interp.py', 'uvm_analysis.py', 'uvm_parallel.py',
+                     'uvm_format.py', 'uvm_link.py', 'uvm_disasm.py']
+
     def __init__(self):
         self.project_dir = Path(__file__).parent
         self.build_dir = self.project_dir / "build"
@@ -35,9 +39,7 @@ class UVMBuilder:
         """Копирование исходных файлов"""
         print("Копирование исходных файлов...")
 
-        source_files = [
-            'uvm_asm.py',
-            'uvm_interp.py',
+        source_files = self.RUNTIME_FILES + [
             'requirements.txt',
             'README.md',
             'LICENSE'
@@ -87,7 +89,7 @@ MIT License
         windows_dir.mkdir(exist_ok=True)
 
         try:
-            for file in ['uvm_asm.py', 'uvm_interp.py']:
+            for file in self.RUNTIME_FILES:
                 src = self.project_dir / file
                 if src.exists():
                     shutil.copy2(src, windows_dir / file)
@@ -123,7 +125,7 @@ pause
         linux_dir.mkdir(exist_ok=True)
 
         try:
-            for file in ['uvm_asm.py', 'uvm_interp.py']:
+            for file in self.RUNTIME_FILES:
                 src = self.project_dir / file
                 if src.exists():
                     shutil.copy2(src, linux_dir / file)
@@ -171,7 +173,7 @@ python3 uvm_asm.py --help
             with open(web_dir / "uvm_web.html", 'w', encoding='utf-8') as f:
                 f.write(html_content)
 
-            for file in ['uvm_asm.py', 'uvm_interp.py']:
+            for file in self.RUNTIME_FILES:
                 src = self.project_dir / file
                 if src.exists():
                     shutil.copy2(src, web_dir / file)
@@ -313,6 +313,572 @@ class TestUVMAssemblerStage2(unittest.TestCase):
         
         print("✓ Кодирование нескольких команд работает")
 
+class TestUVMAssemblerDirectives(unittest.TestCase):
+    """Тесты директив повторения repeat/range"""
+    
+    def setUp(self):
+        self.assembler = UVMAssembler()
+        if not hasattr(self.assembler, 'iter_intermediate'):
+            self.skipTest("Директивы не поддерживаются")
+    
+    def test_repeat_directive(self):
+        """Тест директивы repeat с переменной в операнде"""
+        program = [
+            {"repeat": 3, "var": "i", "body": [
+                {"opcode": "LOAD_CONST", "operand": "500 + i"},
+                {"opcode": "SQRT", "operand": "600 + 2 * i"}
+            ]},
+            {"opcode": "STORE_MEM", "operand": 700}
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        
+        self.assertEqual([(cmd.opcode, cmd.operand) for cmd in intermediate], [
+            (10, 500), (2, 600), (10, 501), (2, 602), (10, 502), (2, 604), (14, 700)
+        ])
+        print("✓ Директива repeat работает")
+    
+    def test_nested_range_directive(self):
+        """Тест вложенных директив range"""
+        program = [
+            {"range": [0, 4, 2], "var": "row", "body": [
+                {"range": [2], "var": "col", "body": [
+                    {"opcode": "STORE_MEM", "operand": "100 + row * 10 + col"}
+                ]}
+            ]}
+        ]
+        operands = [cmd.operand for cmd in self.assembler.iter_intermediate(program)]
+        self.assertEqual(operands, [100, 101, 120, 121])
+        print("✓ Вложенные директивы range работают")
+    
+    def test_invalid_operand_expression(self):
+        """Тест отказа для недопустимых выражений"""
+        for operand in ["__import__('os')", "j + 1", "i +", "1 // 0", "i % 0"]:
+            with self.subTest(operand=operand):
+                program = [{"repeat": 1, "body": [{"opcode": "LOAD_CONST", "operand": operand}]}]
+                with self.assertRaises(ValueError):
+                    self.assembler.translate_to_intermediate(program)
+        # Длина цикла больше sys.maxsize (без ограничения числа команд)
+        with self.assertRaises(ValueError):
+            self.assembler.translate_to_intermediate(
+                [{"range": [0, 10 ** 30, 1], "body": [{"opcode": "LOAD_CONST", "operand": 1}]}])
+        print("✓ Недопустимые выражения отклоняются")
+    
+    def test_max_commands(self):
+        """Тест ограничения числа команд после разворачивания директив"""
+        assembler = UVMAssembler(max_commands=100)
+        body = [{"opcode": "LOAD_CONST", "operand": "i"}]
+        self.assertEqual(len(assembler.translate_to_intermediate(
+            [{"repeat": 100, "body": body}])), 100)
+        for program in ([{"repeat": 101, "body": body}],
+                        [{"repeat": 10 ** 9, "body": []}],
+                        [{"repeat": 10 ** 6, "body": [{"repeat": 10 ** 6, "body": []}]}],
+                        [{"repeat": 60, "body": body}, {"range": [0, 60], "body": body}],
+                        [{"repeat": 10 ** 30, "body": body}]):
+            with self.subTest(program=program):
+                with self.assertRaises(ValueError):
+                    assembler.translate_to_intermediate(program)
+        print("✓ Ограничение числа развернутых команд работает")
+    
+    def test_streaming_binary(self):
+        """Тест потокового кодирования развернутой программы"""
+        program = [{"repeat": 5000, "var": "i", "body": [
+            {"opcode": "LOAD_CONST", "operand": "i % 4096"},
+            {"opcode": "SQRT", "operand": "i % 4096"}
+        ]}]
+        
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            temp_file = f.name
+        try:
+            size = self.assembler.encode_to_binary(
+                self.assembler.iter_intermediate(program), temp_file)
+            self.assertEqual(size, 30000)
+            with open(temp_file, 'rb') as f:
+                data = f.read()
+            self.assertEqual(data[-6:], bytes([0xA3, 0x87, 0x00, 0x23, 0x87, 0x00]))
+            print("✓ Потоковое кодирование работает")
+        finally:
+            os.unlink(temp_file)
+    
+    def test_vector_count_encoding(self):
+        """Тест кодирования длины векторной команды в третьем байте"""
+        program = [
+            {"opcode": "SQRT", "operand": 600, "count": 5},
+            {"opcode": "SQRT", "operand": 600, "count": "n * 2"}
+        ]
+        intermediate = self.assembler.translate_to_intermediate(
+            [{"range": [1, 2], "var": "n", "body": program}])
+        
+        self.assertEqual(self.assembler.encode_command(intermediate[0]), bytes([0x22, 0x58, 0x05]))
+        self.assertEqual(intermediate[1].count, 2)
+        
+        for bad in ({"opcode": "STORE_MEM", "operand": 1, "count": 2},
+                    {"opcode": "SQRT", "operand": 1, "count": 256}):
+            with self.subTest(command=bad):
+                with self.assertRaises(ValueError):
+                    self.assembler.translate_to_intermediate([bad])
+        print("✓ Кодирование векторной SQRT работает")
+    
+    def test_block_commands_encoding(self):
+        """Тест кодирования блочных команд BLOCK_COPY/BLOCK_FILL"""
+        program = [
+            {"opcode": "BLOCK_COPY", "operand": 2000, "count": 10},
+            {"opcode": "BLOCK_FILL", "operand": 1000, "count": 255}
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        
+        # BLOCK_COPY: A=4, B=2000 (0x7D0), N=10
+        self.assertEqual(self.assembler.encode_command(intermediate[0]), bytes([0x47, 0xD0, 0x0A]))
+        # BLOCK_FILL: A=5, B=1000 (0x3E8), N=255
+        self.assertEqual(self.assembler.encode_command(intermediate[1]), bytes([0x53, 0xE8, 0xFF]))
+        print("✓ Кодирование блочных команд работает")
+    
+    def test_labels_and_jumps(self):
+        """Тест меток и команд перехода"""
+        program = [
+            {"label": "start", "opcode": "LOAD_CONST", "operand": 0},
+            {"repeat": 3, "body": [{"opcode": "STORE_MEM", "operand": "600 + i"}]},
+            {"opcode": "JUMP_ZERO", "operand": "end"},
+            {"opcode": "JUMP", "operand": "start + 1"},
+            {"label": "end"}
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        
+        self.assertEqual([(cmd.opcode, cmd.operand) for cmd in intermediate][-2:],
+                         [(7, 6), (6, 1)])
+        self.assertEqual(self.assembler.encode_command(intermediate[4]), bytes([0x70, 0x06, 0x00]))
+        
+        duplicate = [{"label": "x"}, {"repeat": 2, "body": [{"label": "x"}]}]
+        with self.assertRaises(ValueError):
+            self.assembler.translate_to_intermediate(duplicate)
+        print("✓ Метки и переходы работают")
+    
+    def test_extended_format_switch(self):
+        """Тест перехода в расширенный формат при операнде больше 12 бит"""
+        from uvm_format import UVMBinaryFormat, MAGIC
+        
+        program = [
+            {"opcode": "LOAD_CONST", "operand": 520},
+            {"opcode": "STORE_MEM", "operand": 40000},
+            {"opcode": "SQRT", "operand": 70000, "count": 3}
+        ]
+        
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            temp_file = f.name
+        try:
+            size = self.assembler.encode_to_binary(self.assembler.iter_intermediate(program), temp_file)
+            with open(temp_file, 'rb') as f:
+                data = f.read()
+            
+            self.assertEqual(size, 6 + 3 * 4)
+            self.assertEqual(data[:6], MAGIC + bytes([2, 0]))
+            # STORE_MEM: A=14, B=40000 (0x09C40)
+            self.assertEqual(data[10:14], bytes([0xE0, 0x9C, 0x40, 0x00]))
+            
+            fmt, offset = UVMBinaryFormat.detect(data)
+            self.assertEqual(fmt.decode(data[offset:]),
+                             [(10, 520, 0), (14, 40000, 0), (2, 70000, 3)])
+        finally:
+            os.unlink(temp_file)
+        
+        with self.assertRaises(ValueError):
+            self.assembler.translate_to_intermediate([{"opcode": "LOAD_CONST", "operand": 1 << 20}])
+        print("✓ Расширенный формат операндов работает")
+    
+    def test_compact_format(self):
+        """Тест компактного формата с командами переменной длины"""
+        from uvm_format import UVMBinaryFormat, FLAG_COMPACT
+        
+        program = [
+            {"opcode": "LOAD_CONST", "operand": 0},
+            {"opcode": "STORE_MEM", "operand": 5},
+            {"opcode": "BLOCK_COPY", "operand": 2000, "count": 10},
+            {"opcode": "SQRT", "operand": 70000}
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        fmt = UVMBinaryFormat.compact()
+        
+        encoded = [self.assembler.encode_command(cmd, fmt) for cmd in intermediate]
+        self.assertEqual(encoded, [bytes([0xA0]), bytes([0xE1, 0x05]),
+                                   bytes([0x4A, 0x07, 0xD0, 0x0A]), bytes([0x23, 0x01, 0x11, 0x70])])
+        
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            temp_file = f.name
+        try:
+            size = self.assembler.encode_to_binary(intermediate, temp_file, fmt)
+            with open(temp_file, 'rb') as f:
+                data = f.read()
+            self.assertEqual(size, 6 + 11)
+            
+            detected, offset = UVMBinaryFormat.detect(data)
+            self.assertEqual(detected.flags, FLAG_COMPACT)
+            self.assertEqual(detected.decode(data[offset:]),
+                             [(cmd.opcode, cmd.operand, cmd.count) for cmd in intermediate])
+            # Неполная последняя команда отбрасывается
+            self.assertEqual(len(detected.decode(data[offset:-1])), 3)
+        finally:
+            os.unlink(temp_file)
+        print("✓ Компактный формат работает")
+    
+    def test_object_segments(self):
+        """Тест сегментов данных объектного файла"""
+        from uvm_format import UVMBinaryFormat, FLAG_DATA
+        
+        segments = UVMBinaryFormat.segments_from_memory({502: 3, 500: 1, 501: 2, 700: -5})
+        self.assertEqual(segments, [(500, [1, 2, 3]), (700, [-5])])
+        
+        intermediate = self.assembler.translate_to_intermediate(
+            [{"opcode": "LOAD_CONST", "operand": 500}, {"opcode": "SQRT", "operand": 600}])
+        with tempfile.NamedTemporaryFile(suffix='.uvo', delete=False) as f:
+            temp_file = f.name
+        try:
+            self.assembler.encode_to_binary(intermediate, temp_file,
+                                            data={500: 1, 501: 2, 502: 3, 700: -5})
+            with open(temp_file, 'rb') as f:
+                data = f.read()
+            
+            fmt, offset = UVMBinaryFormat.detect(data)
+            self.assertEqual(fmt.flags, FLAG_DATA)
+            self.assertEqual([(base, length) for base, _, length in fmt.segments],
+                             [(500, 3), (700, 1)])
+            with memoryview(data) as view:
+                self.assertEqual(UVMBinaryFormat.unpack_words(view, fmt.segments[1][1], 1), [-5])
+            self.assertEqual(fmt.decode(data[offset:]), [(10, 500, 0), (2, 600, 0)])
+            
+            with self.assertRaises(ValueError):
+                UVMBinaryFormat.detect(data[:offset - 1])
+            with self.assertRaises(ValueError):
+                UVMBinaryFormat.pack_segments([(0, [1 << 63])])
+        finally:
+            os.unlink(temp_file)
+        print("✓ Сегменты объектного файла работают")
+
+class TestUVMPartialEvaluation(unittest.TestCase):
+    """Тесты частичного вычисления программ (AOT)"""
+    
+    PROGRAM = [
+        {"opcode": "LOAD_CONST", "operand": 500},
+        {"opcode": "SQRT", "operand": 600},
+        {"opcode": "LOAD_CONST", "operand": 501},
+        {"opcode": "SQRT", "operand": 601},
+        {"opcode": "LOAD_CONST", "operand": 7},
+        {"opcode": "STORE_MEM", "operand": 602},
+        {"opcode": "LOAD_CONST", "operand": 500},
+        {"opcode": "LOAD_MEM", "operand": 0},
+        {"opcode": "STORE_MEM", "operand": 603}
+    ]
+    
+    def setUp(self):
+        self.assembler = UVMAssembler()
+        if not hasattr(self.assembler, 'partial_evaluate'):
+            self.skipTest("Частичное вычисление не поддерживается")
+        self.intermediate = self.assembler.translate_to_intermediate(self.PROGRAM)
+    
+    def run_interpreter(self, intermediate, memory):
+        from uvm_interp import UVMInterpreter
+        
+        interpreter = UVMInterpreter()
+        for addr, value in memory.items():
+            interpreter.memory[addr] = value
+        
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            bin_file = f.name
+        try:
+            self.assembler.encode_to_binary(intermediate, bin_file)
+            interpreter.load_program(bin_file)
+            interpreter.run()
+        finally:
+            os.unlink(bin_file)
+        
+        return interpreter.dump_memory(0, 1000)
+    
+    def test_full_evaluation(self):
+        """Без входов программа вычисляется полностью"""
+        init = {500: 25, 501: 100}
+        residual, image = self.assembler.partial_evaluate(self.intermediate, init)
+        
+        expected = self.run_interpreter(self.intermediate, init)
+        actual = {str(addr): value for addr, value in image.items() if value != 0}
+        self.assertEqual(actual, expected)
+        self.assertEqual(image[600], 5)
+        self.assertEqual(image[603], 25)
+        print("✓ Полное вычисление на этапе сборки совпадает с интерпретатором")
+    
+    def test_residual_program(self):
+        """Остаточная программа содержит только зависящие от входов вычисления"""
+        init = {500: 25, 501: 100}
+        residual, image = self.assembler.partial_evaluate(self.intermediate, init, inputs=[501])
+        
+        # Ячейка 601 зависит от входа, остальные известны статически
+        self.assertNotIn(601, image)
+        self.assertEqual(image[600], 5)
+        self.assertLess(len(residual), len(self.intermediate))
+        
+        runtime_memory = {500: 25, 501: 144}
+        expected = self.run_interpreter(self.intermediate, runtime_memory)
+        actual = self.run_interpreter(residual, runtime_memory)
+        self.assertEqual(actual, expected)
+        print("✓ Остаточная программа дает тот же дамп памяти")
+    
+    def test_static_loop_unrolling(self):
+        """Цикл с известным условием разворачивается в линейную программу"""
+        program = self.PROGRAM + [
+            {"opcode": "LOAD_CONST", "operand": 3},
+            {"label": "loop", "opcode": "JUMP_ZERO", "operand": "end"},
+            {"opcode": "LOAD_MEM", "operand": 700},   # MEM[700 + i] = i - 1
+            {"opcode": "STORE_MEM", "operand": 604},
+            {"opcode": "JUMP", "operand": "loop"},
+            {"label": "end", "opcode": "LOAD_CONST", "operand": 0}
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        init = {500: 25, 501: 100, 701: 0, 702: 1, 703: 2}
+        
+        residual, image = self.assembler.partial_evaluate(intermediate, init, inputs=[501])
+        self.assertNotIn(UVMAssembler.OPCODES['JUMP'], [cmd.opcode for cmd in residual])
+        
+        runtime_memory = {**init, 501: 144}
+        expected = self.run_interpreter(intermediate, runtime_memory)
+        self.assertEqual(self.run_interpreter(residual, runtime_memory), expected)
+        
+        # Условие, зависящее от входа, не вычисляется статически
+        with self.assertRaises(ValueError):
+            self.assembler.partial_evaluate(intermediate, init, inputs=[703])
+        print("✓ Статические переходы выполняются при частичном вычислении")
+
+class TestUVMLinker(unittest.TestCase):
+    """Тесты перемещаемых модулей и компоновщика"""
+    
+    DATA_MODULE = {
+        "data": {"vec": [25, 64, 100], "roots": 3, "total": {"size": 2, "values": [7]}},
+        "program": []
+    }
+    KERNEL_MODULE = {
+        "extern": ["vec", "roots", "total"],
+        "program": [
+            {"opcode": "LOAD_CONST", "operand": "vec"},
+            {"opcode": "SQRT", "operand": "roots", "count": 3},
+            {"opcode": "LOAD_CONST", "operand": "roots + 2"},
+            {"opcode": "LOAD_MEM", "operand": 0},
+            {"opcode": "JUMP_ZERO", "operand": "done"},
+            {"opcode": "STORE_MEM", "operand": "total + 1"},
+            {"label": "done"}
+        ]
+    }
+    
+    def setUp(self):
+        self.assembler = UVMAssembler()
+        if not hasattr(self.assembler, 'build_module'):
+            self.skipTest("Компоновка не поддерживается")
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def write_source(self, name, module):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(module, f)
+        return path
+    
+    def test_module_relocations(self):
+        """Операнды, отсчитанные от областей данных, записываются как перемещения"""
+        from array import array
+        
+        module = self.assembler.build_module(self.KERNEL_MODULE)
+        self.assertEqual(module['count'], 6)
+        relocations = {symbol: array('I', indices).tolist()
+                       for symbol, indices in module['relocations'].items()}
+        self.assertEqual(relocations, {'vec': [0], 'roots': [1, 2], 'total': [5], None: [4]})
+        # Операнд хранит смещение внутри области (переход - индекс в модуле)
+        self.assertEqual(module['code'][8:12], bytes([0xA0, 0x00, 0x02, 0x00]))
+        self.assertEqual(module['code'][16:20], bytes([0x70, 0x00, 0x06, 0x00]))
+        
+        for operand in ("vec * 2", "vec + roots", "-vec", "roots - 1"):
+            with self.assertRaises(ValueError):
+                self.assembler.build_module({"extern": ["vec", "roots"],
+                                             "program": [{"opcode": "LOAD_CONST",
+                                                          "operand": operand}]})
+        module = self.assembler.build_module({"extern": ["roots"], "program": [
+            {"opcode": "LOAD_CONST", "operand": "roots + 3 - 1"}]})
+        self.assertEqual(module['code'][:4], bytes([0xA0, 0x00, 0x02, 0x00]))
+        print("✓ Перемещения модулей работают")
+    
+    def test_link_and_run(self):
+        """Скомпонованная программа выполняется с размещенными областями данных"""
+        from uvm_link import UVMLinker
+        from uvm_interp import UVMInterpreter
+        
+        sources = [self.write_source('data.json', self.DATA_MODULE),
+                   self.write_source('kernel.json', self.KERNEL_MODULE)]
+        output = os.path.join(self.temp_dir.name, 'program.uvo')
+        
+        linker = UVMLinker(data_base=1000, checksum=True)
+        linker.build(sources, output)
+        self.assertEqual(linker.rebuilt, 2)
+        
+        interpreter = UVMInterpreter(mem_size=2000)
+        interpreter.load_program(output, use_cache=False)
+        self.assertEqual(interpreter.instructions[0], (10, 1000, 0))
+        interpreter.run()
+        self.assertEqual(interpreter.memory[1000:1008], [25, 64, 100, 5, 8, 10, 7, 10])
+        
+        # Пересобирается только измененный модуль; результат совпадает с полной сборкой
+        linker.build(sources, output)
+        self.assertEqual(linker.rebuilt, 0)
+        
+        kernel = dict(self.KERNEL_MODULE, program=self.KERNEL_MODULE['program'][:2])
+        self.write_source('kernel.json', kernel)
+        linker.build(sources, output)
+        self.assertEqual(linker.rebuilt, 1)
+        with open(output, 'rb') as f:
+            incremental = f.read()
+        linker.build(sources, output, force=True)
+        with open(output, 'rb') as f:
+            self.assertEqual(f.read(), incremental)
+        
+        # Неопределенная и повторно определенная области данных
+        with self.assertRaises(ValueError):
+            linker.build(sources[1:], output)
+        with self.assertRaises(ValueError):
+            linker.build(sources[:1] * 2, output)
+        print("✓ Компоновка и инкрементальная пересборка работают")
+
+class TestUVMDisassembler(unittest.TestCase):
+    """Тесты дизассемблера: обратимость JSON и листинга"""
+    
+    def setUp(self):
+        try:
+            from uvm_disasm import UVMDisassembler
+        except ImportError:
+            self.skipTest("Дизассемблер не поддерживается")
+        self.assembler = UVMAssembler()
+        self.disassembler = UVMDisassembler()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+    
+    def test_json_round_trip(self):
+        """Ассемблирование результата дизассемблирования дает тот же файл"""
+        source = os.path.join(self.base_dir, 'example4_loop_sqrt.json')
+        init = self.assembler.load_init_memory(os.path.join(self.base_dir, 'init_loop_sqrt.json'))
+        
+        for compact, checksum, data in [(False, False, None), (True, True, init)]:
+            with self.subTest(compact=compact, checksum=checksum):
+                original = self.path('original.bin')
+                restored = self.path('restored.bin')
+                self.assembler.assemble_stream(source, original, compact, checksum, data)
+                
+                self.disassembler.load(original)
+                self.disassembler.write(self.path('program.json'))
+                if data:
+                    self.disassembler.save_data(self.path('init.json'))
+                    data = self.assembler.load_init_memory(self.path('init.json'))
+                self.assembler.assemble_stream(self.path('program.json'), restored,
+                                               compact, checksum, data)
+                
+                with open(original, 'rb') as f1, open(restored, 'rb') as f2:
+                    self.assertEqual(f1.read(), f2.read())
+        
+        # Переходы записываются через метки
+        with open(self.path('program.json'), encoding='utf-8') as f:
+            program = json.load(f)['program']
+        self.assertIn({"label": "L2"}, program)
+        self.assertIn({"opcode": "JUMP", "operand": "L2"}, program)
+        print("✓ Дизассемблирование в JSON обратимо")
+    
+    def test_listing(self):
+        """Компактный листинг"""
+        program = [{"opcode": "LOAD_CONST", "operand": 500},
+                   {"label": "loop", "opcode": "SQRT", "operand": 600, "count": 4},
+                   {"opcode": "JUMP_NEG", "operand": "loop"}]
+        self.assembler.encode_to_binary(self.assembler.translate_to_intermediate(program),
+                                        self.path('program.bin'))
+        self.disassembler.load(self.path('program.bin'))
+        self.disassembler.write(self.path('program.lst'), listing=True)
+        
+        with open(self.path('program.lst'), encoding='utf-8') as f:
+            lines = f.read().splitlines()[1:]
+        self.assertEqual(lines, ["    LOAD_CONST 500", "L1:", "    SQRT 600, 4", "    JUMP_NEG L1"])
+        print("✓ Листинг дизассемблера работает")
+    
+    def test_irreversible_commands(self):
+        """Команды, невыразимые в исходном формате, отвергаются"""
+        for code in (bytes([0xA1, 0xF4, 0x00, 0xC0, 0x00, 0x00]),   # код операции 12
+                     bytes([0xA1, 0xF4, 0x00, 0xA0, 0x01, 0x03])):  # LOAD_CONST с count
+            with self.subTest(code=code.hex()):
+                with open(self.path('bad.bin'), 'wb') as f:
+                    f.write(code)
+                self.disassembler.load(self.path('bad.bin'))
+                with self.assertRaises(ValueError):
+                    self.disassembler.write(self.path('bad.json'))
+        print("✓ Необратимые команды обнаруживаются")
+    
+    def test_listing_assembles(self):
+        """Листинг дизассемблера - корректный исходный текст ассемблера"""
+        source = os.path.join(self.base_dir, 'example4_loop_sqrt.json')
+        self.assembler.assemble_stream(source, self.path('original.bin'))
+        self.disassembler.load(self.path('original.bin'))
+        self.disassembler.write(self.path('program.uvs'), listing=True)
+        self.assembler.assemble_stream(self.path('program.uvs'), self.path('restored.bin'))
+        
+        with open(self.path('original.bin'), 'rb') as f1, \
+                open(self.path('restored.bin'), 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+        print("✓ Листинг ассемблируется в тот же файл")
+
+class TestUVMTextFormat(unittest.TestCase):
+    """Тесты текстового формата исходного кода"""
+    
+    def setUp(self):
+        self.assembler = UVMAssembler()
+        self.base_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    def test_example_matches_json(self):
+        """Текстовый пример ассемблируется в ту же программу, что и JSON"""
+        text = self.assembler.parse_program(os.path.join(self.base_dir, 'example4_loop_sqrt.uvs'))
+        data = self.assembler.parse_program(os.path.join(self.base_dir, 'example4_loop_sqrt.json'))
+        self.assertEqual([(c.opcode, c.operand, c.count, c.comment)
+                          for c in self.assembler.translate_to_intermediate(text)],
+                         [(c.opcode, c.operand, c.count, c.comment)
+                          for c in self.assembler.translate_to_intermediate(data)])
+        print("✓ Текстовый и JSON форматы дают одну программу")
+    
+    def test_syntax(self):
+        """Метки, директивы, выражения и комментарии"""
+        program = self.assembler.parse_text_program(
+            "; заголовок\n"
+            "start: load_const 500   ; начало\n"
+            ".repeat 2 var=k\n"
+            "    SQRT 600 + k, 4\n"
+            ".end\n"
+            "end:\n"
+            "\tJUMP end\n")
+        self.assertEqual(program, [
+            {"label": "start", "opcode": "LOAD_CONST", "operand": 500, "comment": "начало"},
+            {"repeat": 2, "var": "k", "body": [{"opcode": "SQRT", "operand": "600 + k",
+                                                 "count": 4}]},
+            {"label": "end", "opcode": "JUMP", "operand": "end"}])
+        
+        commands = self.assembler.translate_to_intermediate(program)
+        self.assertEqual([(c.opcode, c.operand, c.count) for c in commands],
+                         [(10, 500, 0), (2, 600, 4), (2, 601, 4), (6, 3, 0)])
+        print("✓ Синтаксис текстового формата разбирается")
+    
+    def test_errors(self):
+        """Ошибки указывают номер строки"""
+        for text, line in [("LOAD_CONST 1\nPUSH 2\n", 2),
+                           ("LOAD_CONST 1\n\n.repeat 3\nSQRT 1\n", 3),
+                           ("9x: SQRT 1\n", 1),
+                           (".end\n", 1)]:
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(ValueError, f"Строка {line}:"):
+                    self.assembler.parse_text_program(text)
+        print("✓ Ошибки текстового формата обнаруживаются")
+
 def run_all_tests():
     """Запуск всех тестов"""
     print("=" * 60)
@@ -326,6 +892,11 @@ def run_all_tests():
     suite = unittest.TestSuite()
     suite.addTests(loader.loadTestsFromTestCase(TestUVMAssemblerStage1))
     suite.addTests(loader.loadTestsFromTestCase(TestUVMAssemblerStage2))
+    suite.addTests(loader.loadTestsFromTestCase(TestUVMAssemblerDirectives))
+    suite.addTests(loader.loadTestsFromTestCase(TestUVMPartialEvaluation))
+    suite.addTests(loader.loadTestsFromTestCase(TestUVMLinker))
+    suite.addTests(loader.loadTestsFromTestCase(TestUVMDisassembler))
+    suite.addTests(loader.loadTestsFromTestCase(TestUVMTextFormat))
     
     # Запускаем тесты
     runner = unittest.TextTestRunner(verbosity=2)
@@ -147,6 +147,303 @@ class TestUVMInterpreter(unittest.TestCase):
         
         print("✓ Симуляция копирования массива работает")
 
+    def test_program_slicing(self):
+        """Тест среза программы по диапазону дампа"""
+        program = [
+            {"opcode": "LOAD_CONST", "operand": 100},
+            {"opcode": "SQRT", "operand": 110},      # Влияет на дамп 110..120
+            {"opcode": "LOAD_CONST", "operand": 5},
+            {"opcode": "STORE_MEM", "operand": 300}, # Вне дампа
+            {"opcode": "LOAD_CONST", "operand": 101},
+            {"opcode": "SQRT", "operand": 301},      # Вне дампа
+            {"opcode": "LOAD_CONST", "operand": 9},
+            {"opcode": "STORE_MEM", "operand": 111}  # Влияет на дамп
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        self.interpreter.program = bytearray(
+            b''.join(self.assembler.encode_command(cmd) for cmd in intermediate))
+        self.interpreter.memory[100] = 49
+        self.interpreter.memory[101] = 16
+        
+        ratio = self.interpreter.slice_program(110, 120)
+        self.assertEqual(self.interpreter.active, [0, 1, 6, 7])
+        self.assertEqual(ratio, 0.5)
+        
+        self.interpreter.run()
+        self.assertEqual(self.interpreter.dump_memory(110, 120), {'110': 7, '111': 9})
+        self.assertEqual(self.interpreter.memory[300], 0)
+        print("✓ Срез программы по диапазону дампа работает")
+
+    def test_static_address_verification(self):
+        """Тест статической проверки адресов"""
+        program = [
+            {"opcode": "LOAD_CONST", "operand": 100},
+            {"opcode": "SQRT", "operand": 200},      # Адреса известны
+            {"opcode": "LOAD_CONST", "operand": 300},
+            {"opcode": "LOAD_MEM", "operand": 0},    # Адрес известен
+            {"opcode": "SQRT", "operand": 201},      # Источник из памяти
+            {"opcode": "STORE_MEM", "operand": 4000} # Вне памяти
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        self.interpreter.program = bytearray(
+            b''.join(self.assembler.encode_command(cmd) for cmd in intermediate))
+        
+        verified, accessing = self.interpreter.prepare_handlers()
+        self.assertEqual((verified, accessing), (2, 4))
+        
+        # Проверки во время выполнения сохраняются для непроверенных команд
+        self.interpreter.memory[100] = 81
+        self.interpreter.memory[300] = 5000
+        self.interpreter.run()
+        self.assertEqual(self.interpreter.memory[200], 9)
+        self.assertEqual(self.interpreter.memory[201], 0)
+        print("✓ Статическая проверка адресов работает")
+
+    def test_parallel_chains(self):
+        """Тест разбиения на независимые цепочки и параллельного выполнения"""
+        from uvm_analysis import UVMAnalyzer
+        from uvm_parallel import UVMParallelExecutor
+        
+        program = []
+        for i in range(6):
+            program += [{"opcode": "LOAD_CONST", "operand": 500 + i},
+                        {"opcode": "SQRT", "operand": 500 + i}]
+        program += [{"opcode": "LOAD_CONST", "operand": 500},
+                    {"opcode": "LOAD_MEM", "operand": 0},
+                    {"opcode": "STORE_MEM", "operand": 600}]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        code = bytearray(b''.join(self.assembler.encode_command(cmd) for cmd in intermediate))
+        
+        self.interpreter.program = code
+        chains = UVMAnalyzer(self.interpreter.decode_program(), 1000).partition_chains()
+        self.assertEqual(len(chains), 6)
+        self.assertEqual(chains[0], [0, 1, 12, 13, 14])
+        
+        sequential = UVMInterpreter(mem_size=1000)
+        for interp in (self.interpreter, sequential):
+            for i in range(6):
+                interp.memory[500 + i] = (i + 2) ** 2
+        sequential.program = code
+        sequential.run()
+        
+        chains_run = UVMParallelExecutor(self.interpreter, workers=2, min_commands=0).run()
+        self.assertEqual(chains_run, 6)
+        self.assertEqual(self.interpreter.memory, sequential.memory)
+        self.assertEqual(self.interpreter.acc, sequential.acc)
+        self.assertEqual(self.interpreter.sqrt_operations, sequential.sqrt_operations)
+        print("✓ Параллельное выполнение независимых цепочек работает")
+
+    def test_vector_sqrt(self):
+        """Тест векторной формы SQRT (длина в третьем байте)"""
+        program = [
+            {"opcode": "LOAD_CONST", "operand": 500},
+            {"opcode": "SQRT", "operand": 502, "count": 4},  # Перекрывающиеся диапазоны
+            {"opcode": "SQRT", "operand": 998, "count": 4}   # Выход за границу памяти
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        self.interpreter.program = bytearray(
+            b''.join(self.assembler.encode_command(cmd) for cmd in intermediate))
+        for i, value in enumerate([16, 25, 36, 49]):
+            self.interpreter.memory[500 + i] = value
+        
+        self.interpreter.run()
+        
+        # Все источники читаются до записи результатов
+        self.assertEqual(self.interpreter.memory[500:506], [16, 25, 4, 5, 6, 7])
+        self.assertEqual(self.interpreter.memory[998:1000], [0, 0])
+        self.assertEqual(self.interpreter.sqrt_operations, 4)
+        self.assertEqual(self.interpreter.commands_executed, 2)  # Ошибочная команда не считается
+        print("✓ Векторная команда SQRT работает")
+
+    def test_block_copy_and_fill(self):
+        """Тест блочных команд BLOCK_COPY/BLOCK_FILL"""
+        program = [
+            {"opcode": "LOAD_CONST", "operand": 100},
+            {"opcode": "BLOCK_COPY", "operand": 102, "count": 5},  # Перекрывающиеся блоки
+            {"opcode": "LOAD_CONST", "operand": 7},
+            {"opcode": "BLOCK_FILL", "operand": 200, "count": 3},
+            {"opcode": "BLOCK_FILL", "operand": 210},               # N=0 - одна ячейка
+            {"opcode": "BLOCK_FILL", "operand": 999, "count": 2}    # Выход за границу памяти
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        self.interpreter.program = bytearray(
+            b''.join(self.assembler.encode_command(cmd) for cmd in intermediate))
+        for i in range(5):
+            self.interpreter.memory[100 + i] = i + 1
+        
+        self.interpreter.run()
+        
+        self.assertEqual(self.interpreter.memory[100:107], [1, 2, 1, 2, 3, 4, 5])
+        self.assertEqual(self.interpreter.memory[200:204], [7, 7, 7, 0])
+        self.assertEqual(self.interpreter.memory[210], 7)
+        self.assertEqual(self.interpreter.memory[999], 0)
+        self.assertEqual(self.interpreter.memory_accesses, 10 + 3 + 1)
+        print("✓ Блочные команды BLOCK_COPY/BLOCK_FILL работают")
+
+    def test_jump_loop(self):
+        """Тест цикла на командах перехода"""
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'example4_loop_sqrt.json'), encoding='utf-8') as f:
+            program = json.load(f)['program']
+        intermediate = self.assembler.translate_to_intermediate(program)
+        self.interpreter.program = bytearray(
+            b''.join(self.assembler.encode_command(cmd) for cmd in intermediate))
+        for i in range(1, 11):
+            self.interpreter.memory[400 + i] = i - 1
+        for i, value in enumerate([25, 64, 100, 144, 225, 10000, 0, 1, 4, 9]):
+            self.interpreter.memory[500 + i] = value
+        
+        self.interpreter.run()
+        
+        self.assertEqual(self.interpreter.memory[500:510], [5, 8, 10, 12, 15, 100, 0, 1, 2, 3])
+        self.assertEqual(self.interpreter.sqrt_operations, 10)
+        print("✓ Цикл на командах перехода работает")
+    
+    def test_jump_command_limit(self):
+        """Бесконечный цикл прерывается ограничением на число команд"""
+        program = [{"label": "loop", "opcode": "JUMP", "operand": "loop"}]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        interpreter = UVMInterpreter(mem_size=16, max_commands=50)
+        interpreter.program = bytearray(self.assembler.encode_command(intermediate[0]))
+        
+        interpreter.run()
+        self.assertEqual(interpreter.commands_executed, 51)
+        print("✓ Ограничение на число команд работает для циклов")
+
+    def test_extended_format_program(self):
+        """Тест загрузки программы в расширенном формате (адреса за 4096)"""
+        program = {"program": [
+            {"opcode": "LOAD_CONST", "operand": 50000},
+            {"opcode": "SQRT", "operand": 60000},
+            {"opcode": "LOAD_CONST", "operand": 777},
+            {"opcode": "STORE_MEM", "operand": 65535}
+        ]}
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(program, f)
+            json_file = f.name
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            bin_file = f.name
+        
+        try:
+            self.assembler.encode_to_binary(self.assembler.assemble(json_file), bin_file)
+            
+            interpreter = UVMInterpreter()
+            interpreter.memory[50000] = 144
+            interpreter.load_program(bin_file)
+            interpreter.run()
+            
+            self.assertEqual(interpreter.format.version, 2)
+            self.assertEqual(interpreter.memory[60000], 12)
+            self.assertEqual(interpreter.memory[65535], 777)
+            print("✓ Программа в расширенном формате выполняется")
+        finally:
+            os.unlink(json_file)
+            os.unlink(bin_file)
+
+    def test_compact_format_program(self):
+        """Программа в компактном формате выполняется так же, как в классическом"""
+        from uvm_format import UVMBinaryFormat
+        
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'example4_loop_sqrt.json'), encoding='utf-8') as f:
+            program = json.load(f)['program']
+        intermediate = self.assembler.translate_to_intermediate(program)
+        
+        results = []
+        for fmt in (None, UVMBinaryFormat.compact()):
+            with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+                bin_file = f.name
+            try:
+                self.assembler.encode_to_binary(intermediate, bin_file, fmt)
+                interpreter = UVMInterpreter(mem_size=1000)
+                for i in range(1, 11):
+                    interpreter.memory[400 + i] = i - 1
+                for i in range(10):
+                    interpreter.memory[500 + i] = (i + 1) ** 2
+                interpreter.load_program(bin_file)
+                interpreter.run()
+                results.append((interpreter.memory, interpreter.commands_executed))
+            finally:
+                os.unlink(bin_file)
+        
+        self.assertEqual(results[1], results[0])
+        print("✓ Программа в компактном формате выполняется")
+
+    def test_decode_cache(self):
+        """Тест кэша декодирования для программ с контрольной суммой"""
+        program = [
+            {"opcode": "LOAD_CONST", "operand": 100},
+            {"opcode": "SQRT", "operand": 200, "count": 2}
+        ]
+        intermediate = self.assembler.translate_to_intermediate(program)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bin_file = os.path.join(temp_dir, 'program.bin')
+            self.assembler.encode_to_binary(intermediate, bin_file, checksum=True)
+            
+            first = UVMInterpreter(mem_size=1000)
+            first.load_program(bin_file)
+            self.assertTrue(os.path.exists(bin_file + UVMInterpreter.CACHE_SUFFIX))
+            
+            # Повторная загрузка не декодирует и не проверяет программу заново
+            second = UVMInterpreter(mem_size=1000)
+            second.decode_program = None
+            second.load_program(bin_file)
+            self.assertEqual(second.instructions, first.instructions)
+            self.assertEqual(second.verified_addresses, [True, True])
+            
+            second.memory[100:102] = [81, 64]
+            second.run()
+            self.assertEqual(second.memory[200:202], [9, 8])
+            
+            # Поврежденный код программы обнаруживается по контрольной сумме,
+            # в том числе когда кэш декодирования остался от исходной программы
+            with open(bin_file, 'r+b') as f:
+                f.seek(-1, os.SEEK_END)
+                f.write(b'\x07')
+            with self.assertRaises(SystemExit):
+                UVMInterpreter(mem_size=1000).load_program(bin_file)
+            
+            os.unlink(bin_file + UVMInterpreter.CACHE_SUFFIX)
+            with self.assertRaises(SystemExit):
+                UVMInterpreter(mem_size=1000).load_program(bin_file)
+        print("✓ Кэш декодирования работает")
+    
+    def test_object_file(self):
+        """Тест объектного файла с сегментами начальной памяти"""
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        program = self.assembler.parse_json_program(os.path.join(base_dir, 'example4_loop_sqrt.json'))
+        init = self.assembler.load_init_memory(os.path.join(base_dir, 'init_loop_sqrt.json'))
+        intermediate = self.assembler.translate_to_intermediate(program)
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            obj_file = os.path.join(temp_dir, 'program.uvo')
+            self.assembler.encode_to_binary(intermediate, obj_file, checksum=True, data=init)
+            
+            interpreter = UVMInterpreter(mem_size=1000)
+            interpreter.load_program(obj_file)
+            self.assertEqual(interpreter.format.segments[0][0], 401)
+            self.assertEqual(interpreter.memory[500:510], [init[500 + i] for i in range(10)])
+            
+            interpreter.run()
+            self.assertEqual(interpreter.memory[500:510], [5, 8, 10, 12, 15, 100, 0, 1, 2, 3])
+            
+            # Сегменты загружаются и при повторной загрузке из кэша
+            cached = UVMInterpreter(mem_size=1000)
+            cached.decode_program = None
+            cached.load_program(obj_file)
+            self.assertEqual(cached.memory[401:411], list(range(10)))
+            
+            # Контрольная сумма охватывает и сегменты данных
+            os.unlink(obj_file + UVMInterpreter.CACHE_SUFFIX)
+            with open(obj_file, 'r+b') as f:
+                f.seek(interpreter.format.segments[1][1])
+                f.write(b'\x01')
+            with self.assertRaises(SystemExit):
+                UVMInterpreter(mem_size=1000).load_program(obj_file)
+        print("✓ Объектный файл загружается вместе с памятью")
+
 def run_interpreter_tests():
     """Запуск всех тестов интерпретатора"""
     print("=" * 60)
@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""
+Тесты web интерфейса УВМ
+"""
+
+import unittest
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import uvm_web
+except ImportError:
+    uvm_web = None
+
+def program_json(*commands):
+    """JSON текст программы из кортежей (opcode, operand[, count])"""
+    program = [dict(zip(("opcode", "operand", "count"), command)) for command in commands]
+    return json.dumps({"program": program})
+
+@unittest.skipIf(uvm_web is None, "Flask не установлен")
+class TestUVMWebPool(unittest.TestCase):
+    """Тесты пула экземпляров УВМ"""
+
+    def setUp(self):
+        self.client = uvm_web.app.test_client()
+
+    def execute(self, program):
+        response = self.client.post('/api/execute', json={'program': program})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_reset_dirty_cells(self):
+        """Сброс обнуляет измененные ячейки и восстанавливает тестовые данные"""
+        vm = uvm_web.UVMWeb()
+        vm.execute_program(program_json(("LOAD_CONST", 7), ("BLOCK_FILL", 100, 50),
+                                         ("STORE_MEM", 500)))
+        self.assertEqual(vm.memory[100:150], [7] * 50)
+
+        vm.reset()
+        self.assertEqual(vm.memory, uvm_web.UVMWeb().memory)
+        self.assertEqual(vm.acc, 0)
+        print("✓ Сброс обнуляет только измененные ячейки")
+
+    def test_concurrent_requests(self):
+        """Параллельные запросы не изменяют состояние друг друга"""
+        results = {}
+
+        def worker(value):
+            # Разные программы в каждом запросе, чтобы ответы не брались из кэша
+            programs = [program_json(("LOAD_CONST", value), ("BLOCK_FILL", 600, 20),
+                                     ("STORE_MEM", 700 + run), ("LOAD_CONST", 600),
+                                     ("LOAD_MEM", 19)) for run in range(10)]
+            results[value] = [self.execute(program) for program in programs]
+
+        threads = [threading.Thread(target=worker, args=(value,)) for value in range(1, 17)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for value, runs in results.items():
+            for result in runs:
+                self.assertEqual(result['final_acc'], value)
+                self.assertEqual(result['memory_dump']['619'], value)
+                self.assertNotIn('620', result['memory_dump'])
+        print("✓ Параллельные запросы изолированы")
+
+    def test_busy_pool(self):
+        """Если все экземпляры заняты дольше timeout, запрос получает 503"""
+        busy = uvm_web.UVMPool(size=1, timeout=0.05)
+        saved, uvm_web.pool = uvm_web.pool, busy
+        try:
+            with busy.checkout():
+                response = self.client.post('/api/execute', json={
+                    'program': program_json(("LOAD_CONST", 4242))})
+                self.assertEqual(response.status_code, 503)
+                self.assertFalse(response.get_json()['success'])
+                self.assertIn('Retry-After', response.headers)
+            # Экземпляр вернулся в пул, следующий запрос выполняется
+            self.assertEqual(self.execute(program_json(("LOAD_CONST", 4242)))['final_acc'], 4242)
+        finally:
+            uvm_web.pool = saved
+        print("✓ Занятый пул отвечает 503")
+
+@unittest.skipIf(uvm_web is None, "Flask не установлен")
+class TestUVMWebExecution(unittest.TestCase):
+    """Тесты выполнения программ через ассемблер и интерпретатор"""
+
+    def setUp(self):
+        self.vm = uvm_web.UVMWeb()
+
+    def test_labels_and_jumps(self):
+        """Метки и переходы выполняются интерпретатором"""
+        program = json.dumps({"program": [
+            {"opcode": "LOAD_CONST", "operand": 500},
+            {"opcode": "SQRT", "operand": 600, "count": 3},
+            {"opcode": "JUMP", "operand": "end"},
+            {"opcode": "STORE_MEM", "operand": 700},
+            {"label": "end"}]})
+        result = self.vm.execute_program(program)
+
+        self.assertTrue(result['success'])
+        self.assertEqual([result['memory_dump'].get(str(addr)) for addr in (600, 601, 602, 700)],
+                         [5, 10, 15, None])
+        self.assertEqual([step['index'] for step in result['steps']], [0, 1, 2])
+        self.assertTrue(result['steps'][2]['taken'])
+        print("✓ Переходы выполняются в web интерфейсе")
+
+    def test_same_result_as_interpreter(self):
+        """Результат совпадает с интерпретатором командной строки"""
+        program = program_json(("LOAD_CONST", 501), ("LOAD_MEM", 0), ("STORE_MEM", 800),
+                               ("LOAD_CONST", 800), ("SQRT", 801), ("LOAD_CONST", 4000),
+                               ("STORE_MEM", 70000))
+        result = self.vm.execute_program(program)
+
+        interpreter = uvm_web.UVMInterpreter(mem_size=65536)
+        interpreter.log = lambda *args: None
+        interpreter.memory[500:503] = [25, 100, 225]
+        interpreter.memory[520], interpreter.memory[133] = 100, 42
+        interpreter.load_instructions([(cmd.opcode, cmd.operand, cmd.count) for cmd in
+                                       self.vm.translate(program)])
+        interpreter.run()
+
+        self.assertEqual(result['final_acc'], interpreter.acc)
+        self.assertEqual(result['memory_dump'], interpreter.dump_memory(0, 1000))
+        self.assertIn('error', result['steps'][-1])
+        print("✓ Web интерфейс выполняет программы интерпретатором")
+
+    def test_program_size_limit(self):
+        """Программа, разворачивающаяся больше чем в MAX_PROGRAM_COMMANDS команд, отклоняется"""
+        program = json.dumps({"program": [{"repeat": 10 ** 8, "body": [
+            {"opcode": "LOAD_CONST", "operand": 1}]}]})
+        result = self.vm.execute_program(program)
+        self.assertFalse(result['success'])
+        self.assertIn(str(uvm_web.UVMWeb.MAX_PROGRAM_COMMANDS), result['error'])
+
+        response = uvm_web.app.test_client().post('/api/assemble', json={'program': program})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.get_json()['success'])
+        print("✓ Размер программы из запроса ограничен")
+
+    def test_response_modes(self):
+        """Колоночный и итоговый режимы ответа"""
+        program = program_json(("LOAD_CONST", 500), ("SQRT", 800), ("LOAD_MEM", 1),
+                               ("STORE_MEM", 801), ("BLOCK_FILL", 802, 2))
+        steps = self.vm.execute_program(program)
+        columns = self.vm.execute_program(program, 'columns')
+        summary = self.vm.execute_program(program, 'summary')
+
+        self.assertEqual(columns['columns'], {
+            'index': [0, 1, 2, 3, 4],
+            'opcode': [10, 2, 0, 14, 5],
+            'operand': [500, 800, 1, 801, 802],
+            'acc': [500, 500, 100, 100, 100],
+            'addr': [None, 800, 501, 801, 802],
+            'value': [None, 5, 100, 100, None]})
+        self.assertEqual([step['after_acc'] for step in steps['steps']], columns['columns']['acc'])
+
+        self.assertEqual(set(summary), {'success', 'final_acc', 'memory_dump'})
+        for result in (columns, summary):
+            self.assertEqual(result['final_acc'], steps['final_acc'])
+            self.assertEqual(result['memory_dump'], steps['memory_dump'])
+
+        self.assertFalse(self.vm.execute_program(program, 'xml')['success'])
+        print("✓ Режимы ответа columns и summary работают")
+
+
+@unittest.skipIf(uvm_web is None, "Flask не установлен")
+class TestUVMWebMemory(unittest.TestCase):
+    """Тесты запросов памяти по диапазонам и изменениям"""
+
+    PROGRAM = program_json(("LOAD_CONST", 9), ("BLOCK_FILL", 40000, 30),
+                           ("STORE_MEM", 5000), ("LOAD_CONST", 0), ("STORE_MEM", 40010))
+
+    def setUp(self):
+        self.client = uvm_web.app.test_client()
+
+    def query(self, **fields):
+        response = self.client.post('/api/memory', json={'program': self.PROGRAM, **fields})
+        return response.get_json()
+
+    def test_memory_dump_covers_memory(self):
+        """Дамп памяти включает адреса выше 999"""
+        dump = uvm_web.UVMWeb().execute_program(self.PROGRAM)['memory_dump']
+        self.assertEqual(dump['5000'], 9)
+        self.assertEqual(dump['40029'], 9)
+        self.assertNotIn('40010', dump)
+        self.assertEqual(len(dump), 5 + 1 + 29)
+        print("✓ Дамп памяти охватывает всю память")
+
+    def test_ranges_and_pages(self):
+        """Диапазоны адресов и страницы"""
+        first = self.query(ranges=[[39990, 40020], [4000, 6000]], limit=10)
+        self.assertTrue(first['success'])
+        self.assertEqual(first['total'], 1 + 19)
+        self.assertEqual(sorted(map(int, first['cells'])), [5000] + list(range(40000, 40009)))
+        self.assertEqual(first['next_offset'], 10)
+
+        last = self.query(ranges=[[39990, 40020], [4000, 6000]], limit=10, offset=10)
+        self.assertEqual(len(last['cells']), 10)
+        self.assertIsNone(last['next_offset'])
+
+        self.assertFalse(self.query(ranges=[[10, 5]])['success'])
+        self.assertFalse(self.query(limit=0)['success'])
+        print("✓ Запрос памяти по диапазонам и страницам работает")
+
+    def test_changed_since_step(self):
+        """Только ячейки, измененные после шага (включая обнуленные)"""
+        delta = self.query(since_step=3)
+        self.assertEqual(delta['cells'], {'40010': 0})
+        self.assertEqual(delta['step'], 5)
+
+        everything = self.query(since_step=0)
+        self.assertEqual(everything['total'], 30 + 1)
+        self.assertEqual(self.query(since_step=5)['total'], 0)
+        print("✓ Запрос измененных ячеек по шагу работает")
+
+@unittest.skipIf(uvm_web is None, "Flask не установлен")
+class TestUVMWebPrograms(unittest.TestCase):
+    """Тесты реестра программ"""
+
+    PROGRAM = program_json(("LOAD_CONST", 900), ("SQRT", 950, 3), ("LOAD_CONST", 950),
+                           ("LOAD_MEM", 1))
+
+    def setUp(self):
+        self.client = uvm_web.app.test_client()
+
+    def register(self, **options):
+        response = self.client.post('/api/programs', **options)
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['id']
+
+    def execute(self, program_id, **fields):
+        return self.client.post(f'/api/programs/{program_id}/execute', json=fields).get_json()
+
+    def test_execute_with_memory(self):
+        """Программа регистрируется один раз и выполняется с разной памятью"""
+        program_id = self.register(json={'program': self.PROGRAM})
+        self.assertEqual(self.register(json={'program': json.dumps(json.loads(self.PROGRAM),
+                                                                   indent=2)}), program_id)
+
+        result = self.execute(program_id, memory={'900': 16, '901': 81, '902': 144})
+        self.assertEqual(result['final_acc'], 9)
+        self.assertEqual(result['memory_dump']['952'], 12)
+
+        batch = self.execute(program_id, batch=[{'900': 4, '901': value * value}
+                                                for value in range(5)])
+        self.assertTrue(batch['success'])
+        self.assertEqual([result['final_acc'] for result in batch['results']], list(range(5)))
+        self.assertNotIn('900', self.execute(program_id)['memory_dump'])
+
+        steps = self.execute(program_id, mode='steps', memory={'901': 49})
+        self.assertEqual(steps, uvm_web.UVMWeb().execute_instructions(
+            uvm_web.programs.get(program_id)[0], [(901, [49])]))
+
+        self.assertEqual(self.client.post(f'/api/programs/{program_id}/execute',
+                                          json={'memory': {'x': 1}}).status_code, 400)
+        self.assertFalse(self.execute(program_id, memory={'70000': 1})['success'])
+        too_many = self.client.post(f'/api/programs/{program_id}/execute',
+                                    json={'batch': [{}] * (uvm_web.MAX_BATCH + 1)})
+        self.assertEqual(too_many.status_code, 400)
+        for url in ('/api/programs', f'/api/programs/{program_id}/execute'):
+            self.assertEqual(self.client.post(url, json=[1]).status_code, 400)
+        print("✓ Зарегистрированная программа выполняется по идентификатору")
+
+    def test_binary_upload(self):
+        """Регистрация объектного файла с сегментами данных"""
+        fmt = uvm_web.UVMBinaryFormat(1, 0x04)
+        instructions = [(10, 900), (2, 950, 2)]
+        data = (fmt.header() + fmt.pack_segments([(900, [36, 49])])
+                + b''.join(fmt.encode(*command) for command in instructions))
+
+        program_id = self.register(data=data, content_type='application/octet-stream')
+        info = self.client.get(f'/api/programs/{program_id}').get_json()
+        self.assertEqual((info['commands'], info['segments']), (2, [[900, 2]]))
+
+        result = self.execute(program_id)
+        self.assertEqual([result['memory_dump'][addr] for addr in ('950', '951')], [6, 7])
+        self.assertEqual(self.execute(program_id, memory={'901': 64})['memory_dump']['951'], 8)
+
+        self.assertEqual(self.client.post('/api/programs', data=data[:-1],
+                                          content_type='application/octet-stream').status_code, 400)
+        self.assertEqual(self.client.delete(f'/api/programs/{program_id}').status_code, 200)
+        self.assertEqual(self.client.post(f'/api/programs/{program_id}/execute',
+                                          json={}).status_code, 404)
+        print("✓ Бинарные программы регистрируются с сегментами данных")
+
+@unittest.skipIf(uvm_web is None, "Flask не установлен")
+class TestUVMWebBatch(unittest.TestCase):
+    """Тесты пакетного выполнения"""
+
+    PROGRAM = program_json(("LOAD_CONST", 900), ("SQRT", 950, 2), ("LOAD_CONST", 950),
+                           ("LOAD_MEM", 1))
+
+    def setUp(self):
+        self.client = uvm_web.app.test_client()
+        response = self.client.post('/api/programs', json={'program': self.PROGRAM})
+        self.program_id = response.get_json()['id']
+        self.jobs = [{'program': self.PROGRAM, 'memory': {'900': 1, '901': value * value}}
+                     for value in range(20)]
+        self.jobs += [{'id': self.program_id, 'memory': {'901': 4}},
+                      {'program': self.PROGRAM, 'mode': 'steps'},
+                      {'program': '{"program": [{"opcode": "NOP"}]}'},
+                      {'id': 'missing'}]
+
+    def test_results_in_job_order(self):
+        """Результаты пакета совпадают с отдельными запросами и идут по порядку"""
+        response = self.client.post('/api/batch', json={'jobs': self.jobs}).get_json()
+        results = response['results']
+
+        self.assertFalse(response['success'])
+        self.assertEqual([result['final_acc'] for result in results[:21]],
+                         list(range(20)) + [2])
+        self.assertEqual(results[21], uvm_web.UVMWeb().execute_program(self.PROGRAM))
+        self.assertFalse(results[22]['success'])
+        self.assertIn('missing', results[23]['error'])
+
+        too_many = self.client.post('/api/batch', json={'jobs': [{}] * (uvm_web.MAX_BATCH + 1)})
+        self.assertEqual(too_many.status_code, 400)
+        print("✓ Пакет заданий выполняется одним запросом")
+
+    def test_stream(self):
+        """Потоковая выдача результатов пакета"""
+        expected = self.client.post('/api/batch', json={'jobs': self.jobs}).get_json()['results']
+        response = self.client.post('/api/batch', json={'jobs': self.jobs, 'stream': True})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        self.assertEqual(records[-1], {'type': 'done', 'success': False, 'jobs': len(self.jobs)})
+        jobs = {record.pop('job'): record for record in records[:-1]}
+        self.assertEqual([jobs[index] for index in range(len(self.jobs))],
+                         [{'type': 'job', **result} for result in expected])
+        print("✓ Результаты пакета выдаются потоково")
+
+@unittest.skipIf(uvm_web is None, "Flask не установлен")
+class TestUVMWebSessions(unittest.TestCase):
+    """Тесты сеансов пошагового выполнения"""
+
+    PROGRAM = program_json(("LOAD_CONST", 500), ("SQRT", 800, 3), ("LOAD_CONST", 4),
+                           ("STORE_MEM", 810), ("LOAD_CONST", 800), ("LOAD_MEM", 2))
+
+    def setUp(self):
+        self.client = uvm_web.app.test_client()
+
+    def open(self, program=PROGRAM):
+        response = self.client.post('/api/session', json={'program': program})
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()['session']
+
+    def test_steps_match_full_run(self):
+        """Пошаговое выполнение дает те же шаги и итог, что и /api/execute"""
+        session = self.open()
+        url = f'/api/session/{session}'
+        first = self.client.post(url + '/step').get_json()
+        rest = self.client.post(url + '/step', json={'count': 4}).get_json()
+        last = self.client.post(url + '/run', json={'mode': 'steps'}).get_json()
+
+        expected = uvm_web.UVMWeb().execute_program(self.PROGRAM)
+        self.assertEqual([first['executed'], rest['executed'], last['executed']], [1, 4, 1])
+        self.assertEqual(first['steps'] + rest['steps'] + last['steps'], expected['steps'])
+        self.assertEqual(last['final_acc'], expected['final_acc'])
+        self.assertEqual(last['memory_dump'], expected['memory_dump'])
+        self.assertFalse(rest['finished'])
+        self.assertTrue(last['finished'])
+
+        state = self.client.get(url).get_json()
+        self.assertEqual((state['acc'], state['step'], state['position']), (15, 6, 6))
+        self.assertEqual(self.client.post(url + '/step').get_json()['executed'], 0)
+        self.assertEqual(self.client.post(url + '/step', json={'count': 0}).status_code, 400)
+
+        self.assertEqual(self.client.delete(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        print("✓ Пошаговое выполнение совпадает с полным")
+
+    def test_memory_between_steps(self):
+        """Запрос памяти сеанса между шагами, включая изменения после шага"""
+        session = self.open()
+        url = f'/api/session/{session}'
+        self.client.post(url + '/step', json={'count': 2})
+        first = self.client.post(url + '/memory', json={'ranges': [[800, 820]]}).get_json()
+        self.assertEqual(first['cells'], {'800': 5, '801': 10, '802': 15})
+
+        self.client.post(url + '/step', json={'count': 2})
+        delta = self.client.post(url + '/memory', json={'since_step': first['step']}).get_json()
+        self.assertEqual(delta['cells'], {'810': 4})
+        self.client.delete(url)
+        print("✓ Память сеанса запрашивается между шагами")
+
+    def test_close_while_waiting(self):
+        """Запрос, ожидавший блокировку закрываемого сеанса, получает 404"""
+        session_id = self.open()
+        session = uvm_web.sessions.get(session_id)
+
+        class CloseBeforeLock:
+            """Блокировка сеанса, перед первым получением которой сеанс закрывается"""
+            def __init__(self, lock):
+                self.lock = lock
+                self.pending = True
+
+            def __enter__(self):
+                if self.pending:
+                    self.pending = False
+                    closer = threading.Thread(target=uvm_web.sessions.close, args=(session_id,))
+                    closer.start()
+                    closer.join()
+                return self.lock.__enter__()
+
+            def __exit__(self, *args):
+                return self.lock.__exit__(*args)
+
+        session.lock = CloseBeforeLock(session.lock)
+        response = self.client.post(f'/api/session/{session_id}/step')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(session.closed)
+        self.assertIsNone(uvm_web.sessions.get(session_id))
+        print("✓ Закрытие сеанса во время запроса не ломает ответ")
+
+    def test_limit_and_idle_timeout(self):
+        """Число сеансов ограничено, простаивающие сеансы закрываются"""
+        store = uvm_web.UVMSessionStore(max_sessions=2, idle_timeout=60)
+        with self.assertRaises(ValueError):
+            store.create('{not json')
+        first = store.create(self.PROGRAM)
+        second = store.create(self.PROGRAM)
+        self.assertIsNone(store.create(self.PROGRAM))
+
+        store.sessions[first].last_used -= 120
+        third = store.create(self.PROGRAM)
+        self.assertIsNotNone(third)
+        self.assertIsNone(store.get(first))
+        self.assertIsNotNone(store.get(second))
+
+        # Экземпляр закрытого сеанса сброшен и используется повторно
+        store.get(third).vm.step()
+        self.assertTrue(store.close(third))
+        self.assertEqual(store.spare[-1].memory, uvm_web.UVMWeb().memory)
+        print("✓ Сеансы ограничены по числу и времени простоя")
+
+@unittest.skipIf(uvm_web is None, "Flask не установлен")
+class TestUVMWebStream(unittest.TestCase):
+    """Тесты потоковой выдачи шагов"""
+
+    # 3000 команд: больше нескольких пачек шагов
+    PROGRAM = json.dumps({"program": [
+        {"repeat": 1000, "var": "i", "body": [
+            {"opcode": "LOAD_CONST", "operand": "i"},
+            {"opcode": "STORE_MEM", "operand": "i % 900"},
+            {"opcode": "LOAD_MEM", "operand": 0}]}]})
+
+    def test_stream_matches_execute(self):
+        """Потоковая выдача дает те же шаги и итог, что и /api/execute"""
+        client = uvm_web.app.test_client()
+        response = client.post('/api/execute/stream', json={'program': self.PROGRAM})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        expected = uvm_web.UVMWeb().execute_program(self.PROGRAM)
+        self.assertEqual(records[:-1], expected['steps'])
+        self.assertEqual(records[-1], {'type': 'result', 'success': True,
+                                       'final_acc': expected['final_acc'],
+                                       'memory_dump': expected['memory_dump']})
+        print("✓ Шаги выдаются потоково")
+
+    def wait_free(self, vm_pool, free):
+        for _ in range(100):
+            if vm_pool.free.qsize() == free:
+                break
+            threading.Event().wait(0.05)
+        self.assertEqual(vm_pool.free.qsize(), free)
+
+    def test_disconnect_stops_execution(self):
+        """Отключение клиента прерывает выполнение и возвращает УВМ в пул"""
+        free = uvm_web.stream_pool.free.qsize()
+        stream = uvm_web.stream_execution(self.PROGRAM, uvm_web.stream_pool.acquire(),
+                                          threading.Event())
+        first = next(stream)
+        self.assertEqual(len(first.splitlines()), uvm_web.UVMStepStream.BATCH)
+        stream.close()
+        self.wait_free(uvm_web.stream_pool, free)
+        print("✓ Отключение клиента прерывает выполнение")
+
+    def test_streams_use_own_pool(self):
+        """Непрочитанные потоки не занимают пул остальных запросов"""
+        client = uvm_web.app.test_client()
+        saved, uvm_web.stream_pool = uvm_web.stream_pool, uvm_web.UVMPool(size=2, timeout=0.05)
+        try:
+            free = uvm_web.pool.free.qsize()
+            responses = [client.post('/api/execute/stream', json={'program': self.PROGRAM},
+                                     buffered=False) for _ in range(2)]
+            self.assertEqual(uvm_web.stream_pool.free.qsize(), 0)
+            self.assertEqual(uvm_web.pool.free.qsize(), free)
+
+            # Пул потоков занят: 503 до начала ответа
+            busy = client.post('/api/execute/stream', json={'program': self.PROGRAM})
+            self.assertEqual(busy.status_code, 503)
+
+            # Ответы закрыты без чтения - экземпляры возвращаются
+            for response in responses:
+                response.close()
+            self.wait_free(uvm_web.stream_pool, 2)
+        finally:
+            uvm_web.stream_pool = saved
+        print("✓ Потоки выполняются на отдельном пуле")
+
+@unittest.skipIf(uvm_web is None, "Flask не установлен")
+class TestUVMWebCache(unittest.TestCase):
+    """Тесты кэша ответов API"""
+
+    def setUp(self):
+        self.client = uvm_web.app.test_client()
+
+    def test_repeated_request(self):
+        """Повторный запрос той же программы берется из кэша"""
+        program = {"program": [{"opcode": "LOAD_CONST", "operand": 501},
+                               {"opcode": "SQRT", "operand": 900}]}
+        before = self.client.get('/api/cache').get_json()
+
+        first = self.client.post('/api/execute', json={'program': json.dumps(program)})
+        # Другое форматирование той же программы
+        second = self.client.post('/api/execute',
+                                  json={'program': json.dumps(program, indent=4)})
+
+        self.assertEqual(first.headers['X-UVM-Cache'], 'miss')
+        self.assertEqual(second.headers['X-UVM-Cache'], 'hit')
+        self.assertEqual(first.get_json(), second.get_json())
+        self.assertEqual(second.get_json()['memory_dump']['900'], 10)
+
+        after = self.client.get('/api/cache').get_json()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        print("✓ Повторные запросы берутся из кэша")
+
+    def test_lru_eviction(self):
+        """Вытесняется давно не использованный ответ"""
+        entry = sys.getsizeof('a')
+        cache = uvm_web.UVMResultCache(max_bytes=2 * entry)
+        keys = [cache.key('execute', program_json(("LOAD_CONST", value))) for value in range(3)]
+        self.assertEqual(len(set(keys)), 3)
+        self.assertNotEqual(keys[0], cache.key('assemble', program_json(("LOAD_CONST", 0))))
+        self.assertIsNone(cache.key('execute', '{not json'))
+
+        cache.put(keys[0], 'a')
+        cache.put(keys[1], 'b')
+        self.assertEqual(cache.get(keys[0]), 'a')
+        cache.put(keys[2], 'c')
+
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[0]), 'a')
+        self.assertEqual(cache.stats(), {'hits': 2, 'misses': 1, 'size': 2,
+                                         'bytes': 2 * entry, 'max_bytes': 2 * entry})
+
+        # Большой ответ вытесняет столько маленьких, сколько нужно по размеру
+        cache.put(keys[1], 'b' * (entry + 1))
+        self.assertEqual(cache.stats()['size'], 1)
+        self.assertLessEqual(cache.stats()['bytes'], 2 * entry)
+        self.assertIsNone(cache.get(keys[0]))
+        print("✓ Кэш вытесняет давно не использованные ответы")
+
+@unittest.skipIf(uvm_web is None or not hasattr(os, 'fork'), "Flask или fork недоступны")
+class TestUVMWebServer(unittest.TestCase):
+    """Тесты промышленного запуска с рабочими процессами"""
+
+    def post(self, url, body):
+        request = urllib.request.Request(url, json.dumps(body).encode(),
+                                         {'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.load(response)
+
+    def test_prefork_workers(self):
+        """Рабочие процессы выполняют предзагруженные программы, размер запроса ограничен"""
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        base = os.path.dirname(os.path.abspath(__file__))
+        program = os.path.join(base, 'example4_loop_sqrt.json')
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(base, 'uvm_web.py'), '--mode', 'production',
+             '--server', 'wsgiref', '--port', str(port), '--workers', '2',
+             '--max-request-size', '4096', '--preload', program],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        try:
+            url = f'http://127.0.0.1:{port}'
+            for _ in range(100):
+                try:
+                    urllib.request.urlopen(url + '/api/example', timeout=1).close()
+                    break
+                except OSError:
+                    time.sleep(0.05)
+
+            with open(program, 'rb') as f:
+                vm = uvm_web.UVMWeb()
+                instructions = vm.decode(f.read())
+            program_id = uvm_web.UVMProgramRegistry.program_id(instructions, [])
+            expected = vm.execute_instructions(instructions, [(500, [16])], 'summary')
+            # Запросы распределяются по процессам; программа есть в каждом
+            for _ in range(8):
+                self.assertEqual(self.post(f'{url}/api/programs/{program_id}/execute',
+                                           {'memory': {'500': 16}}), expected)
+
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                self.post(url + '/api/execute', {'program': 'x' * 5000})
+            self.assertEqual(error.exception.code, 413)
+
+            # Состояние процесса не общее: сеансы и регистрация программ отключены
+            for path in ('/api/session', '/api/programs'):
+                with self.assertRaises(urllib.error.HTTPError) as error:
+                    self.post(url + path, {'program': '{"program": []}'})
+                self.assertEqual(error.exception.code, 409)
+        finally:
+            server.terminate()
+            output, _ = server.communicate(timeout=10)
+        self.assertEqual(server.returncode, 0)
+        self.assertIn(program_id, output)
+        self.assertIn('--workers 1', output)
+        print("✓ Prefork сервер обслуживает запросы")
+
+    def test_single_worker_state(self):
+        """С одним рабочим процессом сеансы и регистрация программ доступны"""
+        client = uvm_web.app.test_client()
+        program = {'program': program_json(("LOAD_CONST", 1))}
+        self.assertEqual(uvm_web.app.config['UVM_WORKERS'], 1)
+        self.assertEqual(client.post('/api/programs', json=program).status_code, 201)
+        session = client.post('/api/session', json=program)
+        self.assertEqual(session.status_code, 201)
+        client.delete(f"/api/session/{session.get_json()['session']}")
+        print("✓ Сеансы доступны с одним рабочим процессом")
+
+if __name__ == '__main__':
+    unittest.main()
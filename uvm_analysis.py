@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Статический анализ программ УВМ
+Работает над декодированной программой (список (opcode, operand, count)) без исходного текста
+"""
+
+from typing import List, Optional, Tuple
+
+class UVMAnalyzer:
+    """Анализатор потока данных по ACC и ячейкам памяти"""
+
+    # Коды операций
+    LOAD_MEM = 0
+    SQRT = 2
+    LOAD_CONST = 10
+    STORE_MEM = 14
+    BLOCK_COPY = 4
+    BLOCK_FILL = 5
+    JUMP = 6
+    JUMP_ZERO = 7
+    JUMP_NEG = 8
+
+    JUMP_OPCODES = (JUMP, JUMP_ZERO, JUMP_NEG)
+
+    # Команды линейных программ: срез и разбиение на цепочки
+    # строятся только для программ без переходов
+    KNOWN_OPCODES = (LOAD_MEM, SQRT, LOAD_CONST, STORE_MEM, BLOCK_COPY, BLOCK_FILL)
+
+    # Блочные команды MEM[B+i] = f(MEM[ACC+i]): источник адресуется через ACC
+    SOURCE_BLOCK_OPCODES = (SQRT, BLOCK_COPY)
+
+    def __init__(self, instructions: List[Tuple[int, int, int]], mem_size: int = 65536,
+                 initial_acc: int = 0):
+        """
+        Args:
+            instructions: декодированная программа [(opcode, operand, count), ...]
+            mem_size: размер памяти данных
+            initial_acc: значение ACC перед первой командой
+        """
+        self.instructions = instructions
+        self.mem_size = mem_size
+        self.initial_acc = initial_acc
+
+    def is_supported(self) -> bool:
+        """Линейна ли программа и известны ли анализатору все ее команды"""
+        return all(instr[0] in self.KNOWN_OPCODES for instr in self.instructions)
+
+    def in_memory(self, addr: int, length: int = 1) -> bool:
+        """Попадает ли блок [addr, addr + length) в память"""
+        return 0 <= addr and addr + length <= self.mem_size
+
+    def acc_values(self) -> List[Optional[int]]:
+        """
+        Прямое распространение констант по ACC
+
+        Returns:
+            Для каждой команды - значение ACC перед ее выполнением,
+            если оно известно статически, иначе None
+        """
+        values = []
+        acc = self.initial_acc
+
+        # В точку перехода ACC может прийти с разными значениями
+        targets = {operand for opcode, operand, _ in self.instructions
+                   if opcode in self.JUMP_OPCODES}
+
+        for index, (opcode, operand, _) in enumerate(self.instructions):
+            if index in targets:
+                acc = None
+            values.append(acc)
+
+            if opcode == self.LOAD_CONST:
+                acc = operand
+            elif opcode == self.LOAD_MEM:
+                # Вне диапазона интерпретатор обнуляет ACC, иначе значение из памяти
+                if acc is not None and not (0 <= acc + operand < self.mem_size):
+                    acc = 0
+                else:
+                    acc = None
+
+        return values
+
+    def verify_addresses(self) -> List[bool]:
+        """
+        Статическая проверка адресов обращений к памяти
+
+        Returns:
+            Для каждой команды - True, если все ее обращения к памяти
+            доказуемо попадают в диапазон [0, mem_size)
+        """
+        verified = []
+
+        for (opcode, operand, count), acc in zip(self.instructions, self.acc_values()):
+            if opcode == self.LOAD_CONST:
+                safe = True
+            elif opcode == self.LOAD_MEM:
+                safe = acc is not None and 0 <= acc + operand < self.mem_size
+            elif opcode == self.STORE_MEM:
+                safe = 0 <= operand < self.mem_size
+            elif opcode in self.SOURCE_BLOCK_OPCODES:
+                # Источник по адресу из LOAD_MEM известен только во время выполнения
+                length = count or 1
+                safe = (acc is not None and self.in_memory(acc, length)
+                        and self.in_memory(operand, length))
+            elif opcode == self.BLOCK_FILL:
+                safe = self.in_memory(operand, count or 1)
+            else:
+                safe = False
+            verified.append(safe)
+
+        return verified
+
+    def partition_chains(self) -> List[List[int]]:
+        """
+        Разбиение программы на независимые цепочки команд
+
+        Строится граф зависимостей: каждая команда, использующая ACC,
+        связывается с последней командой, определившей ACC, а все команды,
+        обращающиеся к одной ячейке, связываются между собой. Компоненты
+        связности графа можно выполнять независимо друг от друга.
+
+        Returns:
+            Списки индексов команд каждой цепочки (в порядке первой команды).
+            Если адрес какого-либо обращения неизвестен статически,
+            вся программа образует одну цепочку.
+        """
+        total = len(self.instructions)
+        if total == 0:
+            return []
+        if not self.is_supported():
+            return [list(range(total))]
+
+        parent = list(range(total))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        def union(a: int, b: int):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+        owners = {}          # Адрес -> первая команда, обратившаяся к ячейке
+        acc_def = None       # Последняя команда, определившая ACC
+
+        def touch(index: int, addr: int):
+            if 0 <= addr < self.mem_size:
+                union(index, owners.setdefault(addr, index))
+
+        for index, ((opcode, operand, count), acc) in enumerate(zip(self.instructions,
+                                                                    self.acc_values())):
+            if opcode != self.LOAD_CONST and acc_def is not None:
+                union(index, acc_def)
+
+            if opcode == self.LOAD_CONST:
+                acc_def = index
+            elif opcode == self.LOAD_MEM:
+                if acc is None:
+                    return [list(range(total))]
+                touch(index, acc + operand)
+                acc_def = index
+            elif opcode == self.STORE_MEM:
+                touch(index, operand)
+            elif opcode in self.SOURCE_BLOCK_OPCODES:
+                if acc is None:
+                    return [list(range(total))]
+                length = count or 1
+                if self.in_memory(acc, length) and self.in_memory(operand, length):
+                    for i in range(length):
+                        touch(index, acc + i)
+                        touch(index, operand + i)
+            elif opcode == self.BLOCK_FILL:
+                length = count or 1
+                if self.in_memory(operand, length):
+                    for i in range(length):
+                        touch(index, operand + i)
+
+        chains = {}
+        for index in range(total):
+            chains.setdefault(find(index), []).append(index)
+        return [chains[root] for root in sorted(chains)]
+
+    def backward_slice(self, start: int, end: int) -> List[int]:
+        """
+        Обратный срез программы по диапазону дампа [start, end)
+
+        Returns:
+            Отсортированные индексы команд, которые могут повлиять
+            на содержимое ячеек диапазона
+        """
+        if not self.is_supported():
+            return list(range(len(self.instructions)))
+
+        accs = self.acc_values()
+        live = set(range(max(0, start), min(end, self.mem_size)))
+        live_all = False    # Влиять может любая ячейка (чтение по неизвестному адресу)
+        acc_live = False
+        keep = []
+
+        for index in range(len(self.instructions) - 1, -1, -1):
+            opcode, operand, count = self.instructions[index]
+            acc = accs[index]
+
+            if opcode == self.LOAD_CONST:
+                if acc_live:
+                    keep.append(index)
+                    acc_live = False
+
+            elif opcode == self.LOAD_MEM:
+                if acc_live:
+                    keep.append(index)
+                    # Адрес чтения зависит от ACC, поэтому ACC остается живым
+                    if acc is None:
+                        live_all = True
+                    elif 0 <= acc + operand < self.mem_size:
+                        live.add(acc + operand)
+
+            elif opcode == self.STORE_MEM:
+                if live_all or operand in live:
+                    keep.append(index)
+                    live.discard(operand)
+                    acc_live = True
+
+            elif opcode == self.BLOCK_FILL:
+                targets = range(operand, operand + (count or 1))
+                if live_all or not live.isdisjoint(targets):
+                    keep.append(index)
+                    acc_live = True
+                    if self.in_memory(operand, len(targets)):
+                        live.difference_update(targets)
+
+            elif opcode in self.SOURCE_BLOCK_OPCODES:
+                targets = range(operand, operand + (count or 1))
+                if live_all or not live.isdisjoint(targets):
+                    keep.append(index)
+                    acc_live = True
+                    if acc is None:
+                        live_all = True
+                    elif self.in_memory(acc, len(targets)):
+                        # Запись гарантирована только при корректных адресах
+                        if self.in_memory(operand, len(targets)):
+                            live.difference_update(targets)
+                        live.update(range(acc, acc + len(targets)))
+
+        keep.reverse()
+        return keep
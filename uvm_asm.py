@@ -9,18 +9,67 @@ import json
 import sys
 import argparse
 import os
-from typing import List, Dict
+import re
+import ast
+import math
+import marshal
+import functools
+import itertools
+import zlib
+from array import array
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+
+from uvm_format import (UVMBinaryFormat, VERSION_CLASSIC, VERSION_EXTENDED, FLAG_CHECKSUM,
+                        FLAG_DATA)
 
 class UVMIntermediate:
     """Промежуточное представление команды"""
-    def __init__(self, opcode: int, operand: int, comment: str = ""):
+    def __init__(self, opcode: int, operand: int, comment: str = "", count: int = 0,
+                 symbol: Optional[str] = None):
         self.opcode = opcode  # Поле A
         self.operand = operand  # Поле B
         self.comment = comment
+        self.count = count  # Число элементов векторной команды (байт 3)
+        self.symbol = symbol  # Область данных модуля, от начала которой отсчитан B
     
     def __repr__(self):
+        if self.count:
+            return f"A={self.opcode}, B={self.operand}, N={self.count}  # {self.comment}"
         return f"A={self.opcode}, B={self.operand}  # {self.comment}"
 
+class UVMSymbolRef:
+    """
+    Адрес в области данных модуля до компоновки: символ + смещение
+    
+    В выражениях операндов допускается только прибавление и вычитание
+    целых чисел, а также разность адресов одной области. Смещение
+    в операнде команды должно быть неотрицательным: оно хранится в поле B
+    модуля без знака, поэтому адрес до начала области ("table - 1")
+    не задается даже тогда, когда после компоновки он был бы допустим.
+    """
+    __slots__ = ('symbol', 'offset')
+    
+    def __init__(self, symbol: str, offset: int = 0):
+        self.symbol = symbol
+        self.offset = offset
+    
+    def __add__(self, other):
+        if isinstance(other, int):
+            return UVMSymbolRef(self.symbol, self.offset + other)
+        return NotImplemented
+    
+    __radd__ = __add__
+    
+    def __sub__(self, other):
+        if isinstance(other, int):
+            return UVMSymbolRef(self.symbol, self.offset - other)
+        if isinstance(other, UVMSymbolRef) and other.symbol == self.symbol:
+            return self.offset - other.offset
+        return NotImplemented
+    
+    def __repr__(self):
+        return f"{self.symbol}+{self.offset}"
+
 class UVMAssembler:
     """Ассемблер для УВМ (Этапы 1 и 2)"""
     
@@ -29,19 +78,56 @@ class UVMAssembler:
         'LOAD_CONST': 10,
         'LOAD_MEM': 0,
         'STORE_MEM': 14,
-        'SQRT': 2
+        'SQRT': 2,
+        'BLOCK_COPY': 4,
+        'BLOCK_FILL': 5,
+        'JUMP': 6,
+        'JUMP_ZERO': 7,
+        'JUMP_NEG': 8
     }
     
-    def __init__(self):
+    # Команды, принимающие число элементов в третьем байте
+    VECTOR_COMMANDS = {'SQRT', 'BLOCK_COPY', 'BLOCK_FILL'}
+    MAX_COUNT = 0xFF
+    
+    # Команды перехода: операнд - индекс команды (в модуле - от начала модуля)
+    JUMP_COMMANDS = {'JUMP', 'JUMP_ZERO', 'JUMP_NEG'}
+    
+    # Версия формата перемещаемых модулей (.uvr)
+    MODULE_VERSION = 1
+    
+    # Наибольший операнд (расширенный формат)
+    MAX_OPERAND = UVMBinaryFormat.MAX_OPERANDS[VERSION_EXTENDED]
+    
+    # Размер блока записи бинарного файла
+    WRITE_CHUNK = 1 << 16
+    
+    # Строка текстового формата: [метка:] [КОМАНДА [операнд[, count]]] [; комментарий]
+    # (метка, слитая со словом команды, отделяется при разборе)
+    _TEXT_LINE = re.compile(r'[ \t]*([^\s;]*)[ \t]*([^;,]*)(?:,([^;]*))?(?:;(.*))?')
+    _TEXT_VAR = re.compile(r'\s+var\s*=\s*(\w+)\s*$')
+    
+    def __init__(self, max_commands: Optional[int] = None):
+        """
+        Args:
+            max_commands: наибольшее число команд после разворачивания
+                директив (None - без ограничения; web интерфейс ограничивает
+                программы из запросов)
+        """
         self.intermediate_code: List[UVMIntermediate] = []
+        self.max_commands = max_commands
+        self._budget = 0  # Остаток max_commands при подсчете команд
     
     # === ЭТАП 1: ПАРСИНГ И ПРОМЕЖУТОЧНОЕ ПРЕДСТАВЛЕНИЕ ===
     
-    def parse_json_program(self, json_file: str) -> List[Dict]:
-        """Парсинг JSON программы"""
+    def parse_json_program(self, json_file: str, text: Optional[str] = None) -> List[Dict]:
+        """Парсинг JSON программы (text - уже прочитанное содержимое файла)"""
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if text is None:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            else:
+                data = json.loads(text)
             
             if 'program' not in data:
                 raise ValueError("JSON должен содержать поле 'program'")
@@ -54,33 +140,378 @@ class UVMAssembler:
             print(f"Файл не найден: {json_file}")
             sys.exit(1)
     
+    def parse_program(self, source_file: str) -> List[Dict]:
+        """
+        Парсинг программы в JSON или текстовом формате
+        
+        Формат определяется по содержимому: JSON начинается с '{'.
+        """
+        try:
+            with open(source_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except FileNotFoundError:
+            print(f"Файл не найден: {source_file}")
+            sys.exit(1)
+        
+        if text.lstrip().startswith('{'):
+            return self.parse_json_program(source_file, text)
+        return self.parse_text_program(text)
+    
+    def parse_text_program(self, text: str) -> List[Dict]:
+        """
+        Разбор текстового формата в ту же структуру, что и поле 'program' JSON
+        
+        Одна строка - одна команда; текст разбирается за один проход, строки
+        вида "КОМАНДА число" - без регулярного выражения:
+        
+            ; комментарий
+            loop:                       ; метка
+                LOAD_CONST 520          ; команда с операндом
+                SQRT 600, 10            ; операнд и число элементов
+                JUMP_ZERO end
+            .repeat 10 var=i            ; директива повторения (до .end)
+                STORE_MEM 500 + i
+            .end
+            .range 0, 10, 2 var=j       ; как range() в Python
+            .end
+        
+        Операнды - числа или выражения, как в JSON формате.
+        """
+        program: List[Dict] = []
+        append = program.append
+        blocks = []     # Открытые директивы: (блок, строка директивы)
+        label = None    # Метка, ожидающая следующую команду
+        opcodes = self.OPCODES
+        match_line = self._TEXT_LINE.match
+        
+        for number, line in enumerate(text.split('\n'), 1):
+            code, _, comment = line.partition(';')
+            parts = code.split()
+            if len(parts) == 2 and label is None and parts[0] in opcodes:
+                # Основной случай "КОМАНДА число [; комментарий]" - без регулярного выражения
+                try:
+                    instr = {'opcode': parts[0], 'operand': int(parts[1])}
+                except ValueError:
+                    pass
+                else:
+                    if comment:
+                        instr['comment'] = comment.strip()
+                    append(instr)
+                    continue
+            elif not parts:
+                continue
+            
+            word, operand, count, comment = match_line(line).groups('')
+            if not word:
+                continue
+            
+            if word not in opcodes:
+                if ':' in word:
+                    if label is not None:
+                        append({'label': label})
+                    label, _, word = word.partition(':')
+                    if not label.isidentifier():
+                        raise ValueError(f"Строка {number}: некорректная метка {label!r}")
+                    if not word:
+                        # Команда после метки на той же строке
+                        parts = operand.split(None, 1)
+                        if not parts:
+                            continue
+                        word, operand = parts[0], parts[1] if len(parts) > 1 else ''
+                
+                if word[0] == '.':
+                    if label is not None:
+                        append({'label': label})
+                        label = None
+                    program = self._text_directive(word, f"{operand},{count}" if count else operand,
+                                                   program, blocks, number)
+                    append = program.append
+                    continue
+                
+                if word.upper() not in opcodes:
+                    raise ValueError(f"Строка {number}: неизвестная команда {word}")
+                word = word.upper()
+            
+            instr = {'opcode': word}
+            if operand:
+                try:
+                    instr['operand'] = int(operand)
+                except ValueError:
+                    instr['operand'] = operand.strip()
+            elif count:
+                raise ValueError(f"Строка {number}: пропущен операнд команды {word}")
+            if count:
+                try:
+                    instr['count'] = int(count)
+                except ValueError:
+                    instr['count'] = count.strip()
+            if comment:
+                instr['comment'] = comment.strip()
+            if label is not None:
+                instr['label'] = label
+                label = None
+            append(instr)
+        
+        if label is not None:
+            append({'label': label})
+        if blocks:
+            raise ValueError(f"Строка {blocks[-1][1]}: директива не закрыта .end")
+        return program
+    
+    def _text_directive(self, word: str, args: str, program: List[Dict], blocks: list,
+                        number: int) -> List[Dict]:
+        """Директивы .repeat/.range/.end; возвращает блок, в который идут следующие команды"""
+        directive = word.lower()
+        if directive == '.end':
+            if not blocks:
+                raise ValueError(f"Строка {number}: .end без открытой директивы")
+            return blocks.pop()[0]
+        
+        if directive not in ('.repeat', '.range'):
+            raise ValueError(f"Строка {number}: неизвестная директива {word}")
+        
+        entry = {'body': []}
+        match = self._TEXT_VAR.search(' ' + args)
+        if match:
+            entry['var'] = match.group(1)
+            args = (' ' + args)[:match.start()].strip()
+        
+        bounds = []
+        for bound in args.split(','):
+            try:
+                bounds.append(int(bound))
+            except ValueError:
+                bounds.append(bound.strip())
+        if directive == '.repeat':
+            if len(bounds) != 1:
+                raise ValueError(f"Строка {number}: .repeat принимает одно число повторений")
+            entry['repeat'] = bounds[0]
+        else:
+            entry['range'] = bounds
+        
+        program.append(entry)
+        blocks.append((program, number))
+        return entry['body']
+    
     def translate_to_intermediate(self, program: List[Dict]) -> List[UVMIntermediate]:
         """Трансляция в промежуточное представление (Этап 1)"""
-        intermediate = []
+        return list(self.iter_intermediate(program))
+    
+    def iter_intermediate(self, program: List[Dict],
+                          symbols: Iterable[str] = ()) -> Iterator[UVMIntermediate]:
+        """
+        Потоковая трансляция в промежуточное представление
+        
+        Директивы repeat/range разворачиваются по мере чтения,
+        без построения развернутой программы в памяти.
+        
+        Args:
+            program: команды программы
+            symbols: имена областей данных модуля; операнды, отсчитанные
+                от них, получают поле symbol и дозаполняются компоновщиком
+        """
+        counter = itertools.count(1)
+        env = self.resolve_labels(program)
+        for name in symbols:
+            if name in env:
+                raise ValueError(f"Имя {name} используется и как метка, и как область данных")
+            env[name] = UVMSymbolRef(name)
+        return self._expand(program, env, counter)
+    
+    def resolve_labels(self, program: List[Dict]) -> Dict[str, int]:
+        """
+        Вычисление адресов меток (индексов команд)
+        
+        Метка - элемент {"label": "loop"} или поле "label" команды; в операндах
+        переходов она используется как переменная: {"opcode": "JUMP", "operand": "loop"}.
+        """
+        labels: Dict[str, int] = {}
+        self._budget = self.max_commands
+        self._count_commands(program, {}, labels, 0)
+        return labels
+    
+    def _charge(self, amount: int):
+        """
+        Учет развернутых команд и итераций циклов при подсчете команд
         
-        for i, instr in enumerate(program):
+        Итерации учитываются, чтобы ограничение действовало и на циклы,
+        не порождающие команд.
+        """
+        if self.max_commands is None:
+            return
+        self._budget -= amount
+        if self._budget < 0:
+            self._too_many_commands()
+    
+    def _too_many_commands(self):
+        raise ValueError(f"Программа разворачивается больше чем в {self.max_commands} команд")
+    
+    def _count_commands(self, program: List[Dict], env: Dict[str, int],
+                        labels: Dict[str, int], position: int) -> int:
+        """Подсчет команд блока без разворачивания операндов; возвращает позицию после блока"""
+        for instr in program:
+            if 'repeat' in instr or 'range' in instr:
+                var = instr.get('var', 'i')
+                body = instr.get('body', [])
+                values = self._loop_values(instr, env)
+                if not any('repeat' in item or 'range' in item or 'label' in item for item in body):
+                    # Плоское тело: длина не зависит от значения переменной
+                    commands = len(values) * sum('opcode' in item for item in body)
+                    self._charge(max(commands, len(values)))
+                    position += commands
+                    continue
+                self._charge(len(values))
+                for value in values:
+                    position = self._count_commands(body, {**env, var: value}, labels, position)
+                continue
+            
+            if 'label' in instr:
+                name = instr['label']
+                if not (isinstance(name, str) and name.isidentifier()):
+                    raise ValueError(f"Некорректное имя метки: {name!r}")
+                if name in labels:
+                    raise ValueError(f"Метка {name} определена повторно")
+                labels[name] = position
+            if 'opcode' in instr:
+                self._charge(1)
+                position += 1
+        
+        return position
+    
+    def _expand(self, program: List[Dict], env: Dict[str, int],
+                counter: Iterator[int]) -> Iterator[UVMIntermediate]:
+        """Разворачивание блока команд при заданных значениях переменных"""
+        for instr in program:
+            if 'repeat' in instr or 'range' in instr:
+                yield from self._expand_loop(instr, env, counter)
+                continue
+            if 'opcode' not in instr and 'label' in instr:
+                continue
+            
+            number = next(counter)
+            if self.max_commands is not None and number > self.max_commands:
+                self._too_many_commands()
             mnemonic = instr.get('opcode', '').upper()
             
             if mnemonic not in self.OPCODES:
                 raise ValueError(f"Неизвестная команда: {mnemonic}")
             
             opcode = self.OPCODES[mnemonic]
+            # Числовые операнды (основной случай) - без вызова evaluate_operand
             operand = instr.get('operand', 0)
-            comment = instr.get('comment', f'команда {i+1}')
+            if type(operand) is not int:
+                operand = self.evaluate_operand(operand, env)
+            comment = instr.get('comment', f'команда {number}')
+            count = instr.get('count', 0)
+            if type(count) is not int:
+                count = self.evaluate_operand(count, env)
             
-            # Проверка диапазонов операндов
-            if mnemonic in ['LOAD_CONST', 'LOAD_MEM']:
-                # 13 бит: 0-8191
-                if not (0 <= operand <= 8191):
-                    print(f"Предупреждение: операнд {operand} выходит за 13-битный диапазон")
-            else:
-                # 12 бит: 0-4095
-                if not (0 <= operand <= 4095):
-                    print(f"Предупреждение: операнд {operand} выходит за 12-битный диапазон")
+            symbol = None
+            if isinstance(operand, UVMSymbolRef):
+                if mnemonic in self.JUMP_COMMANDS:
+                    raise ValueError(f"Переход {mnemonic} на адрес данных {operand.symbol}")
+                symbol, operand = operand.symbol, operand.offset
+                if operand < 0:
+                    raise ValueError(f"Отрицательное смещение {operand} от начала области "
+                                     f"{symbol}: адрес до начала области не поддерживается")
+            if not isinstance(count, int):
+                raise ValueError(f"Число элементов команды {mnemonic} зависит от адреса данных")
+            
+            if count and mnemonic not in self.VECTOR_COMMANDS:
+                raise ValueError(f"Команда {mnemonic} не поддерживает поле count")
+            if not (0 <= count <= self.MAX_COUNT):
+                raise ValueError(f"Число элементов {count} вне диапазона 0-{self.MAX_COUNT}")
             
-            intermediate.append(UVMIntermediate(opcode, operand, comment))
+            # Проверка диапазона операнда: 12 бит в классическом формате,
+            # 20 бит в расширенном (выбирается при кодировании)
+            if not (0 <= operand <= self.MAX_OPERAND):
+                raise ValueError(f"Операнд {operand} команды {mnemonic} вне диапазона "
+                                 f"0-{self.MAX_OPERAND}")
+            
+            yield UVMIntermediate(opcode, operand, comment, count, symbol)
+    
+    def _expand_loop(self, directive: Dict, env: Dict[str, int],
+                     counter: Iterator[int]) -> Iterator[UVMIntermediate]:
+        """
+        Разворачивание директивы повторения
         
-        return intermediate
+        {"repeat": N, "var": "i", "body": [...]}              - i = 0..N-1
+        {"range": [start, stop, step], "var": "i", "body": [...]} - как range() в Python
+        """
+        values = self._loop_values(directive, env)
+        var = directive.get('var', 'i')
+        body = directive.get('body', [])
+        
+        for value in values:
+            yield from self._expand(body, {**env, var: value}, counter)
+    
+    def _loop_values(self, directive: Dict, env: Dict[str, int]) -> range:
+        """Значения переменной директивы повторения"""
+        if 'repeat' in directive:
+            bounds = [directive['repeat']]
+        else:
+            bounds = directive['range']
+            if not isinstance(bounds, list):
+                bounds = [bounds]
+        
+        if not 1 <= len(bounds) <= 3:
+            raise ValueError(f"Некорректные границы цикла: {bounds}")
+        
+        values = [self.evaluate_operand(bound, env) for bound in bounds]
+        if not all(isinstance(value, int) for value in values):
+            raise ValueError(f"Границы цикла зависят от адреса данных: {bounds}")
+        loop = range(*values)
+        try:
+            len(loop)
+        except OverflowError:
+            # Длина range больше sys.maxsize
+            raise ValueError(f"Слишком много итераций цикла: {bounds}") from None
+        return loop
+    
+    # Допустимые узлы выражений в операндах
+    _EXPR_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+                   ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.Mod, ast.USub, ast.UAdd)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _compile_operand(operand: str):
+        """
+        Проверка и компиляция выражения операнда
+        
+        Кэш ограничен: операнды web интерфейса приходят из запросов.
+        """
+        try:
+            tree = ast.parse(operand.strip(), mode='eval')
+        except SyntaxError:
+            raise ValueError(f"Некорректное выражение операнда: {operand!r}")
+        for node in ast.walk(tree):
+            if not isinstance(node, UVMAssembler._EXPR_NODES) or \
+                    (isinstance(node, ast.Constant) and not isinstance(node.value, int)):
+                raise ValueError(f"Недопустимое выражение операнда: {operand!r}")
+        return compile(tree, '<operand>', 'eval')
+    
+    def evaluate_operand(self, operand, env: Dict[str, int]) -> int:
+        """
+        Вычисление операнда
+        
+        Операнд - целое число или выражение с переменными циклов,
+        например "500 + i" или "2 * i + 1".
+        """
+        if isinstance(operand, int):
+            return operand
+        if not isinstance(operand, str):
+            raise ValueError(f"Некорректный операнд: {operand!r}")
+        
+        code = self._compile_operand(operand)
+        try:
+            return eval(code, {'__builtins__': {}}, env)
+        except NameError as e:
+            raise ValueError(f"Неизвестная переменная в операнде {operand!r}: {e}")
+        except ZeroDivisionError:
+            raise ValueError(f"Деление на ноль в операнде {operand!r}") from None
+        except TypeError:
+            # Адрес области данных умножен, поделен или сложен с другим адресом
+            raise ValueError(f"Недопустимое использование адреса данных в операнде {operand!r}")
     
     def display_intermediate(self, intermediate: List[UVMIntermediate]):
         """Вывод промежуточного представления (режим тестирования)"""
@@ -93,36 +524,86 @@ class UVMAssembler:
     
     # === ЭТАП 2: ГЕНЕРАЦИЯ МАШИННОГО КОДА ===
     
-    def encode_command(self, cmd: UVMIntermediate) -> bytes:
-        """Кодирование одной команды в 3 байта"""
-        # Формат: [AAAA BBBB] [BBBB BBBB] [BBBB BBBB]
-        # A: 4 бита, B: 12-13 бит
+    def encode_command(self, cmd: UVMIntermediate, fmt: Optional[UVMBinaryFormat] = None) -> bytes:
+        """Кодирование одной команды в 3 байта (в расширенном формате - в 4)"""
+        # Формат: [AAAA BBBB] [BBBB BBBB] [NNNN NNNN]
+        # A: 4 бита, B: 12 бит (в расширенном формате - 20 бит)
         
         # ПРАВИЛЬНЫЙ РАСЧЕТ:
         # byte1 = (opcode << 4) | ((operand >> 8) & 0x0F)
         # byte2 = operand & 0xFF
-        # byte3 = 0
-        
-        byte1 = (cmd.opcode << 4) | ((cmd.operand >> 8) & 0x0F)
-        byte2 = cmd.operand & 0xFF
-        byte3 = 0
+        # byte3 = count (число элементов векторной команды, 0 - скалярная)
         
-        return bytes([byte1, byte2, byte3])
+        return (fmt or UVMBinaryFormat()).encode(cmd.opcode, cmd.operand, cmd.count)
     
-    def encode_to_binary(self, intermediate: List[UVMIntermediate], output_file: str) -> int:
-        """Кодирование промежуточного представления в бинарный файл"""
-        binary_data = bytearray()
+    def encode_to_binary(self, intermediate: Iterable[UVMIntermediate], output_file: str,
+                         fmt: Optional[UVMBinaryFormat] = None, checksum: bool = False,
+                         data: Optional[Dict[int, int]] = None) -> int:
+        """
+        Кодирование промежуточного представления в бинарный файл
         
-        for cmd in intermediate:
-            cmd_bytes = self.encode_command(cmd)
-            binary_data.extend(cmd_bytes)
+        Принимает любой итерируемый источник команд; запись идет блоками,
+        поэтому развернутые директивами программы не хранятся в памяти целиком.
+        
+        Без явного формата программа записывается в классическом формате
+        (3 байта, без заголовка); при первом операнде, не помещающемся
+        в 12 бит, уже записанная часть перекодируется в расширенный формат.
+        С checksum в заголовок записываются число команд и CRC32 кода.
+        С data записывается объектный файл: перед кодом - сегменты
+        начальной памяти {адрес: значение}, загружаемые интерпретатором
+        вместе с программой.
+        """
+        auto = fmt is None
+        flags = (fmt.flags if fmt else 0) | (FLAG_CHECKSUM if checksum else 0)
+        segments = b''
+        if data:
+            flags |= FLAG_DATA
+            segments = UVMBinaryFormat.pack_segments(UVMBinaryFormat.segments_from_memory(data))
+        fmt = UVMBinaryFormat(fmt.version if fmt else VERSION_CLASSIC, flags)
+        binary_data = bytearray(fmt.header() + segments)
+        count = 0
         
-        # Запись в файл
-        with open(output_file, 'wb') as f:
+        with open(output_file, 'w+b') as f:
+            for cmd in intermediate:
+                if auto and cmd.operand > fmt.max_operand and fmt.version == VERSION_CLASSIC:
+                    print(f"Операнд {cmd.operand} не помещается в 12 бит: "
+                          f"программа записывается в расширенном формате")
+                    extended = UVMBinaryFormat(VERSION_EXTENDED, fmt.flags)
+                    binary_data = self._reencode(f, binary_data, fmt, extended, segments)
+                    fmt = extended
+                
+                binary_data += fmt.encode(cmd.opcode, cmd.operand, cmd.count)
+                count += 1
+                
+                if len(binary_data) >= self.WRITE_CHUNK:
+                    f.write(binary_data)
+                    binary_data.clear()
+            
             f.write(binary_data)
+            size = f.tell()
+            
+            if fmt.flags & FLAG_CHECKSUM:
+                # Контрольная сумма считается по записанным сегментам и коду блоками
+                f.seek(fmt.header_size)
+                crc = 0
+                for chunk in iter(lambda: f.read(self.WRITE_CHUNK), b''):
+                    crc = zlib.crc32(chunk, crc)
+                f.seek(0)
+                f.write(fmt.header(count, crc & 0xFFFFFFFF))
+            
+            return size
+    
+    def _reencode(self, f, pending: bytearray, old: UVMBinaryFormat,
+                  new: UVMBinaryFormat, segments: bytes = b'') -> bytearray:
+        """Перекодирование уже сформированной части файла в другой формат"""
+        f.write(pending)
+        f.seek(0)
+        data = f.read()
+        f.seek(0)
+        f.truncate()
         
-        size = len(binary_data)
-        return size
+        code = data[old.header_size + len(segments):]
+        return bytearray(new.header() + segments + new.encode_program(old.decode(code)))
     
     def display_binary(self, binary_file: str):
         """Вывод бинарного файла в байтовом формате"""
@@ -132,16 +613,25 @@ class UVMAssembler:
         print("Байтовое представление программы:")
         print("-" * 50)
         
-        # Вывод по 3 байта (одна команда)
-        for i in range(0, len(data), 3):
-            cmd_bytes = data[i:i+3]
-            if len(cmd_bytes) == 3:
-                hex_str = ' '.join(f'{b:02X}' for b in cmd_bytes)
-                print(f"Команда {i//3}: {hex_str}")
+        fmt, offset = UVMBinaryFormat.detect(data)
+        if offset:
+            print(f"Заголовок: версия {fmt.version}, флаги {fmt.flags:#04x}")
+        if fmt.checksum is not None:
+            print(f"Команд: {fmt.count}, CRC32: {fmt.checksum:08X}")
+        for base, _, length in fmt.segments:
+            print(f"Сегмент данных: адреса {base}..{base + length - 1} ({length} слов)")
+        
+        # Вывод по одной команде (3 байта, в расширенном формате - 4,
+        # в компактном - от 1 до 5)
+        code = data[offset:]
+        offsets = fmt.offsets(code)
+        for i in range(len(offsets) - 1):
+            hex_str = ' '.join(f'{b:02X}' for b in code[offsets[i]:offsets[i + 1]])
+            print(f"Команда {i}: {hex_str}")
         
         print("-" * 50)
         print(f"Всего байт: {len(data)}")
-        print(f"Всего команд: {len(data) // 3}")
+        print(f"Всего команд: {len(offsets) - 1}")
     
     # === ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ===
     
@@ -149,11 +639,14 @@ class UVMAssembler:
         """Сохранение промежуточного представления в файл"""
         data = []
         for cmd in intermediate:
-            data.append({
+            entry = {
                 'A': cmd.opcode,
                 'B': cmd.operand,
                 'comment': cmd.comment
-            })
+            }
+            if cmd.count:
+                entry['N'] = cmd.count
+            data.append(entry)
         
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
@@ -163,10 +656,11 @@ class UVMAssembler:
     # === ОСНОВНОЙ МЕТОД АССЕМБЛИРОВАНИЯ ===
     
     def assemble(self, input_file: str, output_file: str = None, 
-                 test_mode: bool = False, binary_mode: bool = False):
+                 test_mode: bool = False, binary_mode: bool = False, compact: bool = False,
+                 checksum: bool = False, data: Optional[Dict[int, int]] = None):
         """Основной метод ассемблирования"""
         # 1. Парсинг JSON
-        program = self.parse_json_program(input_file)
+        program = self.parse_program(input_file)
         
         # 2. Трансляция в промежуточное представление
         intermediate = self.translate_to_intermediate(program)
@@ -180,8 +674,10 @@ class UVMAssembler:
                 print("Байтовое представление команд:")
                 print("-" * 30)
                 
+                fmt = UVMBinaryFormat.compact() if compact else UVMBinaryFormat.for_program(
+                    (cmd.opcode, cmd.operand, cmd.count) for cmd in intermediate)
                 for i, cmd in enumerate(intermediate):
-                    cmd_bytes = self.encode_command(cmd)
+                    cmd_bytes = self.encode_command(cmd, fmt)
                     hex_str = ' '.join(f'{b:02X}' for b in cmd_bytes)
                     print(f"Команда {i}: {hex_str}  # A={cmd.opcode}, B={cmd.operand}")
                 
@@ -212,7 +708,9 @@ class UVMAssembler:
         if output_file:
             if binary_mode:
                 # Этап 2: Генерация бинарного файла
-                size = self.encode_to_binary(intermediate, output_file)
+                size = self.encode_to_binary(intermediate, output_file,
+                                             UVMBinaryFormat.compact() if compact else None,
+                                             checksum, data)
                 print(f"\nБинарный файл создан: {output_file}")
                 print(f"Размер файла: {size} байт")
                 
@@ -223,6 +721,465 @@ class UVMAssembler:
                 self.save_intermediate(intermediate, output_file)
         
         return intermediate
+    
+    def assemble_stream(self, input_file: str, output_file: str, compact: bool = False,
+                        checksum: bool = False, data: Optional[Dict[int, int]] = None) -> int:
+        """
+        Потоковое ассемблирование в бинарный файл
+        
+        Команды разворачиваются и кодируются по одной, поэтому размер
+        программы после развертывания директив не ограничен памятью.
+        С data записывается объектный файл с сегментами начальной памяти.
+        """
+        program = self.parse_program(input_file)
+        size = self.encode_to_binary(self.iter_intermediate(program), output_file,
+                                     UVMBinaryFormat.compact() if compact else None, checksum,
+                                     data)
+        
+        print(f"\nБинарный файл создан: {output_file}")
+        print(f"Размер файла: {size} байт")
+        
+        return size
+    
+    # === ПЕРЕМЕЩАЕМЫЕ МОДУЛИ ===
+    
+    def parse_data_regions(self, source: Dict) -> Dict[str, Tuple[int, List[int]]]:
+        """
+        Разбор областей данных модуля
+        
+        Область задается размером ("buf": 10), начальными значениями
+        ("table": [1, 2, 3]) или тем и другим ("vec": {"size": 10, "values": [25, 64]}).
+        
+        Returns:
+            {имя: (размер, начальные значения первых ячеек)}
+        """
+        regions = {}
+        for name, spec in source.get('data', {}).items():
+            if not name.isidentifier():
+                raise ValueError(f"Некорректное имя области данных: {name!r}")
+            if isinstance(spec, int):
+                size, values = spec, []
+            elif isinstance(spec, list):
+                size, values = len(spec), spec
+            elif isinstance(spec, dict):
+                values = spec.get('values', [])
+                size = spec.get('size', len(values))
+            else:
+                raise ValueError(f"Некорректное описание области данных {name}: {spec!r}")
+            
+            if not (isinstance(size, int) and 0 < size and len(values) <= size
+                    and all(isinstance(value, int) for value in values)):
+                raise ValueError(f"Некорректное описание области данных {name}: {spec!r}")
+            regions[name] = (size, list(values))
+        return regions
+    
+    def build_module(self, source: Dict) -> Dict:
+        """
+        Ассемблирование исходного текста модуля в перемещаемый модуль
+        
+        Модуль - программа ("program") с собственными областями данных
+        ("data") и ссылками на области других модулей ("extern").
+        Адреса областей неизвестны до компоновки, поэтому для каждой
+        команды, ссылающейся на область или выполняющей переход, записывается
+        перемещение: индексы команд хранятся упакованными (array 'I') по имени
+        области, для переходов - под ключом None. Код хранится в расширенном
+        формате без заголовка: компоновщик дозаполняет операнды прямо
+        в 4-байтовых командах.
+        """
+        if 'program' not in source:
+            raise ValueError("JSON должен содержать поле 'program'")
+        
+        regions = self.parse_data_regions(source)
+        extern = list(source.get('extern', []))
+        for name in extern:
+            if name in regions:
+                raise ValueError(f"Область {name} объявлена и в data, и в extern")
+        
+        jump_opcodes = {self.OPCODES[name] for name in self.JUMP_COMMANDS}
+        instructions = []
+        relocations: Dict[Optional[str], array] = {}
+        for index, cmd in enumerate(self.iter_intermediate(source['program'],
+                                                           list(regions) + extern)):
+            instructions.append((cmd.opcode, cmd.operand, cmd.count))
+            if cmd.symbol is not None or cmd.opcode in jump_opcodes:
+                relocations.setdefault(cmd.symbol, array('I')).append(index)
+        
+        code = UVMBinaryFormat(VERSION_EXTENDED).encode_program(instructions)
+        return {'version': self.MODULE_VERSION, 'code': code, 'count': len(instructions),
+                'relocations': {symbol: indices.tobytes()
+                                for symbol, indices in relocations.items()},
+                'data': regions, 'extern': extern}
+    
+    def assemble_module(self, input_file: str, output_file: str) -> Dict:
+        """
+        Ассемблирование модуля в файл перемещаемого модуля (.uvr)
+        
+        В модуле сохраняется CRC32 исходного текста: компоновщик
+        пересобирает только модули, исходный текст которых изменился.
+        """
+        try:
+            with open(input_file, 'rb') as f:
+                source = f.read()
+            module = self.build_module(json.loads(source))
+        except json.JSONDecodeError as e:
+            print(f"Ошибка парсинга JSON: {e}")
+            sys.exit(1)
+        except FileNotFoundError:
+            print(f"Файл не найден: {input_file}")
+            sys.exit(1)
+        
+        module['source'] = zlib.crc32(source) & 0xFFFFFFFF
+        
+        temp_file = f"{output_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as f:
+            marshal.dump(module, f)
+        os.replace(temp_file, output_file)
+        
+        print(f"Модуль {input_file}: {module['count']} команд, "
+              f"{sum(len(indices) // 4 for indices in module['relocations'].values())} "
+              f"перемещений, "
+              f"{len(module['data'])} областей данных → {output_file}")
+        return module
+    
+    # === ЧАСТИЧНОЕ ВЫЧИСЛЕНИЕ (AOT) ===
+    
+    def load_init_memory(self, json_file: str) -> Dict[int, int]:
+        """Загрузка начальной памяти из JSON файла {адрес: значение}"""
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {int(k): v for k, v in data.items()}
+    
+    def partial_evaluate(self, intermediate: List[UVMIntermediate],
+                         init_memory: Dict[int, int],
+                         inputs: Iterable[int] = ()) -> Tuple[List[UVMIntermediate], Dict[int, int]]:
+        """
+        Частичное вычисление программы при известной начальной памяти
+        
+        Args:
+            intermediate: промежуточное представление программы
+            init_memory: известная начальная память {адрес: значение}
+            inputs: адреса ячеек, значения которых станут известны только при запуске
+            
+        Returns:
+            Кортеж (остаточная программа, статически известная итоговая память)
+        """
+        evaluator = UVMPartialEvaluator(init_memory, inputs)
+        residual = evaluator.evaluate(intermediate)
+        return residual, evaluator.final_memory()
+    
+    def save_memory_image(self, image: Dict[int, int], output_file: str):
+        """Сохранение образа памяти в формате дампа интерпретатора"""
+        dump = {str(addr): image[addr] for addr in sorted(image) if image[addr] != 0}
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(dump, f, indent=2, ensure_ascii=False)
+        
+        print(f"Образ памяти сохранен в: {output_file} ({len(dump)} ненулевых значений)")
+    
+    def save_program(self, intermediate: List[UVMIntermediate], output_file: str):
+        """Сохранение программы в исходном JSON формате (пригодном для ассемблирования)"""
+        mnemonics = {code: name for name, code in self.OPCODES.items()}
+        program = []
+        for cmd in intermediate:
+            entry = {'opcode': mnemonics[cmd.opcode], 'operand': cmd.operand}
+            if cmd.count:
+                entry['count'] = cmd.count
+            entry['comment'] = cmd.comment
+            program.append(entry)
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': '1.0', 'program': program}, f, indent=2, ensure_ascii=False)
+        
+        print(f"Программа сохранена в: {output_file}")
+    
+    def assemble_partial(self, input_file: str, init_file: str, output_file: str,
+                         inputs: Iterable[int] = (), binary_mode: bool = False,
+                         compact: bool = False, checksum: bool = False):
+        """
+        Ассемблирование с частичным вычислением
+        
+        Без входных ячеек программа вычисляется полностью и в output_file
+        записывается итоговый образ памяти. Иначе записывается остаточная
+        программа, содержащая только вычисления, зависящие от входных данных.
+        """
+        program = self.parse_program(input_file)
+        intermediate = self.translate_to_intermediate(program)
+        self.intermediate_code = intermediate
+        
+        inputs = sorted(set(inputs))
+        residual, image = self.partial_evaluate(intermediate, self.load_init_memory(init_file), inputs)
+        
+        print(f"Частичное вычисление: {len(intermediate)} команд → {len(residual)} команд")
+        
+        if not inputs:
+            self.save_memory_image(image, output_file)
+        elif binary_mode:
+            size = self.encode_to_binary(residual, output_file,
+                                         UVMBinaryFormat.compact() if compact else None,
+                                         checksum)
+            print(f"Остаточная программа: {output_file} ({size} байт)")
+        else:
+            self.save_program(residual, output_file)
+        
+        return residual
+
+class UVMPartialEvaluator:
+    """
+    Частичный вычислитель программ УВМ
+    
+    При известной начальной памяти программу можно выполнить на этапе
+    сборки; переходы с известным условием выполняются сразу, так что
+    остаточная программа линейна. Ячейки-входы считаются
+    неизвестными; все команды, зависящие от них, переносятся в остаточную
+    программу, а статически вычисленные значения записываются в нее
+    парами LOAD_CONST/STORE_MEM только там, где они действительно нужны.
+    """
+    
+    LOAD_CONST = UVMAssembler.OPCODES['LOAD_CONST']
+    LOAD_MEM = UVMAssembler.OPCODES['LOAD_MEM']
+    STORE_MEM = UVMAssembler.OPCODES['STORE_MEM']
+    SQRT = UVMAssembler.OPCODES['SQRT']
+    BLOCK_COPY = UVMAssembler.OPCODES['BLOCK_COPY']
+    BLOCK_FILL = UVMAssembler.OPCODES['BLOCK_FILL']
+    JUMP = UVMAssembler.OPCODES['JUMP']
+    JUMP_ZERO = UVMAssembler.OPCODES['JUMP_ZERO']
+    JUMP_NEG = UVMAssembler.OPCODES['JUMP_NEG']
+    
+    # Максимальная константа, которую можно закодировать в LOAD_CONST
+    MAX_CONST = UVMAssembler.MAX_OPERAND
+    
+    # Ограничение на число абстрактно выполняемых команд (как в интерпретаторе)
+    MAX_STEPS = 10000
+    
+    def __init__(self, init_memory: Dict[int, int], inputs: Iterable[int] = (),
+                 mem_size: int = 65536):
+        self.mem_size = mem_size
+        self.inputs = set(inputs)
+        
+        # Абстрактная память: известные значения и неизвестные (динамические) ячейки
+        self.known = {addr: value for addr, value in init_memory.items()
+                      if 0 <= addr < mem_size and addr not in self.inputs}
+        self.dynamic = set(self.inputs)
+        
+        # Содержимое памяти остаточной программы, известное статически
+        self.shadow = dict(self.known)
+        self.shadow_dynamic = set(self.inputs)
+        
+        # Статические записи, еще не перенесенные в остаточную программу
+        self.pending: Dict[int, int] = {}
+        
+        self.acc: Optional[int] = 0           # None - значение известно только при выполнении
+        self.residual_acc: Optional[int] = 0  # Значение ACC остаточной программы
+        self.residual: List[UVMIntermediate] = []
+    
+    # === АБСТРАКТНАЯ ПАМЯТЬ ===
+    
+    def _read(self, addr: int) -> Optional[int]:
+        if addr in self.dynamic:
+            return None
+        return self.known.get(addr, 0)
+    
+    def _write_static(self, addr: int, value: int):
+        self.known[addr] = value
+        self.dynamic.discard(addr)
+        self.pending[addr] = value
+    
+    def _write_dynamic(self, addr: int):
+        self.known.pop(addr, None)
+        self.dynamic.add(addr)
+        self.pending.pop(addr, None)
+        self.shadow_dynamic.add(addr)
+    
+    def _write_emitted(self, addr: int, value: int):
+        """Запись известного значения командой остаточной программы"""
+        self.known[addr] = value
+        self.dynamic.discard(addr)
+        self.pending.pop(addr, None)
+        self.shadow[addr] = value
+        self.shadow_dynamic.discard(addr)
+    
+    # === ГЕНЕРАЦИЯ ОСТАТОЧНОЙ ПРОГРАММЫ ===
+    
+    def _emit(self, opcode: int, operand: int, comment: str, count: int = 0):
+        self.residual.append(UVMIntermediate(opcode, operand, comment, count))
+    
+    def _emit_acc(self, value: int):
+        """Установка ACC остаточной программы в статически известное значение"""
+        if self.residual_acc == value:
+            return
+        if not (0 <= value <= self.MAX_CONST):
+            raise ValueError(f"Значение {value} нельзя закодировать в LOAD_CONST")
+        self._emit(self.LOAD_CONST, value, f"ACC = {value}")
+        self.residual_acc = value
+    
+    def _flush(self, addresses: Optional[Iterable[int]] = None):
+        """Перенос отложенных статических записей (всех или указанных) в остаточную программу"""
+        if addresses is None:
+            addresses = sorted(self.pending)
+        
+        for addr in addresses:
+            if addr not in self.pending:
+                continue
+            value = self.pending.pop(addr)
+            if addr not in self.shadow_dynamic and self.shadow.get(addr, 0) == value:
+                continue
+            self._emit_acc(value)
+            self._emit(self.STORE_MEM, addr, f"статическое значение MEM[{addr}] = {value}")
+            self.shadow[addr] = value
+            self.shadow_dynamic.discard(addr)
+    
+    def _in_memory(self, addr: int, length: int) -> bool:
+        return 0 <= addr and addr + length <= self.mem_size
+    
+    def _map_block(self, cmd: UVMIntermediate, func):
+        """
+        Блочная команда с источником по адресу ACC: MEM[B+i] = func(MEM[ACC+i])
+        
+        Все источники читаются до записи результатов, как в интерпретаторе.
+        """
+        length = cmd.count or 1
+        if self.acc is None:
+            self._emit(cmd.opcode, cmd.operand, cmd.comment, cmd.count)
+            for addr in range(cmd.operand, cmd.operand + length):
+                if 0 <= addr < self.mem_size:
+                    self._write_dynamic(addr)
+            return
+        
+        src_addr, dst_addr = self.acc, cmd.operand
+        if not (self._in_memory(src_addr, length) and self._in_memory(dst_addr, length)):
+            return
+        
+        values = [self._read(src_addr + i) for i in range(length)]
+        results = [None if value is None else func(value) for value in values]
+        
+        if None not in results:
+            for i, result in enumerate(results):
+                self._write_static(dst_addr + i, result)
+            return
+        
+        self._flush(range(src_addr, src_addr + length))
+        self._emit_acc(src_addr)
+        self._emit(cmd.opcode, cmd.operand, cmd.comment, cmd.count)
+        for i, result in enumerate(results):
+            if result is None:
+                self._write_dynamic(dst_addr + i)
+            else:
+                self._write_emitted(dst_addr + i, result)
+    
+    # === ВЫЧИСЛЕНИЕ ===
+    
+    def step(self, cmd: UVMIntermediate):
+        """Абстрактное выполнение одной команды"""
+        opcode, operand = cmd.opcode, cmd.operand
+        
+        if opcode == self.LOAD_CONST:
+            self.acc = operand
+        
+        elif opcode == self.LOAD_MEM:
+            if self.acc is None:
+                # Адрес зависит от входных данных; отложенных записей здесь нет
+                self._emit(opcode, operand, cmd.comment)
+                return
+            
+            addr = self.acc + operand
+            if not (0 <= addr < self.mem_size):
+                self.acc = 0
+                return
+            
+            value = self._read(addr)
+            if value is not None:
+                self.acc = value
+                return
+            
+            # Чтение входной ячейки: пока ACC динамический, записи не откладываются
+            self._flush()
+            self._emit_acc(self.acc)
+            self._emit(opcode, operand, cmd.comment)
+            self.acc = None
+            self.residual_acc = None
+        
+        elif opcode == self.STORE_MEM:
+            if not (0 <= operand < self.mem_size):
+                return
+            
+            if self.acc is None:
+                self._emit(opcode, operand, cmd.comment)
+                self._write_dynamic(operand)
+            else:
+                self._write_static(operand, self.acc)
+        
+        elif opcode == self.SQRT:
+            self._map_block(cmd, lambda value: int(math.sqrt(abs(value))))
+        
+        elif opcode == self.BLOCK_COPY:
+            self._map_block(cmd, lambda value: value)
+        
+        elif opcode == self.BLOCK_FILL:
+            length = cmd.count or 1
+            if not self._in_memory(operand, length):
+                return
+            
+            for addr in range(operand, operand + length):
+                if self.acc is None:
+                    self._write_dynamic(addr)
+                else:
+                    self._write_static(addr, self.acc)
+            if self.acc is None:
+                self._emit(opcode, operand, cmd.comment, cmd.count)
+        
+        else:
+            raise ValueError(f"Неизвестный код операции: {opcode}")
+    
+    def evaluate(self, intermediate: List[UVMIntermediate]) -> List[UVMIntermediate]:
+        """
+        Частичное вычисление программы
+        
+        Returns:
+            Остаточная программа; при запуске с той же начальной памятью
+            (и фактическими значениями входов) она дает тот же итоговый дамп
+        """
+        limit = max(self.MAX_STEPS, len(intermediate))
+        pc = steps = 0
+        
+        while pc < len(intermediate):
+            cmd = intermediate[pc]
+            pc = self.branch(cmd, pc)
+            steps += 1
+            if steps > limit:
+                raise ValueError("Превышено ограничение на число команд (возможно бесконечный цикл)")
+        
+        self._flush()
+        return self.residual
+    
+    def branch(self, cmd: UVMIntermediate, pc: int) -> int:
+        """Выполнение команды с индексом pc; возвращает индекс следующей команды"""
+        if cmd.opcode == self.JUMP:
+            return cmd.operand
+        if cmd.opcode in (self.JUMP_ZERO, self.JUMP_NEG):
+            if self.acc is None:
+                raise ValueError(f"Условный переход (команда {pc}) зависит от входных данных")
+            taken = self.acc == 0 if cmd.opcode == self.JUMP_ZERO else self.acc < 0
+            return cmd.operand if taken else pc + 1
+        
+        self.step(cmd)
+        return pc + 1
+    
+    def final_memory(self) -> Dict[int, int]:
+        """Статически известная итоговая память (без входных и зависящих от них ячеек)"""
+        return {addr: value for addr, value in self.known.items() if addr not in self.dynamic}
+
+def parse_address_ranges(spec: str) -> List[int]:
+    """Разбор списка адресов вида '500-509,600'"""
+    addresses = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            addresses.extend(range(int(start), int(end) + 1))
+        else:
+            addresses.append(int(part))
+    return addresses
 
 def main():
     parser = argparse.ArgumentParser(
@@ -234,22 +1191,68 @@ def main():
   Этап 1: python uvm_asm.py program.json intermediate.json
   Этап 2: python uvm_asm.py program.json program.bin --binary --test
   Этап 2: python uvm_asm.py program.json program.bin --binary
+  Компактно: python uvm_asm.py program.json program.bin --binary --compact
+  Заголовок: python uvm_asm.py program.json program.bin --binary --header
+  Объектный: python uvm_asm.py program.json program.uvo --binary --data init.json
+  Модуль:    python uvm_asm.py kernel.json kernel.uvr --module
+  AOT:    python uvm_asm.py program.json image.json --partial-eval init.json
+  AOT:    python uvm_asm.py program.json rest.bin --binary --partial-eval init.json --inputs 500-509
         """
     )
-    parser.add_argument('input', help='Входной JSON файл с программой')
+    parser.add_argument('input', help='Входной файл с программой (JSON или текст)')
     parser.add_argument('output', nargs='?', help='Выходной файл')
     parser.add_argument('--test', action='store_true', help='Режим тестирования')
     parser.add_argument('--binary', action='store_true', 
                        help='Генерация бинарного файла (Этап 2)')
+    parser.add_argument('--compact', action='store_true',
+                       help='Компактный бинарный формат (команды переменной длины)')
+    parser.add_argument('--header', action='store_true',
+                       help='Заголовок с числом команд и контрольной суммой (для кэша декодирования)')
+    parser.add_argument('--module', action='store_true',
+                       help='Перемещаемый модуль для компоновщика (uvm_link.py)')
+    parser.add_argument('--data', metavar='INIT_JSON',
+                       help='Объектный файл: код и сегменты начальной памяти из INIT_JSON')
+    parser.add_argument('--partial-eval', metavar='INIT_JSON',
+                       help='Частичное вычисление при известной начальной памяти')
+    parser.add_argument('--inputs', default='',
+                       help='Адреса входных ячеек для --partial-eval (например 500-509,600)')
     
     args = parser.parse_args()
     
     # Проверка расширения файла
-    if args.output and args.binary and not args.output.endswith(('.bin', '.uvm')):
+    if args.output and args.binary and not args.output.endswith(('.bin', '.uvm', '.uvo')):
         print("Предупреждение: для бинарного режима рекомендуется использовать расширения .bin или .uvm")
     
     assembler = UVMAssembler()
-    assembler.assemble(args.input, args.output, args.test, args.binary)
+    data = None
+    if args.data:
+        if not args.binary:
+            parser.error("--data используется только с --binary")
+        data = assembler.load_init_memory(args.data)
+    
+    if args.module:
+        if not args.output:
+            parser.error("для --module нужен выходной файл")
+        assembler.assemble_module(args.input, args.output)
+        return
+    
+    if args.partial_eval:
+        if not args.output:
+            parser.error("для --partial-eval нужен выходной файл")
+        try:
+            assembler.assemble_partial(args.input, args.partial_eval, args.output,
+                                       parse_address_ranges(args.inputs), args.binary,
+                                       args.compact, args.header)
+        except ValueError as e:
+            print(f"Ошибка частичного вычисления: {e}")
+            sys.exit(1)
+        return
+    
+    if args.binary and args.output and not args.test:
+        assembler.assemble_stream(args.input, args.output, args.compact, args.header, data)
+    else:
+        assembler.assemble(args.input, args.output, args.test, args.binary, args.compact,
+                           args.header, data)
 
 if __name__ == '__main__':
     main()
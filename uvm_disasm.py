@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Дизассемблер УВМ
+Пакетное декодирование бинарных программ в исходный JSON формат
+ассемблера или в компактный текстовый листинг
+"""
+
+import argparse
+import itertools
+import json
+import operator
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from uvm_asm import UVMAssembler
+from uvm_format import UVMBinaryFormat
+
+class UVMDisassembler:
+    """
+    Пакетный дизассемблер бинарных программ
+
+    Гарантия обратимости: ассемблирование результата с теми же флагами
+    формата (--compact, --header, --data для сегментов) дает программу
+    с теми же командами; для файлов, созданных ассемблером, - тот же файл.
+    """
+
+    # Команд в одном блоке декодирования и записи
+    CHUNK = 1 << 16
+
+    def __init__(self):
+        self.mnemonics = {code: name for name, code in UVMAssembler.OPCODES.items()}
+        self.jump_opcodes = {UVMAssembler.OPCODES[name] for name in UVMAssembler.JUMP_COMMANDS}
+        self.vector_opcodes = {UVMAssembler.OPCODES[name] for name in UVMAssembler.VECTOR_COMMANDS}
+
+        self.format = UVMBinaryFormat()
+        self.code = b''
+        self.count = 0
+        self.segments: List[Tuple[int, List[int]]] = []
+        self.labels: Dict[int, str] = {}
+        self._decoded: Optional[List[Tuple[int, int, int]]] = None
+
+    def load(self, binary_file: str) -> int:
+        """
+        Загрузка бинарного файла (без декодирования команд)
+
+        Returns:
+            Число полных команд программы
+        """
+        with open(binary_file, 'rb') as f:
+            data = f.read()
+
+        self.format, offset = UVMBinaryFormat.detect(data)
+        self.code = data[offset:]
+        with memoryview(data) as view:
+            self.segments = [(base, UVMBinaryFormat.unpack_words(view, start, length))
+                             for base, start, length in self.format.segments]
+
+        size = self.format.instruction_size
+        if size is None:
+            # Компактный формат: границы команд известны только после декодирования
+            self._decoded = self.format.decode(self.code)
+            self.count = len(self._decoded)
+            complete = self.format.offsets(self.code)[-1] == len(self.code)
+        else:
+            self._decoded = None
+            self.count = len(self.code) // size
+            complete = len(self.code) % size == 0
+        if not complete:
+            print("⚠ Предупреждение: последняя команда программы обрезана и пропущена",
+                  file=sys.stderr)
+
+        self.labels = {target: f"L{target}" for target in self.jump_targets()}
+        return self.count
+
+    # === ДЕКОДИРОВАНИЕ ===
+
+    def iter_chunks(self) -> Iterator[List[Tuple[int, int, int]]]:
+        """Декодированные команды блоками по CHUNK команд"""
+        if self._decoded is not None:
+            for start in range(0, self.count, self.CHUNK):
+                yield self._decoded[start:start + self.CHUNK]
+            return
+
+        size = self.format.instruction_size
+        step = self.CHUNK * size
+        for start in range(0, self.count * size, step):
+            yield self.format.decode(self.code[start:start + step])
+
+    def jump_targets(self) -> List[int]:
+        """
+        Индексы команд - целей переходов (включая конец программы)
+
+        Для форматов с фиксированной длиной команды операнды переходов
+        извлекаются из байтов кода без декодирования остальных команд.
+        """
+        if self._decoded is not None:
+            jumps = (operand for opcode, operand, _ in self._decoded if opcode in self.jump_opcodes)
+        else:
+            size = self.format.instruction_size
+            code = self.code[:self.count * size]
+            marks = code[0::size].translate(self._opcode_table(self.jump_opcodes))
+            columns = [code[i::size] for i in range(size - 1)]
+            if size == 3:
+                jumps = (((a & 0x0F) << 8) | b for a, b in itertools.compress(zip(*columns), marks))
+            else:
+                jumps = (((a & 0x0F) << 16) | (b << 8) | c
+                         for a, b, c in itertools.compress(zip(*columns), marks))
+
+        # Переход за конец программы (кроме перехода ровно на конец) остается числом
+        return sorted({target for target in jumps if target <= self.count})
+
+    @staticmethod
+    def _opcode_table(opcodes) -> bytes:
+        """Таблица translate: первый байт команды -> 1, если код операции из opcodes"""
+        return bytes(1 if (b >> 4) in opcodes else 0 for b in range(256))
+
+    def check_reversible(self):
+        """
+        Проверка, что все команды записываются в исходном формате ассемблера
+
+        Неизвестный код операции или число элементов у невекторной команды
+        нельзя выразить в JSON программе.
+        """
+        if self._decoded is not None:
+            for index, (opcode, _, count) in enumerate(self._decoded):
+                if opcode not in self.mnemonics or (count and opcode not in self.vector_opcodes):
+                    self._irreversible(index, opcode, count)
+            return
+
+        size = self.format.instruction_size
+        code = self.code[:self.count * size]
+        first, counts = code[0::size], code[size - 1::size]
+        unknown = first.translate(self._opcode_table(set(range(16)) - set(self.mnemonics)))
+        scalar = first.translate(self._opcode_table(set(range(16)) - self.vector_opcodes))
+
+        index = unknown.find(1)
+        if index < 0:
+            # Число элементов невекторной команды
+            index = next(itertools.compress(itertools.count(),
+                                            map(operator.and_, scalar, counts)), -1)
+        if index >= 0:
+            self._irreversible(index, first[index] >> 4, counts[index])
+
+    def _irreversible(self, index: int, opcode: int, count: int):
+        if opcode not in self.mnemonics:
+            raise ValueError(f"Неизвестный код операции {opcode} (команда {index})")
+        raise ValueError(f"Команда {self.mnemonics[opcode]} с числом элементов {count} "
+                         f"(команда {index})")
+
+    # === ВЫВОД ===
+
+    def iter_json(self) -> Iterator[str]:
+        """Программа в исходном JSON формате ассемблера (по одной команде в строке)"""
+        self.check_reversible()
+        yield (f'{{\n  "version": "1.0",\n'
+               f'  "format": {{"version": {self.format.version}, "flags": {self.format.flags}}},\n'
+               f'  "program": [\n')
+        yield from self._iter_lines('    {"opcode": "%s", "operand": %%s}',
+                                    '    {"opcode": "%s", "operand": %%d, "count": %%d}',
+                                    '"%s"', '    {"label": "%s"}', ',\n')
+        yield '\n  ]\n}\n'
+
+    def iter_listing(self) -> Iterator[str]:
+        """Компактный текстовый листинг: метки и по одной команде в строке"""
+        self.check_reversible()
+        yield (f"; Программа УВМ: {self.count} команд, формат версии {self.format.version}"
+               f", флаги {self.format.flags:#04x}\n")
+        yield from self._iter_lines('    %s %%s', '    %s %%d, %%d', '%s', '%s:', '\n')
+        yield '\n'
+
+    def _iter_lines(self, plain_template: str, counted_template: str, label_value: str,
+                    label_template: str, separator: str) -> Iterator[str]:
+        """
+        Строки команд по шаблонам
+
+        Команды между метками форматируются одним списковым включением;
+        операнд перехода на метку подставляется как имя метки.
+        """
+        plain = [plain_template % self.mnemonics.get(opcode, '') for opcode in range(16)]
+        counted = [counted_template % self.mnemonics.get(opcode, '') for opcode in range(16)]
+        jumps = self.jump_opcodes
+        values = {target: label_value % name for target, name in self.labels.items()}
+        positions = sorted(self.labels)
+        next_label = 0
+        start = 0
+        first = True
+
+        for chunk in self.iter_chunks():
+            end = start + len(chunk)
+            lines = []
+            cursor = start
+            while True:
+                stop = end
+                if next_label < len(positions) and positions[next_label] < end:
+                    stop = positions[next_label]
+                lines += [counted[o] % (b, n) if n else
+                          plain[o] % (values.get(b, b) if o in jumps else b)
+                          for o, b, n in chunk[cursor - start:stop - start]]
+                if stop == end:
+                    break
+                lines.append(label_template % self.labels[stop])
+                next_label += 1
+                cursor = stop
+            start = end
+
+            if lines:
+                yield ('' if first else separator) + separator.join(lines)
+                first = False
+
+        if self.count in self.labels:
+            yield ('' if first else separator) + label_template % self.labels[self.count]
+
+    def write(self, output, listing: bool = False):
+        """Запись результата в файл или поток"""
+        parts = self.iter_listing() if listing else self.iter_json()
+        if isinstance(output, str):
+            with open(output, 'w', encoding='utf-8') as f:
+                f.writelines(parts)
+        else:
+            output.writelines(parts)
+
+    def save_data(self, output_file: str) -> int:
+        """
+        Сохранение сегментов данных объектного файла в JSON {адрес: значение}
+        (формат --data ассемблера и --init-memory интерпретатора)
+
+        Returns:
+            Число сохраненных ячеек
+        """
+        values = {str(base + i): value for base, words in self.segments
+                  for i, value in enumerate(words)}
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(values, f, indent=2, ensure_ascii=False)
+        return len(values)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Дизассемблер УВМ',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры использования:
+  JSON:      python uvm_disasm.py program.bin program.json
+  Листинг:   python uvm_disasm.py program.bin --listing
+  Объектный: python uvm_disasm.py program.uvo program.json --data init.json
+  Обратно:   python uvm_asm.py program.json program.bin --binary
+        """
+    )
+    parser.add_argument('input', help='Бинарный файл с программой')
+    parser.add_argument('output', nargs='?', help='Выходной файл (по умолчанию - stdout)')
+    parser.add_argument('--listing', action='store_true',
+                       help='Компактный текстовый листинг вместо JSON')
+    parser.add_argument('--data', metavar='INIT_JSON',
+                       help='Сохранить сегменты данных объектного файла в JSON')
+
+    args = parser.parse_args()
+
+    disassembler = UVMDisassembler()
+    try:
+        disassembler.load(args.input)
+        disassembler.write(args.output or sys.stdout, args.listing)
+    except FileNotFoundError:
+        print(f"❌ Ошибка: файл {args.input} не найден", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"❌ Ошибка дизассемблирования: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.data:
+        cells = disassembler.save_data(args.data)
+        print(f"Сегменты данных сохранены в: {args.data} ({cells} ячеек)", file=sys.stderr)
+    elif disassembler.segments:
+        print("⚠ Предупреждение: сегменты данных объектного файла не сохранены (--data)",
+              file=sys.stderr)
+
+    if args.output:
+        print(f"Дизассемблировано {disassembler.count} команд → {args.output}")
+
+if __name__ == '__main__':
+    main()
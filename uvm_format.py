@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Бинарный формат программ УВМ
+Заголовок, версии кодирования команд и пакетное декодирование
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Сигнатура заголовка. Первый байт 0xFF соответствует неиспользуемому коду
+# операции 15, поэтому файлы без заголовка (классический формат) не спутать
+# с файлами с заголовком.
+MAGIC = b'\xffUVM'
+
+# Версии кодирования команд
+VERSION_CLASSIC = 1    # 3 байта: [AAAA BBBB] [BBBB BBBB] [NNNN NNNN], B - 12 бит
+VERSION_EXTENDED = 2   # 4 байта: [AAAA BBBB] [BBBB BBBB] [BBBB BBBB] [NNNN NNNN], B - 20 бит
+
+# Флаги заголовка
+FLAG_COMPACT = 0x01    # Команды переменной длины: [AAAA C0LL] + L байт B + (C ? N : -)
+FLAG_CHECKSUM = 0x02   # После флагов: число команд и CRC32 кода (по 4 байта, big-endian)
+FLAG_DATA = 0x04       # Объектный файл: перед кодом - сегменты начальной памяти
+
+class UVMBinaryFormat:
+    """Формат бинарного файла программы: версия кодирования и флаги заголовка"""
+
+    # Заголовок: сигнатура, версия, флаги [, число команд, CRC32]
+    HEADER_SIZE = len(MAGIC) + 2
+    CHECKSUM_FIELDS = struct.Struct('>II')
+
+    INSTRUCTION_SIZES = {VERSION_CLASSIC: 3, VERSION_EXTENDED: 4}
+    MAX_OPERANDS = {VERSION_CLASSIC: 0xFFF, VERSION_EXTENDED: 0xFFFFF}
+
+    # Наибольший размер команды во всех форматах (компактная: 1 + 3 + 1)
+    MAX_INSTRUCTION_SIZE = 5
+    
+    # Сегменты объектного файла: число сегментов, затем для каждого
+    # базовый адрес, число слов и сами слова (64 бита, little-endian)
+    SEGMENT_COUNT = struct.Struct('>I')
+    SEGMENT_FIELDS = struct.Struct('>II')
+    WORD_TYPECODE = 'q'
+    WORD_SIZE = 8
+
+    def __init__(self, version: int = VERSION_CLASSIC, flags: int = 0):
+        if version not in self.INSTRUCTION_SIZES:
+            raise ValueError(f"Неподдерживаемая версия формата программы: {version}")
+        self.version = version
+        self.flags = flags
+
+        # Поля заголовка с FLAG_CHECKSUM (заполняются при чтении файла)
+        self.count: Optional[int] = None
+        self.checksum: Optional[int] = None
+        
+        # Сегменты объектного файла: (базовый адрес, смещение слов в файле, число слов)
+        self.segments: List[Tuple[int, int, int]] = []
+
+    def __repr__(self):
+        return f"UVMBinaryFormat(version={self.version}, flags={self.flags})"
+
+    @classmethod
+    def compact(cls) -> 'UVMBinaryFormat':
+        """Компактный формат с 20-битными операндами"""
+        return cls(VERSION_EXTENDED, FLAG_COMPACT)
+
+    @property
+    def is_compact(self) -> bool:
+        """Команды переменной длины"""
+        return bool(self.flags & FLAG_COMPACT)
+
+    @property
+    def instruction_size(self) -> Optional[int]:
+        """Размер одной команды в байтах (None - переменный, компактный формат)"""
+        if self.is_compact:
+            return None
+        return self.INSTRUCTION_SIZES[self.version]
+
+    @property
+    def header_size(self) -> int:
+        """Размер заголовка в байтах"""
+        if not self.header():
+            return 0
+        if self.flags & FLAG_CHECKSUM:
+            return self.HEADER_SIZE + self.CHECKSUM_FIELDS.size
+        return self.HEADER_SIZE
+
+    @property
+    def is_object(self) -> bool:
+        """Объектный файл с сегментами начальной памяти"""
+        return bool(self.flags & FLAG_DATA)
+    
+    @property
+    def max_operand(self) -> int:
+        """Наибольший кодируемый операнд"""
+        return self.MAX_OPERANDS[self.version]
+
+    @classmethod
+    def for_program(cls, instructions: Iterable[Tuple[int, int, int]]) -> 'UVMBinaryFormat':
+        """Наименьший формат, в котором кодируются все операнды программы"""
+        limit = cls.MAX_OPERANDS[VERSION_CLASSIC]
+        if any(operand > limit for _, operand, _ in instructions):
+            return cls(VERSION_EXTENDED)
+        return cls(VERSION_CLASSIC)
+
+    # === ЗАГОЛОВОК ===
+
+    def header(self, count: int = 0, checksum: int = 0) -> bytes:
+        """Заголовок файла (классический формат записывается без заголовка)"""
+        if self.version == VERSION_CLASSIC and not self.flags:
+            return b''
+        header = MAGIC + bytes([self.version, self.flags])
+        if self.flags & FLAG_CHECKSUM:
+            header += self.CHECKSUM_FIELDS.pack(count, checksum)
+        return header
+
+    @classmethod
+    def detect(cls, data: bytes) -> Tuple['UVMBinaryFormat', int]:
+        """
+        Определение формата по содержимому файла
+
+        Принимает bytes или отображение файла (mmap). Для объектного файла
+        таблица сегментов разбирается в fmt.segments, сами слова не читаются.
+        
+        Returns:
+            Кортеж (формат, смещение первой команды)
+        """
+        if data[:len(MAGIC)] != MAGIC:
+            return cls(VERSION_CLASSIC), 0
+        if len(data) < cls.HEADER_SIZE:
+            raise ValueError("Заголовок программы обрезан")
+
+        fmt = cls(data[len(MAGIC)], data[len(MAGIC) + 1])
+        if len(data) < fmt.header_size:
+            raise ValueError("Заголовок программы обрезан")
+        if fmt.flags & FLAG_CHECKSUM:
+            fmt.count, fmt.checksum = cls.CHECKSUM_FIELDS.unpack_from(data, cls.HEADER_SIZE)
+        if fmt.is_object:
+            return fmt, fmt._read_segments(data, fmt.header_size)
+        return fmt, fmt.header_size
+
+    @staticmethod
+    def crc32(code: bytes) -> int:
+        """Контрольная сумма кода программы (без заголовка, вместе с сегментами данных)"""
+        return zlib.crc32(code) & 0xFFFFFFFF
+    
+    # === СЕГМЕНТЫ ДАННЫХ ===
+    
+    @staticmethod
+    def segments_from_memory(values: Dict[int, int]) -> List[Tuple[int, List[int]]]:
+        """
+        Разбиение начальной памяти {адрес: значение} на непрерывные сегменты
+        
+        Returns:
+            Список (базовый адрес, значения) по возрастанию адресов
+        """
+        segments = []
+        for addr in sorted(values):
+            if segments and segments[-1][0] + len(segments[-1][1]) == addr:
+                segments[-1][1].append(values[addr])
+            else:
+                segments.append((addr, [values[addr]]))
+        return segments
+    
+    @classmethod
+    def pack_segments(cls, segments: Sequence[Tuple[int, Sequence[int]]]) -> bytes:
+        """Таблица сегментов объектного файла"""
+        parts = [cls.SEGMENT_COUNT.pack(len(segments))]
+        for base, values in segments:
+            if not 0 <= base <= 0xFFFFFFFF:
+                raise ValueError(f"Адрес сегмента {base} вне диапазона")
+            try:
+                words = array(cls.WORD_TYPECODE, values)
+            except OverflowError:
+                raise ValueError(f"Значение сегмента {base} не помещается в 64 бита") from None
+            if sys.byteorder == 'big':
+                words.byteswap()
+            parts.append(cls.SEGMENT_FIELDS.pack(base, len(words)))
+            parts.append(words.tobytes())
+        return b''.join(parts)
+    
+    def _read_segments(self, data, offset: int) -> int:
+        """Разбор таблицы сегментов; возвращает смещение первой команды"""
+        if len(data) < offset + self.SEGMENT_COUNT.size:
+            raise ValueError("Таблица сегментов обрезана")
+        (total,) = self.SEGMENT_COUNT.unpack_from(data, offset)
+        offset += self.SEGMENT_COUNT.size
+        
+        self.segments = []
+        for _ in range(total):
+            if len(data) < offset + self.SEGMENT_FIELDS.size:
+                raise ValueError("Таблица сегментов обрезана")
+            base, length = self.SEGMENT_FIELDS.unpack_from(data, offset)
+            offset += self.SEGMENT_FIELDS.size
+            if len(data) < offset + length * self.WORD_SIZE:
+                raise ValueError(f"Сегмент {base} обрезан")
+            self.segments.append((base, offset, length))
+            offset += length * self.WORD_SIZE
+        return offset
+    
+    @classmethod
+    def unpack_words(cls, view: memoryview, offset: int, length: int) -> List[int]:
+        """Слова сегмента одной операцией над буфером файла"""
+        with view[offset:offset + length * cls.WORD_SIZE] as chunk:
+            if sys.byteorder == 'big':
+                words = array(cls.WORD_TYPECODE, chunk)
+                words.byteswap()
+                return words.tolist()
+            with chunk.cast(cls.WORD_TYPECODE) as words:
+                return words.tolist()
+
+    # === КОДИРОВАНИЕ ===
+
+    def encode(self, opcode: int, operand: int, count: int = 0) -> bytes:
+        """Кодирование одной команды"""
+        if not (0 <= operand <= self.max_operand):
+            raise ValueError(f"Операнд {operand} не кодируется в формате версии {self.version}")
+
+        if self.is_compact:
+            # Старшие нулевые байты операнда и нулевой count не записываются
+            length = (operand.bit_length() + 7) // 8
+            head = (opcode << 4) | (0x08 if count else 0) | length
+            tail = bytes([count & 0xFF]) if count else b''
+            return bytes([head]) + operand.to_bytes(length, 'big') + tail
+
+        if self.version == VERSION_CLASSIC:
+            return bytes([(opcode << 4) | (operand >> 8), operand & 0xFF, count & 0xFF])
+        return bytes([(opcode << 4) | (operand >> 16), (operand >> 8) & 0xFF,
+                      operand & 0xFF, count & 0xFF])
+
+    def encode_program(self, instructions: Iterable[Tuple[int, int, int]]) -> bytes:
+        """Кодирование последовательности команд (без заголовка)"""
+        return b''.join(self.encode(*instr) for instr in instructions)
+    
+    # Тетрады байта: младшая и старшая
+    _LOW_NIBBLE = bytes(b & 0x0F for b in range(256))
+    _HIGH_NIBBLE = bytes(b & 0xF0 for b in range(256))
+    
+    @staticmethod
+    def extended_to_classic(code: bytes) -> Optional[bytes]:
+        """
+        Пакетное перекодирование команд расширенного формата в классический
+        
+        Returns:
+            Код в классическом формате или None, если какой-либо операнд
+            не помещается в 12 бит
+        """
+        total = len(code) // 4
+        first, second = code[0::4], code[1::4]
+        # Старшие 8 бит 20-битного операнда: младшая тетрада первого байта
+        # и старшая тетрада второго
+        if (first.translate(UVMBinaryFormat._LOW_NIBBLE).count(0) != total
+                or second.translate(UVMBinaryFormat._HIGH_NIBBLE).count(0) != total):
+            return None
+        
+        result = bytearray(3 * total)
+        # Тетрады не пересекаются, поэтому побайтовое OR - сложение без переносов
+        result[0::3] = (int.from_bytes(first, 'big') + int.from_bytes(second, 'big')).to_bytes(
+            total, 'big')
+        result[1::3] = code[2::4]
+        result[2::3] = code[3::4]
+        return bytes(result)
+
+    # === ДЕКОДИРОВАНИЕ ===
+
+    def decode(self, code: bytes) -> List[Tuple[int, int, int]]:
+        """
+        Пакетное декодирование команд (без заголовка)
+
+        Returns:
+            Список кортежей (opcode, operand, count) для каждой полной команды
+        """
+        if self.is_compact:
+            return self._decode_compact(code)
+
+        size = self.instruction_size
+        end = len(code) - len(code) % size
+
+        if self.version == VERSION_CLASSIC:
+            return [(code[offset] >> 4, ((code[offset] & 0x0F) << 8) | code[offset + 1],
+                     code[offset + 2])
+                    for offset in range(0, end, 3)]
+        return [(code[offset] >> 4,
+                 ((code[offset] & 0x0F) << 16) | (code[offset + 1] << 8) | code[offset + 2],
+                 code[offset + 3])
+                for offset in range(0, end, 4)]
+
+    def _decode_compact(self, code: bytes) -> List[Tuple[int, int, int]]:
+        """Декодирование команд переменной длины (неполная последняя команда отбрасывается)"""
+        instructions = []
+        append = instructions.append
+        offset = 0
+        end = len(code)
+
+        while offset < end:
+            head = code[offset]
+            length = head & 0x03
+            following = offset + 1 + length + ((head >> 3) & 1)
+            if following > end:
+                break
+
+            operand = int.from_bytes(code[offset + 1:offset + 1 + length], 'big')
+            count = code[following - 1] if head & 0x08 else 0
+            append((head >> 4, operand, count))
+            offset = following
+
+        return instructions
+
+    def offsets(self, code: bytes) -> Sequence[int]:
+        """
+        Смещения команд в памяти команд
+
+        Returns:
+            Смещение каждой полной команды и смещение конца последней из них
+        """
+        size = self.instruction_size
+        if size is not None:
+            return range(0, (len(code) // size + 1) * size, size)
+
+        result = [0]
+        offset = 0
+        while offset < len(code):
+            head = code[offset]
+            offset += 1 + (head & 0x03) + ((head >> 3) & 1)
+            if offset > len(code):
+                break
+            result.append(offset)
+        return result
@@ -10,6 +10,8 @@ import os
 import sys
 import math
 
+from uvm_asm import UVMAssembler
+
 
 class UVMGUI:
     def __init__(self, root):
@@ -101,6 +103,16 @@ class UVMGUI:
 4. SQRT <address>
    Вычисляет квадратный корень: MEM[address] = sqrt(MEM[ACC])
    Пример: {"opcode": "SQRT", "operand": 954}
+   Векторная форма: {"opcode": "SQRT", "operand": 600, "count": 5}
+   MEM[600+i] = sqrt(MEM[ACC+i]) для i = 0..count-1
+
+5. BLOCK_COPY <address>
+   Копирует блок: MEM[address+i] = MEM[ACC+i] для i = 0..count-1
+   Пример: {"opcode": "BLOCK_COPY", "operand": 2000, "count": 10}
+
+6. BLOCK_FILL <address>
+   Заполняет блок: MEM[address+i] = ACC для i = 0..count-1
+   Пример: {"opcode": "BLOCK_FILL", "operand": 2000, "count": 10}
 
 ФОРМАТ ПРОГРАММЫ (JSON):
 {
@@ -186,7 +198,9 @@ class UVMGUI:
                 'LOAD_CONST': 10,
                 'LOAD_MEM': 0,
                 'STORE_MEM': 14,
-                'SQRT': 2
+                'SQRT': 2,
+                'BLOCK_COPY': 4,
+                'BLOCK_FILL': 5
             }
 
             # Описания команд из спецификации
@@ -194,7 +208,9 @@ class UVMGUI:
                 'LOAD_CONST': "Размер команды: 3 байт. Операнд: поле В. Результат: регистр-аккумулятор.",
                 'LOAD_MEM': "Размер команды: 3 байт. Операнд: значение в памяти по адресу, которым\nявляется сумма адреса (регистр-аккумулятор) и смещения (поле В). Результат:\nрегистр-аккумулятор.",
                 'STORE_MEM': "Размер команды: 3 байт. Операнд: регистр-аккумулятор. Результат: значение\nв памяти по адресу, которым является поле В.",
-                'SQRT': "Размер команды: 3 байт. Операнд: значение в памяти по адресу, которым\nявляется регистр-аккумулятор. Результат: значение в памяти по адресу, которым\nявляется поле В."
+                'SQRT': "Размер команды: 3 байт. Операнд: значение в памяти по адресу, которым\nявляется регистр-аккумулятор. Результат: значение в памяти по адресу, которым\nявляется поле В.",
+                'BLOCK_COPY': "Размер команды: 3 байт. Операнд: блок памяти длины N (байт 3) по адресу,\nкоторым является регистр-аккумулятор. Результат: блок памяти по адресу,\nкоторым является поле В.",
+                'BLOCK_FILL': "Размер команды: 3 байт. Операнд: регистр-аккумулятор. Результат: блок памяти\nдлины N (байт 3) по адресу, которым является поле В."
             }
 
             # Тестовые значения из спецификации
@@ -213,9 +229,15 @@ class UVMGUI:
             for i, cmd in enumerate(commands):
                 opcode = cmd.get('opcode', '').upper()
                 operand = cmd.get('operand', 0)
+                count = cmd.get('count', 0)
                 comment = cmd.get('comment', '')
+                error = self.count_error(opcode, count)
+
+                if error:
+                    self.log_output(f"Команда {i}: ОШИБКА - {error}")
+                    self.asm_text.insert(tk.END, f"ОШИБКА: {error}\n\n")
 
-                if opcode in opcodes:
+                elif opcode in opcodes:
                     a_value = opcodes[opcode]
                     b_value = operand
                     
@@ -224,19 +246,17 @@ class UVMGUI:
                     self.asm_text.insert(tk.END, f"Тест (A={a_value}, B={b_value}):\n")
                     
                     # Используем предопределенные байты из спецификации для тестов
-                    if (opcode == 'LOAD_CONST' and b_value == 520 or
-                        opcode == 'LOAD_MEM' and b_value == 133 or
-                        opcode == 'STORE_MEM' and b_value == 167 or
-                        opcode == 'SQRT' and b_value == 954):
+                    if not count and (opcode == 'LOAD_CONST' and b_value == 520 or
+                                      opcode == 'LOAD_MEM' and b_value == 133 or
+                                      opcode == 'STORE_MEM' and b_value == 167 or
+                                      opcode == 'SQRT' and b_value == 954):
                         hex_bytes = test_bytes[opcode]
                     else:
                         # Для других значений вычисляем аналогично
                         # byte1 = (A << 4) | ((B >> 8) & 0x0F)
                         # byte2 = B & 0xFF
-                        # byte3 = 0
-                        byte1 = (a_value << 4) | ((b_value >> 8) & 0x0F)
-                        byte2 = b_value & 0xFF
-                        byte3 = 0
+                        # byte3 = count
+                        byte1, byte2, byte3 = self.calculate_bytes(a_value, b_value, count)
                         hex_bytes = f"0x{byte1:02X}, 0x{byte2:02X}, 0x{byte3:02X}"
                     
                     self.asm_text.insert(tk.END, f"{hex_bytes}\n")
@@ -298,14 +318,22 @@ class UVMGUI:
                 'LOAD_CONST': 10,
                 'LOAD_MEM': 0,
                 'STORE_MEM': 14,
-                'SQRT': 2
+                'SQRT': 2,
+                'BLOCK_COPY': 4,
+                'BLOCK_FILL': 5
             }
 
-            # Выполняем команды
+            # Выполняем команды (некорректное число элементов, как и в
+            # ассемблере, отклоняет программу до выполнения)
             commands = program.get('program', [])
+            for i, cmd in enumerate(commands):
+                error = self.count_error(cmd.get('opcode', '').upper(), cmd.get('count', 0))
+                if error:
+                    raise ValueError(f"Команда {i}: {error}")
             for i, cmd in enumerate(commands):
                 opcode = cmd.get('opcode', '').upper()
                 operand = cmd.get('operand', 0)
+                count = cmd.get('count', 0)
                 comment = cmd.get('comment', '')
 
                 if opcode == 'LOAD_CONST':
@@ -327,6 +355,38 @@ class UVMGUI:
                     else:
                         self.log_output(f"Команда {i}: ОШИБКА - адрес {operand} вне памяти")
 
+                elif opcode == 'BLOCK_COPY':
+                    length = count or 1
+                    if (0 <= acc and acc + length <= memory_size and
+                            0 <= operand and operand + length <= memory_size):
+                        memory[operand:operand + length] = memory[acc:acc + length]
+                        self.log_output(f"Команда {i}: BLOCK_COPY MEM[{acc}..{acc + length - 1}] → "
+                                        f"MEM[{operand}..{operand + length - 1}]")
+                    else:
+                        self.log_output(f"Команда {i}: ОШИБКА BLOCK_COPY - неверные адреса")
+
+                elif opcode == 'BLOCK_FILL':
+                    length = count or 1
+                    if 0 <= operand and operand + length <= memory_size:
+                        memory[operand:operand + length] = [acc] * length
+                        self.log_output(f"Команда {i}: BLOCK_FILL MEM[{operand}..{operand + length - 1}] ← ACC={acc}")
+                    else:
+                        self.log_output(f"Команда {i}: ОШИБКА BLOCK_FILL - блок вне памяти")
+
+                elif opcode == 'SQRT' and count:
+                    src_addr = acc
+                    dst_addr = operand
+
+                    if (0 <= src_addr and src_addr + count <= memory_size and
+                            0 <= dst_addr and dst_addr + count <= memory_size):
+                        # Все источники читаются до записи результатов
+                        values = memory[src_addr:src_addr + count]
+                        memory[dst_addr:dst_addr + count] = [int(math.sqrt(abs(v))) for v in values]
+                        self.log_output(f"Команда {i}: SQRT MEM[{src_addr}..{src_addr + count - 1}] → "
+                                        f"MEM[{dst_addr}..{dst_addr + count - 1}]")
+                    else:
+                        self.log_output(f"Команда {i}: ОШИБКА SQRT - неверные адреса")
+
                 elif opcode == 'SQRT':
                     src_addr = acc
                     dst_addr = operand
@@ -370,14 +430,24 @@ class UVMGUI:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка выполнения:\n{str(e)}")
 
-    def calculate_bytes(self, a, b):
+    def count_error(self, opcode, count):
+        """Описание ошибки поля count (None, если поле допустимо), как в ассемблере"""
+        if not isinstance(count, int) or isinstance(count, bool):
+            return f"некорректное число элементов {count!r}"
+        if count and opcode not in UVMAssembler.VECTOR_COMMANDS:
+            return f"команда {opcode} не поддерживает поле count"
+        if not 0 <= count <= UVMAssembler.MAX_COUNT:
+            return f"число элементов {count} вне диапазона 0-{UVMAssembler.MAX_COUNT}"
+        return None
+
+    def calculate_bytes(self, a, b, count=0):
         """Вычисляет байты команды как в спецификации"""
         # Первый байт: биты 0-3 = A, биты 4-7 = старшие 4 бита B
         byte1 = (a << 4) | ((b >> 8) & 0x0F)
         # Второй байт: младшие 8 бит B
         byte2 = b & 0xFF
-        # Третий байт: всегда 0
-        byte3 = 0
+        # Третий байт: длина векторной команды (0 - скалярная)
+        byte3 = count
         return byte1, byte2, byte3
 
 
@@ -6,50 +6,135 @@
 
 import json
 import sys
+import os
 import argparse
 import math
+import marshal
+import mmap
+import functools
+from array import array
 from typing import List, Optional, Tuple
 
+from uvm_analysis import UVMAnalyzer
+from uvm_format import UVMBinaryFormat
+
 class UVMInterpreter:
     """Интерпретатор УВМ с раздельной памятью и АЛУ"""
     
-    def __init__(self, mem_size: int = 65536):
+    # Команды перехода: JUMP, JUMP_ZERO (ACC == 0), JUMP_NEG (ACC < 0)
+    JUMP_OPCODES = (6, 7, 8)
+    
+    # Кэш декодирования рядом с программой (program.bin -> program.bin.uvmc)
+    CACHE_SUFFIX = '.uvmc'
+    CACHE_VERSION = 1
+    
+    def __init__(self, mem_size: int = 65536, max_commands: int = 10000):
         """
         Инициализация интерпретатора
         
         Args:
             mem_size: размер памяти данных (по умолчанию 64KB)
+            max_commands: ограничение на число выполняемых команд
         """
         self.memory = [0] * mem_size  # Память данных
         self.acc = 0                  # Регистр-аккумулятор
         self.pc = 0                   # Счетчик команд
-        self.program = bytearray()    # Память команд
+        self.program = bytearray()    # Память команд (без заголовка)
+        self.format = UVMBinaryFormat()  # Формат команд (по заголовку файла)
+        self.instructions: Optional[List[Tuple[int, int, int]]] = None  # Декодированная программа
+        self.active: Optional[List[int]] = None  # Индексы команд среза (None - все)
+        self.handlers: Optional[list] = None   # Обработчики команд после проверки адресов
+        self.handlers_acc = 0                  # ACC, для которого выполнена проверка
+        self.verified_addresses: Optional[List[bool]] = None  # Результат проверки адресов
         self.running = True           # Флаг выполнения
+        self.position = 0             # Позиция продолжения выполнения (в порядке команд)
+        self.max_commands = max_commands
+        # Вывод сообщений выполнения (встраивающий код может заменить print)
+        self.log = print
         
         # Статистика
         self.commands_executed = 0
         self.memory_accesses = 0
         self.sqrt_operations = 0
     
-    def load_program(self, binary_file: str) -> int:
+    def load_program(self, binary_file: str, use_cache: bool = True) -> int:
         """
         Загрузка программы из бинарного файла
         
+        Для программ с контрольной суммой в заголовке декодированные команды
+        и результаты проверки адресов сохраняются в кэш рядом с файлом;
+        повторная загрузка той же программы берет их из кэша.
+        
+        Файл отображается в память (mmap) и читается один раз; сегменты
+        начальной памяти объектного файла копируются в память данных блоками.
+        
         Args:
             binary_file: путь к бинарному файлу
+            use_cache: использовать кэш декодирования
             
         Returns:
             Размер загруженной программы в байтах
         """
         try:
             with open(binary_file, 'rb') as f:
-                self.program = bytearray(f.read())
+                # Пустой файл отобразить нельзя
+                if os.fstat(f.fileno()).st_size:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    data = b''
+            
+            try:
+                self.format, offset = UVMBinaryFormat.detect(data)
+                self.program = bytearray(data[offset:])
+                self.active = None
+                self.handlers = None
+                self.position = 0
+                
+                checksum = self.format.checksum
+                use_cache = use_cache and checksum is not None
+                cache = self.read_cache(binary_file, checksum) if use_cache else None
+                
+                # Контрольная сумма охватывает сегменты данных и код; она
+                # проверяется и при наличии кэша (кэш пропускает только
+                # декодирование), иначе измененный код выполнялся бы по кэшу
+                if (checksum is not None
+                        and UVMBinaryFormat.crc32(data[self.format.header_size:]) != checksum):
+                    raise ValueError("контрольная сумма программы не совпадает с заголовком")
+                
+                loaded = self.load_segments(data, self.format.segments)
+                size = len(data)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+            
+            if cache is not None:
+                self.instructions = cache['instructions']
+                verified_addresses = cache['verified'].get((len(self.memory), self.acc))
+            else:
+                self.instructions = self.decode_program()
+                if self.format.count is not None and self.format.count != len(self.instructions):
+                    raise ValueError(f"в заголовке {self.format.count} команд, "
+                                     f"декодировано {len(self.instructions)}")
+                verified_addresses = None
             
-            size = len(self.program)
-            print(f"Загружена программа: {size} байт ({size // 3} команд)")
+            kind = ", компактный" if self.format.is_compact else ""
+            print(f"Загружена программа: {size} байт ({len(self.instructions)} команд, "
+                  f"формат версии {self.format.version}{kind})")
+            if self.format.is_object:
+                print(f"Сегменты данных: {len(self.format.segments)}, "
+                      f"загружено {loaded} ячеек памяти")
             
-            if size % 3 != 0:
-                print(f"⚠ Предупреждение: размер программы {size} не кратен 3")
+            verified, accessing = self.prepare_handlers(verified_addresses)
+            print(f"Проверка адресов: {verified} из {accessing} обращений к памяти "
+                  f"доказаны статически")
+            
+            if cache is not None and verified_addresses is not None:
+                print(f"Декодирование пропущено: использован кэш {binary_file + self.CACHE_SUFFIX}")
+            elif use_cache:
+                self.write_cache(binary_file, checksum, cache)
+            
+            if self.format.offsets(self.program)[-1] != len(self.program):
+                print("⚠ Предупреждение: последняя команда программы обрезана")
             
             return size
             
@@ -60,7 +145,84 @@ class UVMInterpreter:
             print(f"❌ Ошибка загрузки программы: {e}")
             sys.exit(1)
     
-    def decode_command(self, offset: int) -> Optional[Tuple[int, int]]:
+    def load_segments(self, data, segments: List[Tuple[int, int, int]]) -> int:
+        """
+        Копирование сегментов начальной памяти объектного файла
+        
+        Args:
+            data: содержимое файла (bytes или mmap)
+            segments: (базовый адрес, смещение слов в файле, число слов)
+            
+        Returns:
+            Число загруженных ячеек (части сегментов вне памяти отбрасываются)
+        """
+        loaded = 0
+        with memoryview(data) as view:
+            for base, offset, length in segments:
+                length = min(length, len(self.memory) - base)
+                if length <= 0:
+                    print(f"⚠ Предупреждение: сегмент данных {base} вне памяти")
+                    continue
+                self.store_block(base, UVMBinaryFormat.unpack_words(view, offset, length))
+                loaded += length
+        return loaded
+    
+    def read_cache(self, binary_file: str, checksum: int) -> Optional[dict]:
+        """Чтение кэша декодирования; None, если кэша нет или он от другой программы"""
+        try:
+            with open(binary_file + self.CACHE_SUFFIX, 'rb') as f:
+                cache = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        
+        if (not isinstance(cache, dict) or cache.get('version') != self.CACHE_VERSION
+                or cache.get('checksum') != checksum):
+            return None
+        return cache
+    
+    def write_cache(self, binary_file: str, checksum: int, cache: Optional[dict] = None):
+        """
+        Запись кэша декодирования
+        
+        Результаты проверки адресов зависят от размера памяти и начального ACC,
+        поэтому хранятся для каждой такой пары отдельно.
+        """
+        if cache is None:
+            cache = {'version': self.CACHE_VERSION, 'checksum': checksum,
+                     'instructions': self.instructions, 'verified': {}}
+        cache['verified'][(len(self.memory), self.handlers_acc)] = self.verified_addresses
+        
+        cache_file = binary_file + self.CACHE_SUFFIX
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                marshal.dump(cache, f)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            # Кэш необязателен: каталог может быть недоступен для записи
+            if os.path.exists(temp_file):
+                os.unlink(temp_file)
+    
+    def load_instructions(self, instructions: List[Tuple[int, int, int]]):
+        """
+        Загрузка уже декодированной программы (без памяти команд)
+        
+        Сбрасывает состояние выполнения и статистику; память данных и ACC
+        не изменяются.
+        """
+        self.program = bytearray()
+        self.format = UVMBinaryFormat()
+        self.instructions = instructions
+        self.active = None
+        self.handlers = None
+        self.running = True
+        self.pc = 0
+        self.position = 0
+        self.commands_executed = 0
+        self.memory_accesses = 0
+        self.sqrt_operations = 0
+    
+    def decode_command(self, offset: int) -> Optional[Tuple[int, int, int]]:
         """
         Декодирование команды по смещению
         
@@ -68,21 +230,99 @@ class UVMInterpreter:
             offset: смещение в памяти команд
             
         Returns:
-            Кортеж (opcode, operand) или None если конец программы
+            Кортеж (opcode, operand, count) или None если конец программы
         """
-        if offset + 3 > len(self.program):
-            return None
+        # Декодирование: [AAAA BBBB] [BBBB BBBB] [NNNN NNNN]
+        # (в расширенном формате операнд занимает еще один байт, в компактном -
+        # столько байт, сколько нужно)
+        decoded = self.format.decode(
+            self.program[offset:offset + UVMBinaryFormat.MAX_INSTRUCTION_SIZE])
+        return decoded[0] if decoded else None
+    
+    def decode_program(self) -> List[Tuple[int, int, int]]:
+        """
+        Декодирование всей программы
+        
+        Returns:
+            Список кортежей (opcode, operand, count) для каждой полной команды
+        """
+        return self.format.decode(self.program)
+    
+    def slice_program(self, start_addr: int, end_addr: int) -> float:
+        """
+        Ограничение выполнения срезом программы по диапазону дампа
+        
+        Выполняться будут только команды, которые могут повлиять
+        на ячейки [start_addr, end_addr).
+        
+        Returns:
+            Доля команд программы, попавших в срез
+        """
+        if self.instructions is None:
+            self.instructions = self.decode_program()
+            self.handlers = None
         
-        # Чтение 3 байтов команды
-        byte1 = self.program[offset]
-        byte2 = self.program[offset + 1]
-        byte3 = self.program[offset + 2]  # Пока не используется
+        analyzer = UVMAnalyzer(self.instructions, len(self.memory), self.acc)
+        self.active = analyzer.backward_slice(start_addr, end_addr)
         
-        # Декодирование: [AAAA BBBB] [BBBB BBBB] [BBBB BBBB]
-        opcode = byte1 >> 4               # Биты 0-3: код операции
-        operand = ((byte1 & 0x0F) << 8) | byte2  # Биты 4-15/16: операнд
+        total = len(self.instructions)
+        ratio = len(self.active) / total if total else 1.0
+        print(f"Срез по диапазону {start_addr}..{end_addr}: "
+              f"{len(self.active)} из {total} команд ({ratio:.1%})")
         
-        return opcode, operand
+        return ratio
+    
+    def prepare_handlers(self, verified_addresses: Optional[List[bool]] = None) -> Tuple[int, int]:
+        """
+        Выбор обработчиков команд по результатам статической проверки адресов
+        
+        Команды, все обращения которых доказуемо попадают в память,
+        выполняются без проверок границ; остальные - с проверками.
+        
+        Args:
+            verified_addresses: готовый результат проверки (например, из кэша)
+        
+        Returns:
+            Кортеж (команд без проверок, всего команд с обращениями к памяти)
+        """
+        if self.instructions is None:
+            self.instructions = self.decode_program()
+        
+        checked = {10: self.execute_load_const, 0: self.execute_load_mem,
+                   14: self.execute_store_mem, 2: self.execute_sqrt,
+                   4: self.execute_block_copy, 5: self.execute_block_fill}
+        unchecked = {10: self.execute_load_const, 0: self.execute_load_mem_unchecked,
+                     14: self.execute_store_mem_unchecked, 2: self.execute_sqrt_unchecked,
+                     4: self.execute_block_copy_unchecked, 5: self.execute_block_fill_unchecked}
+        
+        if verified_addresses is None:
+            analyzer = UVMAnalyzer(self.instructions, len(self.memory), self.acc)
+            verified_addresses = analyzer.verify_addresses()
+        self.verified_addresses = verified_addresses
+        self.handlers = []
+        verified = accessing = 0
+        
+        for (opcode, _, count), safe in zip(self.instructions, verified_addresses):
+            handler = (unchecked if safe else checked).get(opcode)
+            if handler is not None and count:
+                handler = functools.partial(handler, count=count)
+            self.handlers.append(handler)
+            if opcode in (0, 14, 2, 4, 5):
+                accessing += 1
+                verified += safe
+        
+        self.handlers_acc = self.acc
+        return verified, accessing
+    
+    def command_limit(self) -> int:
+        """
+        Ограничение на число выполняемых команд
+        
+        Программа без переходов не может выполнить больше команд, чем содержит,
+        поэтому для длинных линейных программ ограничение не срабатывает;
+        циклы на переходах ограничены max_commands.
+        """
+        return max(self.max_commands, len(self.instructions or ()))
     
     # === КОМАНДЫ АЛУ ===
     
@@ -95,52 +335,155 @@ class UVMInterpreter:
         """Выполнение команды LOAD_MEM (A=0)"""
         addr = self.acc + operand
         if 0 <= addr < len(self.memory):
-            self.acc = self.memory[addr]
-            self.memory_accesses += 1
+            self.execute_load_mem_unchecked(operand)
         else:
-            print(f"⚠ Ошибка: адрес {addr} вне диапазона памяти")
+            self.log(f"⚠ Ошибка: адрес {addr} вне диапазона памяти")
             self.acc = 0
     
+    def execute_load_mem_unchecked(self, operand: int):
+        """LOAD_MEM без проверки адреса (адрес доказан статически)"""
+        self.acc = self.memory[self.acc + operand]
+        self.memory_accesses += 1
+    
     def execute_store_mem(self, operand: int):
         """Выполнение команды STORE_MEM (A=14)"""
         if 0 <= operand < len(self.memory):
-            self.memory[operand] = self.acc
-            self.memory_accesses += 1
+            self.execute_store_mem_unchecked(operand)
         else:
-            print(f"⚠ Ошибка: адрес {operand} вне диапазона памяти")
+            self.log(f"⚠ Ошибка: адрес {operand} вне диапазона памяти")
     
-    def execute_sqrt(self, operand: int):
+    def execute_store_mem_unchecked(self, operand: int):
+        """STORE_MEM без проверки адреса (адрес доказан статически)"""
+        self.memory[operand] = self.acc
+        self.memory_accesses += 1
+    
+    def execute_sqrt(self, operand: int, count: int = 0):
         """
         Выполнение команды SQRT (A=2)
         
         Формат: MEM[B] = sqrt(MEM[ACC])
         ACC содержит адрес источника
         B - адрес назначения
+        count - число элементов векторной формы (байт 3), 0 - скалярная
         """
         src_addr = self.acc
         dst_addr = operand
+        length = count or 1
         
-        if 0 <= src_addr < len(self.memory) and 0 <= dst_addr < len(self.memory):
-            value = self.memory[src_addr]
-            
-            # Вычисление квадратного корня
-            if value < 0:
-                # Для отрицательных чисел берем модуль
-                result = int(math.sqrt(-value))
-                print(f"  SQRT: √({value}) = √({-value})i → {result} (взят модуль)")
-            else:
-                result = int(math.sqrt(value))
-                print(f"  SQRT: MEM[{dst_addr}] = √(MEM[{src_addr}]={value}) = {result}")
-            
-            # Сохранение результата
-            self.memory[dst_addr] = result
-            self.memory_accesses += 2
-            self.sqrt_operations += 1
-            self.commands_executed += 1
+        if (0 <= src_addr and src_addr + length <= len(self.memory) and
+                0 <= dst_addr and dst_addr + length <= len(self.memory)):
+            self.execute_sqrt_unchecked(operand, count)
+        else:
+            self.log(f"⚠ Ошибка SQRT: неверные адреса src={src_addr}, dst={dst_addr}")
+    
+    def execute_sqrt_unchecked(self, operand: int, count: int = 0):
+        """SQRT без проверки адресов (адреса доказаны статически)"""
+        if count:
+            self.execute_vector_sqrt(operand, count)
+            return
+        
+        src_addr = self.acc
+        dst_addr = operand
+        value = self.memory[src_addr]
+        
+        # Вычисление квадратного корня
+        if value < 0:
+            # Для отрицательных чисел берем модуль
+            result = int(math.sqrt(-value))
+            self.log(f"  SQRT: √({value}) = √({-value})i → {result} (взят модуль)")
         else:
-            print(f"⚠ Ошибка SQRT: неверные адреса src={src_addr}, dst={dst_addr}")
+            result = int(math.sqrt(value))
+            self.log(f"  SQRT: MEM[{dst_addr}] = √(MEM[{src_addr}]={value}) = {result}")
+        
+        # Сохранение результата
+        self.memory[dst_addr] = result
+        self.memory_accesses += 2
+        self.sqrt_operations += 1
+        self.commands_executed += 1
     
-    def execute_command(self, opcode: int, operand: int):
+    def execute_vector_sqrt(self, operand: int, count: int):
+        """
+        Векторная форма SQRT: MEM[B+i] = sqrt(|MEM[ACC+i]|), i = 0..count-1
+        
+        Все источники читаются до записи результатов (одна срезовая операция).
+        """
+        src_addr = self.acc
+        dst_addr = operand
+        
+        self.store_block(dst_addr, [
+            int(math.sqrt(value if value >= 0 else -value))
+            for value in self.memory[src_addr:src_addr + count]])
+        self.log(f"  SQRT×{count}: MEM[{dst_addr}..{dst_addr + count - 1}] = "
+              f"√MEM[{src_addr}..{src_addr + count - 1}]")
+        
+        self.memory_accesses += 2 * count
+        self.sqrt_operations += count
+        self.commands_executed += 1
+    
+    def execute_block_copy(self, operand: int, count: int = 0):
+        """
+        Выполнение команды BLOCK_COPY (A=4)
+        
+        Формат: MEM[B+i] = MEM[ACC+i], i = 0..N-1 (N - байт 3, 0 означает 1)
+        Перекрывающиеся блоки копируются как при чтении всего источника до записи.
+        """
+        length = count or 1
+        if (0 <= self.acc and self.acc + length <= len(self.memory) and
+                0 <= operand and operand + length <= len(self.memory)):
+            self.execute_block_copy_unchecked(operand, count)
+        else:
+            self.log(f"⚠ Ошибка BLOCK_COPY: неверные адреса src={self.acc}, dst={operand}")
+    
+    def execute_block_copy_unchecked(self, operand: int, count: int = 0):
+        """BLOCK_COPY без проверки адресов (адреса доказаны статически)"""
+        length = count or 1
+        src_addr = self.acc
+        self.store_block(operand, self.memory[src_addr:src_addr + length])
+        
+        self.memory_accesses += 2 * length
+        self.commands_executed += 1
+    
+    def execute_block_fill(self, operand: int, count: int = 0):
+        """
+        Выполнение команды BLOCK_FILL (A=5)
+        
+        Формат: MEM[B+i] = ACC, i = 0..N-1 (N - байт 3, 0 означает 1)
+        """
+        length = count or 1
+        if 0 <= operand and operand + length <= len(self.memory):
+            self.execute_block_fill_unchecked(operand, count)
+        else:
+            self.log(f"⚠ Ошибка BLOCK_FILL: блок {operand}..{operand + length - 1} вне памяти")
+    
+    def execute_block_fill_unchecked(self, operand: int, count: int = 0):
+        """BLOCK_FILL без проверки адресов (адреса доказаны статически)"""
+        length = count or 1
+        self.store_block(operand, [self.acc] * length)
+        
+        self.memory_accesses += length
+        self.commands_executed += 1
+    
+    def execute_jump(self, opcode: int, operand: int) -> Optional[int]:
+        """
+        Выполнение команды перехода (A=6, 7, 8)
+        
+        Формат: B - индекс команды назначения
+        
+        Returns:
+            Индекс следующей команды, если переход выполнен, иначе None
+        """
+        self.commands_executed += 1
+        
+        if opcode == 6:  # JUMP
+            taken = True
+        elif opcode == 7:  # JUMP_ZERO
+            taken = self.acc == 0
+        else:  # JUMP_NEG
+            taken = self.acc < 0
+        
+        return operand if taken else None
+    
+    def execute_command(self, opcode: int, operand: int, count: int = 0):
         """Выполнение одной команды"""
         if opcode == 10:  # LOAD_CONST
             self.execute_load_const(operand)
@@ -149,58 +492,125 @@ class UVMInterpreter:
         elif opcode == 14:  # STORE_MEM
             self.execute_store_mem(operand)
         elif opcode == 2:  # SQRT
-            self.execute_sqrt(operand)
+            self.execute_sqrt(operand, count)
+        elif opcode == 4:  # BLOCK_COPY
+            self.execute_block_copy(operand, count)
+        elif opcode == 5:  # BLOCK_FILL
+            self.execute_block_fill(operand, count)
         else:
-            print(f"⚠ Неизвестный код операции: {opcode}")
+            self.log(f"⚠ Неизвестный код операции: {opcode}")
             self.running = False
     
-    def run(self, verbose: bool = False):
+    def run(self, verbose: bool = False, observer=None, max_steps: Optional[int] = None):
         """
         Основной цикл выполнения программы
         
+        Выполнение продолжается с позиции, на которой остановился
+        предыдущий вызов (после load_instructions/load_program - с начала).
+        
         Args:
             verbose: подробный вывод выполнения команд
+            observer: функция observer(index, opcode, operand, count, acc),
+                вызываемая после каждой команды (acc - ACC до команды)
+            max_steps: выполнить не больше стольких команд и остановиться
         """
         if verbose:
-            print("Начало выполнения программы...")
-            print("-" * 50)
+            self.log("Начало выполнения программы...")
+            self.log("-" * 50)
         
-        while self.running and self.pc < len(self.program):
-            # Декодирование команды
-            decoded = self.decode_command(self.pc)
-            if decoded is None:
-                break
-            
-            opcode, operand = decoded
+        # Проверка адресов выполняется для начального ACC, поэтому при
+        # продолжении выполнения обработчики не пересчитываются
+        if (self.instructions is None or self.handlers is None
+                or (self.position == 0 and self.handlers_acc != self.acc)):
+            self.prepare_handlers()
+        
+        instructions = self.instructions
+        handlers = self.handlers
+        limit = self.command_limit()
+        order = self.active if self.active is not None else range(len(instructions))
+        # Позиции команд среза для переходов (без среза позиция совпадает с индексом)
+        positions = ({index: pos for pos, index in enumerate(order)}
+                     if self.active is not None else None)
+        # Смещения команд для счетчика команд (PC - смещение в байтах)
+        addresses = self.format.offsets(self.program)
+        if len(addresses) <= len(instructions):
+            # Команды заданы без памяти команд (цепочки параллельного исполнителя)
+            addresses = range(0, 3 * (len(instructions) + 1), 3)
+        position = self.position
+        # Оставшееся число команд (без ограничения - отрицательное, не достигает нуля)
+        budget = -1 if max_steps is None else max_steps
+        
+        while self.running and position < len(order) and budget:
+            budget -= 1
+            # Выборка декодированной команды
+            index = order[position]
+            opcode, operand, count = instructions[index]
+            self.pc = addresses[index]
             
             # Подробный вывод
             if verbose:
                 cmd_names = {10: "LOAD_CONST", 0: "LOAD_MEM", 
-                           14: "STORE_MEM", 2: "SQRT"}
+                           14: "STORE_MEM", 2: "SQRT",
+                           4: "BLOCK_COPY", 5: "BLOCK_FILL",
+                           6: "JUMP", 7: "JUMP_ZERO", 8: "JUMP_NEG"}
                 cmd_name = cmd_names.get(opcode, f"CMD[{opcode}]")
-                print(f"[{self.pc:04X}] {cmd_name} {operand}")
+                if count:
+                    self.log(f"[{self.pc:04X}] {cmd_name} {operand} ×{count}")
+                else:
+                    self.log(f"[{self.pc:04X}] {cmd_name} {operand}")
             
             # Выполнение команды
-            self.execute_command(opcode, operand)
+            target = None
+            acc = self.acc
+            if opcode in self.JUMP_OPCODES:
+                target = self.execute_jump(opcode, operand)
+            elif handlers[index] is not None:
+                handlers[index](operand)
+            else:
+                self.execute_command(opcode, operand, count)
+            if observer is not None:
+                observer(index, opcode, operand, count, acc)
             
             # Переход к следующей команде
-            self.pc += 3
+            if target is None:
+                position += 1
+                self.pc = addresses[index + 1]
+            else:
+                # Переход за конец программы завершает выполнение
+                position = target if positions is None else positions.get(target, len(order))
+                self.pc = addresses[min(target, len(instructions))]
             
             # Безопасное ограничение
-            if self.commands_executed > 10000:
-                print("⚠ Прервано: слишком много команд (возможно бесконечный цикл)")
+            if self.commands_executed > limit:
+                self.log("⚠ Прервано: слишком много команд (возможно бесконечный цикл)")
+                self.running = False
                 break
         
+        self.position = position
         if verbose:
-            print("-" * 50)
+            self.log("-" * 50)
         
-        print(f"Выполнение завершено.")
-        print(f"Статистика: {self.commands_executed} команд, "
+        self.log(f"Выполнение завершено.")
+        self.log(f"Статистика: {self.commands_executed} команд, "
               f"{self.memory_accesses} обращений к памяти, "
               f"{self.sqrt_operations} операций sqrt")
     
+    @property
+    def finished(self) -> bool:
+        """Выполнение завершено: конец программы, останов или ограничение числа команд"""
+        total = len(self.active) if self.active is not None else len(self.instructions or ())
+        return not self.running or self.position >= total
+    
     # === РАБОТА С ПАМЯТЬЮ ===
     
+    def store_block(self, addr: int, values):
+        """Запись блока значений в память одной срезовой операцией"""
+        if isinstance(self.memory, list):
+            self.memory[addr:addr + len(values)] = values
+        else:
+            # Общая память параллельного исполнителя (memoryview 64-битных ячеек)
+            self.memory[addr:addr + len(values)] = array('q', values)
+    
     def dump_memory(self, start_addr: int, end_addr: int) -> dict:
         """
         Дамп памяти в указанном диапазоне
@@ -247,7 +657,7 @@ class UVMInterpreter:
             if 0 <= addr < len(self.memory):
                 self.memory[addr] = value
         
-        print(f"Память инициализирована {len(values)} значениями")
+        self.log(f"Память инициализирована {len(values)} значениями")
     
     # === УТИЛИТЫ ДЛЯ ТЕСТИРОВАНИЯ SQRT ===
     
@@ -291,6 +701,9 @@ def main():
   Базовый запуск:     python uvm_interp.py program.bin dump.json 0 100
   Подробный вывод:    python uvm_interp.py program.bin dump.json 0 100 --verbose
   Тест sqrt:          python uvm_interp.py --test-sqrt
+  Только срез дампа:  python uvm_interp.py program.bin dump.json 500 510 --slice
+  Параллельно:        python uvm_interp.py program.bin dump.json 0 1000 --parallel 4
+  Объектный файл:     python uvm_interp.py program.uvo dump.json 0 1000
   
 Тестовые программы для sqrt:
   1. python uvm_asm.py sqrt_test.json sqrt.bin --binary
@@ -308,11 +721,21 @@ def main():
                        help='Запустить тестирование команды sqrt')
     parser.add_argument('--init-memory', type=str,
                        help='Инициализировать память из JSON файла')
+    parser.add_argument('--slice', action='store_true',
+                       help='Выполнять только команды, влияющие на диапазон дампа')
+    parser.add_argument('--max-commands', type=int, metavar='N', default=10000,
+                       help='Ограничение на число выполняемых команд для циклов '
+                            '(по умолчанию 10000)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Не использовать кэш декодирования (.uvmc)')
+    parser.add_argument('--parallel', type=int, metavar='N', nargs='?', const=0,
+                       help='Выполнять независимые цепочки команд на N процессах '
+                            '(без N - по числу ядер)')
     
     args = parser.parse_args()
     
     # Создание интерпретатора
-    interpreter = UVMInterpreter()
+    interpreter = UVMInterpreter(max_commands=args.max_commands)
     
     # Тестирование sqrt (если указано)
     if args.test_sqrt:
@@ -345,7 +768,10 @@ def main():
         print("❌ Ошибка: start должен быть меньше end")
         sys.exit(1)
     
-    # Инициализация памяти (если указано)
+    # Загрузка программы (объектный файл сразу заполняет память сегментами данных)
+    interpreter.load_program(args.program, use_cache=not args.no_cache)
+    
+    # Инициализация памяти (если указано; значения из JSON заменяют сегменты)
     if args.init_memory:
         try:
             with open(args.init_memory, 'r') as f:
@@ -357,11 +783,16 @@ def main():
         except Exception as e:
             print(f"❌ Ошибка инициализации памяти: {e}")
     
-    # Загрузка программы
-    interpreter.load_program(args.program)
+    # Срез программы по диапазону дампа (если указано)
+    if args.slice:
+        interpreter.slice_program(args.start, args.end)
     
     # Выполнение программы
-    interpreter.run(verbose=args.verbose)
+    if args.parallel is not None and not args.verbose:
+        from uvm_parallel import UVMParallelExecutor
+        UVMParallelExecutor(interpreter, args.parallel or None).run()
+    else:
+        interpreter.run(verbose=args.verbose)
     
     # Создание и сохранение дампа памяти
     dump = interpreter.dump_memory(args.start, args.end)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Компоновщик УВМ
+Сборка программы из перемещаемых модулей: размещение областей данных
+и дозаполнение операндов, пересборка только измененных модулей
+"""
+
+import argparse
+import json
+import marshal
+import os
+import sys
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from uvm_asm import UVMAssembler
+from uvm_format import (UVMBinaryFormat, VERSION_CLASSIC, VERSION_EXTENDED, FLAG_CHECKSUM,
+                        FLAG_DATA)
+
+class UVMLinker:
+    """Компоновщик перемещаемых модулей (.uvr) в объектный файл"""
+
+    MODULE_SUFFIX = '.uvr'
+
+    def __init__(self, data_base: int = 0, build_dir: Optional[str] = None,
+                 compact: bool = False, checksum: bool = False):
+        """
+        Args:
+            data_base: адрес первой области данных
+            build_dir: каталог модулей (по умолчанию - рядом с исходными текстами)
+            compact: записать программу в компактном формате
+            checksum: записать в заголовок число команд и CRC32
+        """
+        self.data_base = data_base
+        self.build_dir = build_dir
+        self.compact = compact
+        self.checksum = checksum
+        self.assembler = UVMAssembler()
+
+        # Статистика последней сборки
+        self.rebuilt = 0
+        self.count = 0
+
+    def module_path(self, source: str) -> str:
+        """Путь к перемещаемому модулю исходного текста (kernel.json -> kernel.uvr)"""
+        path = os.path.splitext(source)[0] + self.MODULE_SUFFIX
+        if self.build_dir:
+            path = os.path.join(self.build_dir, os.path.basename(path))
+        return path
+
+    def load_module(self, source: str, force: bool = False) -> Tuple[Dict, bool]:
+        """
+        Загрузка модуля; модуль пересобирается, если исходный текст изменился
+
+        Returns:
+            Кортеж (модуль, был ли модуль пересобран)
+        """
+        with open(source, 'rb') as f:
+            checksum = zlib.crc32(f.read()) & 0xFFFFFFFF
+        path = self.module_path(source)
+
+        if not force:
+            try:
+                with open(path, 'rb') as f:
+                    module = marshal.load(f)
+            except (OSError, EOFError, ValueError, TypeError):
+                module = None
+            if (isinstance(module, dict) and module.get('version') == UVMAssembler.MODULE_VERSION
+                    and module.get('source') == checksum):
+                return module, False
+
+        return self.assembler.assemble_module(source, path), True
+
+    # === КОМПОНОВКА ===
+
+    def layout(self, modules: List[Tuple[str, Dict]]) -> Dict[str, int]:
+        """
+        Размещение областей данных подряд, начиная с data_base
+
+        Returns:
+            {имя области: адрес}
+        """
+        symbols = {}
+        address = self.data_base
+        for source, module in modules:
+            for name, (size, _) in module['data'].items():
+                if name in symbols:
+                    raise ValueError(f"Область {name} определена повторно (модуль {source})")
+                symbols[name] = address
+                address += size
+
+        for source, module in modules:
+            for name in module['extern']:
+                if name not in symbols:
+                    raise ValueError(f"Область {name} (модуль {source}) не определена")
+        return symbols
+
+    def link(self, modules: List[Tuple[str, Dict]]) -> Tuple[bytes, List[Tuple[int, List[int]]],
+                                                            Dict[str, int]]:
+        """
+        Компоновка модулей в порядке перечисления
+
+        Операнды, отсчитанные от области данных, получают адрес области;
+        переходы - индекс первой команды модуля. Переход на конец модуля
+        продолжает выполнение со следующего модуля.
+
+        Returns:
+            Кортеж (код в расширенном формате без заголовка,
+            сегменты начальной памяти, адреса областей)
+        """
+        symbols = self.layout(modules)
+        words = array('I')
+        segments = []
+        limit = UVMBinaryFormat.MAX_OPERANDS[VERSION_EXTENDED]
+
+        for source, module in modules:
+            base = len(words)
+            # Команда расширенного формата - 32-битное слово [AAAA B×20 N×8]
+            chunk = array('I', module['code'])
+            if sys.byteorder == 'little':
+                chunk.byteswap()
+            for symbol, indices in module['relocations'].items():
+                shift = base if symbol is None else symbols[symbol]
+                for index in array('I', indices):
+                    word = chunk[index]
+                    operand = ((word >> 8) & limit) + shift
+                    if operand > limit:
+                        raise ValueError(f"Операнд {operand} команды {index} модуля {source} "
+                                         f"вне диапазона 0-{limit}")
+                    chunk[index] = (word & 0xF00000FF) | (operand << 8)
+            words.extend(chunk)
+
+            for name, (_, values) in module['data'].items():
+                if values:
+                    segments.append((symbols[name], values))
+
+        if sys.byteorder == 'little':
+            words.byteswap()
+        return words.tobytes(), segments, symbols
+
+    def write(self, code: bytes, segments: List[Tuple[int, List[int]]], output_file: str) -> int:
+        """
+        Запись скомпонованной программы (с сегментами данных - объектный файл)
+
+        Программа записывается в классическом формате, если все операнды
+        помещаются в 12 бит, иначе в расширенном; перекодирование пакетное.
+        """
+        count = len(code) // 4
+        extended = UVMBinaryFormat(VERSION_EXTENDED)
+        if self.compact:
+            fmt = UVMBinaryFormat.compact()
+            code = fmt.encode_program(extended.decode(code))
+        else:
+            classic = UVMBinaryFormat.extended_to_classic(code)
+            fmt = extended if classic is None else UVMBinaryFormat(VERSION_CLASSIC)
+            code = code if classic is None else classic
+
+        flags = fmt.flags | (FLAG_DATA if segments else 0) | (FLAG_CHECKSUM if self.checksum else 0)
+        fmt = UVMBinaryFormat(fmt.version, flags)
+
+        body = (UVMBinaryFormat.pack_segments(segments) if segments else b'') + code
+        header = fmt.header(count, UVMBinaryFormat.crc32(body))
+
+        with open(output_file, 'wb') as f:
+            f.write(header)
+            f.write(body)
+        return len(header) + len(body)
+
+    def build(self, sources: List[str], output_file: str, force: bool = False,
+              map_file: Optional[str] = None) -> int:
+        """
+        Сборка программы из исходных текстов модулей
+
+        Returns:
+            Размер выходного файла в байтах
+        """
+        modules = []
+        self.rebuilt = 0
+        for source in sources:
+            module, rebuilt = self.load_module(source, force)
+            modules.append((source, module))
+            self.rebuilt += rebuilt
+
+        code, segments, symbols = self.link(modules)
+        self.count = len(code) // 4
+        size = self.write(code, segments, output_file)
+
+        print(f"Модули: {len(modules)}, пересобрано {self.rebuilt}")
+        print(f"Скомпоновано: {self.count} команд, {len(symbols)} областей данных → "
+              f"{output_file} ({size} байт)")
+
+        if map_file:
+            sizes = {name: length for _, module in modules
+                     for name, (length, _) in module['data'].items()}
+            with open(map_file, 'w', encoding='utf-8') as f:
+                json.dump({name: {'address': address, 'size': sizes[name]}
+                           for name, address in symbols.items()}, f, indent=2, ensure_ascii=False)
+            print(f"Карта размещения сохранена в: {map_file}")
+
+        return size
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Компоновщик УВМ',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры использования:
+  Сборка:       python uvm_link.py setup.json kernel.json -o program.uvo
+  Адреса с 4096: python uvm_link.py setup.json kernel.json -o program.uvo --data-base 4096
+  Карта:        python uvm_link.py setup.json kernel.json -o program.uvo --map map.json
+  Запуск:       python uvm_interp.py program.uvo dump.json 0 1000
+        """
+    )
+    parser.add_argument('sources', nargs='+', help='Исходные тексты модулей (JSON)')
+    parser.add_argument('-o', '--output', required=True, help='Выходной файл программы')
+    parser.add_argument('--data-base', type=int, default=0,
+                       help='Адрес первой области данных (по умолчанию 0)')
+    parser.add_argument('--build-dir', help='Каталог перемещаемых модулей (.uvr)')
+    parser.add_argument('--compact', action='store_true',
+                       help='Компактный бинарный формат (команды переменной длины)')
+    parser.add_argument('--header', action='store_true',
+                       help='Заголовок с числом команд и контрольной суммой')
+    parser.add_argument('--map', help='Сохранить адреса областей данных в JSON файл')
+    parser.add_argument('--force', action='store_true',
+                       help='Пересобрать все модули')
+
+    args = parser.parse_args()
+
+    if args.build_dir:
+        os.makedirs(args.build_dir, exist_ok=True)
+
+    linker = UVMLinker(args.data_base, args.build_dir, args.compact, args.header)
+    try:
+        linker.build(args.sources, args.output, args.force, args.map)
+    except FileNotFoundError as e:
+        print(f"Файл не найден: {e.filename}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Ошибка компоновки: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Параллельное выполнение программ УВМ
+Независимые цепочки команд выполняются в отдельных процессах над общей памятью
+"""
+
+import contextlib
+import io
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+from uvm_analysis import UVMAnalyzer
+from uvm_interp import UVMInterpreter
+
+def _execute_chains(shm_name: str, initial_acc: int,
+                    chains: List[List[Tuple[int, int, int]]]) -> List[Tuple[int, int, int, int]]:
+    """
+    Выполнение группы цепочек в рабочем процессе
+
+    Returns:
+        Для каждой цепочки кортеж (команд, обращений к памяти, операций sqrt, ACC)
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    memory = shm.buf.cast('q')
+    results = []
+
+    try:
+        # Вывод отдельных команд из разных процессов перемешался бы
+        with contextlib.redirect_stdout(io.StringIO()):
+            for chain in chains:
+                interpreter = UVMInterpreter(mem_size=0, max_commands=len(chain))
+                interpreter.memory = memory
+                interpreter.acc = initial_acc
+                interpreter.instructions = chain
+                interpreter.run()
+                results.append((interpreter.commands_executed, interpreter.memory_accesses,
+                                interpreter.sqrt_operations, interpreter.acc))
+    finally:
+        memory.release()
+        shm.close()
+
+    return results
+
+class UVMParallelExecutor:
+    """Исполнитель независимых цепочек команд на нескольких процессах"""
+
+    # Программы короче этого порога выполняются последовательно:
+    # запуск процессов обходится дороже самого выполнения
+    MIN_COMMANDS = 2000
+
+    def __init__(self, interpreter: UVMInterpreter, workers: Optional[int] = None,
+                 min_commands: int = MIN_COMMANDS):
+        """
+        Args:
+            interpreter: интерпретатор с загруженной программой и памятью
+            workers: число рабочих процессов (по умолчанию - число ядер)
+            min_commands: минимальная длина программы для параллельного запуска
+        """
+        self.interpreter = interpreter
+        self.workers = workers or os.cpu_count() or 1
+        self.min_commands = min_commands
+
+    def distribute(self, chains: List[List[int]]) -> List[List[List[int]]]:
+        """Детерминированное распределение цепочек по процессам (сначала длинные)"""
+        groups = [[] for _ in range(min(self.workers, len(chains)))]
+        loads = [0] * len(groups)
+
+        for chain in sorted(chains, key=lambda c: (-len(c), c[0])):
+            target = loads.index(min(loads))
+            groups[target].append(chain)
+            loads[target] += len(chain)
+
+        return groups
+
+    def run(self) -> int:
+        """
+        Выполнение программы
+
+        Returns:
+            Количество независимых цепочек (1 - выполнено последовательно)
+        """
+        interp = self.interpreter
+        if interp.instructions is None:
+            interp.instructions = interp.decode_program()
+
+        # Срез, если он задан, сам является корректной программой
+        if interp.active is not None:
+            program = [interp.instructions[i] for i in interp.active]
+        else:
+            program = interp.instructions
+
+        chains = UVMAnalyzer(program, len(interp.memory), interp.acc).partition_chains()
+        if self.workers < 2 or len(chains) < 2 or len(program) < self.min_commands:
+            interp.run()
+            return 1
+
+        try:
+            packed = array('q', interp.memory)
+        except OverflowError:
+            # Значения не помещаются в 64-битные ячейки общей памяти
+            interp.run()
+            return 1
+
+        shm = shared_memory.SharedMemory(create=True, size=max(len(packed) * packed.itemsize, 1))
+        try:
+            shm.buf[:len(packed) * packed.itemsize] = packed.tobytes()
+
+            groups = self.distribute(chains)
+            with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+                futures = [pool.submit(_execute_chains, shm.name, interp.acc,
+                                       [[program[i] for i in chain] for chain in group])
+                           for group in groups]
+                results = {}
+                for group, future in zip(groups, futures):
+                    for chain, stats in zip(group, future.result()):
+                        results[chain[0]] = stats
+
+            memory = shm.buf.cast('q')
+            interp.memory[:] = memory.tolist()
+            memory.release()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self.merge(chains, results, program)
+        print(f"Параллельное выполнение: {len(chains)} независимых цепочек "
+              f"на {len(groups)} процессах")
+        print(f"Статистика: {interp.commands_executed} команд, "
+              f"{interp.memory_accesses} обращений к памяти, "
+              f"{interp.sqrt_operations} операций sqrt")
+
+        return len(chains)
+
+    def merge(self, chains: List[List[int]], results: dict, program: List[Tuple[int, int, int]]):
+        """Детерминированное объединение статистики и итогового ACC"""
+        interp = self.interpreter
+
+        for chain in chains:
+            commands, accesses, sqrts, _ = results[chain[0]]
+            interp.commands_executed += commands
+            interp.memory_accesses += accesses
+            interp.sqrt_operations += sqrts
+
+        # Итоговый ACC - из цепочки, содержащей последнее определение ACC
+        last_def = max((i for i, (opcode, _, _) in enumerate(program) if opcode in (10, 0)),
+                       default=None)
+        if last_def is not None:
+            owner = next(chain for chain in chains if last_def in chain)
+            interp.acc = results[owner[0]][3]
+
+        interp.pc = interp.format.offsets(interp.program)[-1]
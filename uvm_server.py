@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Промышленный запуск web интерфейса УВМ
+Рабочие процессы создаются заранее (prefork) и принимают соединения
+с общего слушающего сокета; приложение загружается до fork
+"""
+
+import gc
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+class UVMServerConfig:
+    """Параметры промышленного запуска"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 5000,
+                 workers: Optional[int] = None, threads: int = 8,
+                 timeout: float = 30.0, server: str = 'auto', access_log: bool = False):
+        """
+        Args:
+            workers: число рабочих процессов (по умолчанию - число ядер)
+            threads: потоков обработки запросов в каждом процессе
+            timeout: наибольшее время ожидания данных соединения, секунд
+                (для gunicorn - и время обработки запроса)
+            server: 'gunicorn', 'wsgiref' или 'auto' (gunicorn, если установлен)
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.threads = threads
+        self.timeout = timeout
+        self.server = server
+        self.access_log = access_log
+
+class UVMRequestHandler(WSGIRequestHandler):
+    """Обработчик соединения с таймаутом сокета и необязательным журналом запросов"""
+
+    access_log = False
+
+    def log_request(self, code='-', size='-'):
+        if self.access_log:
+            super().log_request(code, size)
+
+class UVMWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    """
+    WSGI сервер рабочего процесса: запрос обрабатывается в отдельном потоке
+
+    Одновременно обрабатывается не больше threads запросов; занятый
+    процесс не принимает соединения, и их принимают другие процессы.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, handler, threads: int = 8):
+        super().__init__(address, handler)
+        self.slots = threading.BoundedSemaphore(threads)
+
+    def process_request(self, request, client_address):
+        self.slots.acquire()
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.slots.release()
+
+class UVMPreforkServer:
+    """
+    Prefork сервер на wsgiref
+
+    Главный процесс открывает слушающий сокет, загружает приложение и
+    создает рабочие процессы fork; страницы памяти приложения (пул УВМ,
+    шаблоны, реестр программ) остаются общими, пока процесс их не изменит.
+    Завершившийся рабочий процесс перезапускается. SIGTERM или SIGINT
+    главному процессу останавливает все рабочие процессы.
+    """
+
+    # Рабочий процесс, завершившийся быстрее, перезапускается с задержкой
+    MIN_LIFETIME = 1.0
+
+    def __init__(self, app, config: UVMServerConfig):
+        self.app = app
+        self.config = config
+        self.server: Optional[UVMWSGIServer] = None
+        self.workers: Dict[int, float] = {}  # pid -> время запуска
+
+    def bind(self):
+        handler = type('Handler', (UVMRequestHandler,), {
+            'timeout': self.config.timeout, 'access_log': self.config.access_log})
+        self.server = UVMWSGIServer((self.config.host, self.config.port), handler,
+                                    self.config.threads)
+        self.server.set_app(self.app)
+        # Готовое соединение принимает один из процессов, остальные
+        # получают BlockingIOError и продолжают ждать
+        self.server.socket.setblocking(False)
+
+    def serve(self):
+        if self.server is None:
+            self.bind()
+        # Объекты, созданные до fork, не просматриваются сборщиком мусора,
+        # иначе он изменял бы их страницы в каждом процессе
+        gc.collect()
+        gc.freeze()
+
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+            raise SystemExit
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        try:
+            for _ in range(self.config.workers):
+                self.spawn()
+            while not stopping:
+                pid, _ = os.wait()
+                started = self.workers.pop(pid, None)
+                if started is not None and not stopping:
+                    if time.monotonic() - started < self.MIN_LIFETIME:
+                        time.sleep(self.MIN_LIFETIME)
+                    self.spawn()
+        except SystemExit:
+            pass
+        finally:
+            self.stop()
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return
+
+        # Рабочий процесс: SIGINT от терминала обрабатывает главный процесс
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, lambda signum, frame: os._exit(0))
+        try:
+            self.server.serve_forever()
+        finally:
+            os._exit(0)
+
+    def stop(self):
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.workers.clear()
+        self.server.server_close()
+
+def serve_gunicorn(app, config: UVMServerConfig):
+    """Запуск под gunicorn (preload_app: приложение загружается до fork)"""
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            settings = {
+                'bind': f"{config.host}:{config.port}",
+                'workers': config.workers,
+                'threads': config.threads,
+                'timeout': config.timeout,
+                'preload_app': True,
+                'accesslog': '-' if config.access_log else None,
+            }
+            for name, value in settings.items():
+                self.cfg.set(name, value)
+
+        def load(self):
+            return app
+
+    gc.collect()
+    gc.freeze()
+    Application().run()
+
+def serve(app, config: UVMServerConfig, preload: Optional[Callable[[], None]] = None):
+    """
+    Промышленный запуск приложения
+
+    preload вызывается в главном процессе до создания рабочих процессов.
+    """
+    server = config.server
+    if server == 'auto':
+        try:
+            import gunicorn  # noqa: F401
+            server = 'gunicorn'
+        except ImportError:
+            server = 'wsgiref'
+
+    if preload is not None:
+        preload()
+
+    print(f"Сервер УВМ ({server}): http://{config.host}:{config.port}, "
+          f"{config.workers} процессов по {config.threads} потоков")
+    if server == 'gunicorn':
+        serve_gunicorn(app, config)
+        return
+
+    prefork = UVMPreforkServer(app, config)
+    prefork.bind()
+    if not hasattr(os, 'fork'):
+        print("⚠ Предупреждение: fork недоступен, запросы обрабатывает один процесс",
+              file=sys.stderr)
+        with prefork.server:
+            prefork.server.socket.setblocking(True)
+            prefork.server.serve_forever()
+        return
+    prefork.serve()
@@ -4,55 +4,370 @@ Web интерфейс для УВМ - Вариант 20
 """
 
 from flask import Flask, render_template, request, jsonify
+import argparse
+import bisect
+import contextlib
+import hashlib
 import json
-import math
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+
+from uvm_asm import UVMAssembler
+from uvm_format import UVMBinaryFormat
+from uvm_interp import UVMInterpreter
 
 app = Flask(__name__)
+# Число рабочих процессов сервера: реестр программ и сеансы хранятся
+# в процессе, поэтому при нескольких процессах изменять их через API нельзя
+app.config['UVM_WORKERS'] = 1
+
+class UVMStepRecorder:
+    """
+    Запись шагов выполнения для web интерфейса
+    
+    Наблюдатель интерпретатора: вызывается после каждой команды
+    и описывает ее по состоянию УВМ после выполнения.
+    """
+    
+    def __init__(self, interpreter: UVMInterpreter, mnemonics: dict):
+        self.interpreter = interpreter
+        self.mnemonics = mnemonics
+        self.steps = []
+        self.output = []
+    
+    def __call__(self, index, opcode, operand, count, before_acc):
+        memory = self.interpreter.memory
+        size = len(memory)
+        acc = self.interpreter.acc
+        name = self.mnemonics.get(opcode, str(opcode))
+        length = count or 1
+        step = {'index': index, 'opcode': name, 'operand': operand, 'before_acc': before_acc}
+        
+        if opcode == 10:  # LOAD_CONST
+            step['description'] = f"LOAD_CONST {operand} → ACC={acc}"
+        
+        elif opcode == 0:  # LOAD_MEM
+            addr = before_acc + operand
+            if 0 <= addr < size:
+                step['address'] = addr
+                step['value'] = acc
+                step['description'] = f"LOAD_MEM {operand} → MEM[{addr}]={acc}"
+            else:
+                step['error'] = f"Адрес {addr} вне памяти"
+        
+        elif opcode == 14:  # STORE_MEM
+            if 0 <= operand < size:
+                step['address'] = operand
+                step['value'] = acc
+                step['description'] = f"STORE_MEM {operand} ← ACC={acc}"
+            else:
+                step['error'] = f"Адрес {operand} вне памяти"
+        
+        elif opcode in (2, 4):  # SQRT, BLOCK_COPY
+            src_addr, dst_addr = before_acc, operand
+            if 0 <= src_addr and src_addr + length <= size and 0 <= dst_addr and dst_addr + length <= size:
+                step['src_addr'] = src_addr
+                step['dst_addr'] = dst_addr
+                if count or opcode == 4:
+                    step['count'] = length
+                    step['description'] = (f"{name} MEM[{src_addr}..{src_addr + length - 1}] → "
+                                           f"MEM[{dst_addr}..{dst_addr + length - 1}]")
+                else:
+                    result = memory[dst_addr]
+                    step['result'] = result
+                    if src_addr != dst_addr:
+                        step['src_value'] = memory[src_addr]
+                        step['description'] = (f"SQRT MEM[{src_addr}]={memory[src_addr]} → "
+                                               f"MEM[{dst_addr}]={result}")
+                    else:
+                        step['description'] = f"SQRT MEM[{src_addr}] → MEM[{dst_addr}]={result}"
+            else:
+                step['error'] = "Неверные адреса"
+        
+        elif opcode == 5:  # BLOCK_FILL
+            if 0 <= operand and operand + length <= size:
+                step['dst_addr'] = operand
+                step['count'] = length
+                step['description'] = (f"BLOCK_FILL MEM[{operand}..{operand + length - 1}] "
+                                       f"← ACC={acc}")
+            else:
+                step['error'] = f"Блок {operand}..{operand + length - 1} вне памяти"
+        
+        elif opcode in UVMInterpreter.JUMP_OPCODES:
+            taken = opcode == 6 or (opcode == 7 and acc == 0) or (opcode == 8 and acc < 0)
+            step['taken'] = taken
+            step['description'] = f"{name} {operand} → " + ("переход" if taken else "без перехода")
+        
+        else:
+            step['error'] = f"Неизвестная команда '{name}'"
+        
+        step['after_acc'] = acc
+        self.record(step)
+    
+    def record(self, step: dict):
+        """Сохранение описанного шага"""
+        self.steps.append(step)
+        self.output.append(step.get('description',
+                                    f"Команда {step['index']}: {step['opcode']} {step['operand']}"))
+
+class UVMStepColumns:
+    """
+    Запись шагов параллельными массивами (колоночный режим ответа)
+    
+    Вместо словаря на шаг - по одному значению в каждом массиве:
+    индекс команды, код операции, операнд, ACC после команды, адрес
+    обращения к памяти и значение (None, если команда их не имеет).
+    """
+    
+    def __init__(self, interpreter: UVMInterpreter):
+        self.interpreter = interpreter
+        self.index, self.opcode, self.operand = [], [], []
+        self.acc, self.addr, self.value = [], [], []
+    
+    def __call__(self, index, opcode, operand, count, before_acc):
+        acc = self.interpreter.acc
+        addr = value = None
+        if opcode == 0:  # LOAD_MEM
+            addr, value = before_acc + operand, acc
+        elif opcode == 14:  # STORE_MEM
+            addr, value = operand, acc
+        elif opcode in (2, 4, 5):  # SQRT, BLOCK_COPY, BLOCK_FILL - адрес назначения
+            addr = operand
+            if opcode == 2 and not count and operand < len(self.interpreter.memory):
+                value = self.interpreter.memory[operand]
+        
+        self.index.append(index)
+        self.opcode.append(opcode)
+        self.operand.append(operand)
+        self.acc.append(acc)
+        self.addr.append(addr)
+        self.value.append(value)
+    
+    def columns(self) -> dict:
+        return {'index': self.index, 'opcode': self.opcode, 'operand': self.operand,
+                'acc': self.acc, 'addr': self.addr, 'value': self.value}
+
+class UVMWriteLog:
+    """
+    Журнал записей в память: (шаг, начало, конец) для каждой записывающей команды
+    
+    Наблюдатель интерпретатора; передает вызов следующему наблюдателю.
+    Шаги нумеруются с 1 в порядке выполнения.
+    """
+    
+    def __init__(self, memory_size: int, observer=None):
+        self.memory_size = memory_size
+        self.observer = observer
+        self.step = 0
+        self.writes = []
+        self.steps = []  # Шаги записей (для поиска по шагу)
+    
+    def __call__(self, index, opcode, operand, count, before_acc):
+        self.step += 1
+        if opcode in UVMWeb.WRITE_OPCODES and operand < self.memory_size:
+            self.writes.append((operand, min(operand + (count or 1), self.memory_size)))
+            self.steps.append(self.step)
+        if self.observer is not None:
+            self.observer(index, opcode, operand, count, before_acc)
+    
+    def changed_since(self, step: int) -> list:
+        """Отсортированные адреса, в которые выполнялась запись после шага step"""
+        first = bisect.bisect_right(self.steps, step)
+        return UVMWeb.addresses(self.writes[first:], self.memory_size)
+
+class UVMStepStream(UVMStepRecorder):
+    """
+    Передача шагов выполнения в очередь потоковой выдачи
+    
+    Шаги отправляются пачками; очередь ограничена, поэтому выполнение
+    приостанавливается, пока клиент не прочитает предыдущие пачки.
+    Если клиент отключился, выполнение прерывается.
+    """
+    
+    BATCH = 256
+    
+    def __init__(self, interpreter: UVMInterpreter, mnemonics: dict, sink: queue.Queue,
+                 cancelled: threading.Event):
+        super().__init__(interpreter, mnemonics)
+        self.sink = sink
+        self.cancelled = cancelled
+    
+    def record(self, step: dict):
+        self.steps.append(step)
+        if len(self.steps) >= self.BATCH:
+            self.flush()
+    
+    def flush(self):
+        """Отправка накопленных шагов"""
+        if self.steps:
+            if not self.put(self.steps):
+                self.interpreter.running = False
+            self.steps = []
+    
+    def put(self, item) -> bool:
+        """Отправка в очередь с ожиданием места; False, если клиент отключился"""
+        while not self.cancelled.is_set():
+            try:
+                self.sink.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
 
 class UVMWeb:
-    def __init__(self):
+    """
+    Экземпляр УВМ web интерфейса
+    
+    Программа ассемблируется UVMAssembler и выполняется UVMInterpreter,
+    как в командной строке; шаги записываются наблюдателем.
+    """
+    
+    # Команды, записывающие в память по адресу B (блоком длины N)
+    WRITE_OPCODES = (14, 2, 4, 5)
+    
+    # Наибольшее число команд программы из запроса (после разворачивания директив)
+    MAX_PROGRAM_COMMANDS = 1 << 18
+    
+    # Размер страницы запроса памяти по умолчанию и наибольший
+    MEMORY_PAGE = 1000
+    MAX_MEMORY_PAGE = 65536
+    
+    def __init__(self, max_commands: int = 10000):
         self.memory_size = 65536
-        self.memory = [0] * self.memory_size
-        self.acc = 0  # Аккумулятор
+        self.interpreter = UVMInterpreter(self.memory_size, max_commands)
+        # Сообщения интерпретатора описываются шагами, а не выводятся в консоль сервера
+        self.interpreter.log = self._ignore
+        self.assembler = UVMAssembler(self.MAX_PROGRAM_COMMANDS)
+        self.dirty = []  # Измененные диапазоны памяти [начало, конец)
+        self.write_log = None  # Журнал записей последнего выполнения
         
         # Таблица кодов операций
-        self.opcodes = {
-            'LOAD_CONST': 10,
-            'LOAD_MEM': 0,
-            'STORE_MEM': 14,
-            'SQRT': 2
-        }
+        self.opcodes = UVMAssembler.OPCODES
+        self.mnemonics = {code: name for name, code in self.opcodes.items()}
         
         # Описания команд
         self.descriptions = {
             'LOAD_CONST': "Размер команды: 3 байт. Операнд: поле В. Результат: регистр-аккумулятор.",
             'LOAD_MEM': "Размер команды: 3 байт. Операнд: значение в памяти по адресу, которым является сумма адреса (регистр-аккумулятор) и смещения (поле В). Результат: регистр-аккумулятор.",
             'STORE_MEM': "Размер команды: 3 байт. Операнд: регистр-аккумулятор. Результат: значение в памяти по адресу, которым является поле В.",
-            'SQRT': "Размер команды: 3 байт. Операнд: значение в памяти по адресу, которым является регистр-аккумулятор. Результат: значение в памяти по адресу, которым является поле В."
+            'SQRT': "Размер команды: 3 байт. Операнд: значение в памяти по адресу, которым является регистр-аккумулятор. Результат: значение в памяти по адресу, которым является поле В.",
+            'BLOCK_COPY': "Размер команды: 3 байт. Операнд: блок памяти длины N (байт 3) по адресу, которым является регистр-аккумулятор. Результат: блок памяти по адресу, которым является поле В.",
+            'BLOCK_FILL': "Размер команды: 3 байт. Операнд: регистр-аккумулятор. Результат: блок памяти длины N (байт 3) по адресу, которым является поле В.",
+            'JUMP': "Размер команды: 3 байт. Операнд: поле В (индекс команды). Результат: счетчик команд.",
+            'JUMP_ZERO': "Размер команды: 3 байт. Операнд: поле В (индекс команды), если регистр-аккумулятор равен 0. Результат: счетчик команд.",
+            'JUMP_NEG': "Размер команды: 3 байт. Операнд: поле В (индекс команды), если регистр-аккумулятор меньше 0. Результат: счетчик команд."
         }
         
         # Инициализируем тестовые данные
         self.initialize_memory()
     
+    @staticmethod
+    def _ignore(*args, **kwargs):
+        pass
+    
+    @property
+    def memory(self):
+        return self.interpreter.memory
+    
+    @property
+    def acc(self):
+        return self.interpreter.acc
+    
     def initialize_memory(self):
         """Инициализирует память тестовыми данными"""
-        self.memory[500] = 25   # √25 = 5
-        self.memory[501] = 100  # √100 = 10
-        self.memory[502] = 225  # √225 = 15
-        self.memory[520] = 100  # Для LOAD_CONST теста
-        self.memory[133] = 42   # Для LOAD_MEM теста
+        self.store_block(500, [25, 100, 225])  # √25 = 5, √100 = 10, √225 = 15
+        self.store_block(520, [100])  # Для LOAD_CONST теста
+        self.store_block(133, [42])   # Для LOAD_MEM теста
+    
+    def store_block(self, addr, values):
+        """Запись блока значений в память с отметкой измененного диапазона"""
+        self.interpreter.store_block(addr, values)
+        self.dirty.append((addr, addr + len(values)))
     
     def reset(self):
-        """Сброс состояния"""
-        self.memory = [0] * self.memory_size
-        self.acc = 0
+        """
+        Сброс состояния
+        
+        Обнуляются только измененные ячейки; память пересоздается, лишь
+        если изменений больше, чем ячеек в ней.
+        """
+        memory = self.interpreter.memory
+        if sum(end - start for start, end in self.dirty) >= self.memory_size:
+            self.interpreter.memory = [0] * self.memory_size
+        else:
+            for start, end in self.dirty:
+                memory[start:end] = [0] * (end - start)
+        self.dirty = []
+        self.write_log = None
+        self.interpreter.acc = 0
         self.initialize_memory()
     
+    def translate(self, program_json):
+        """Ассемблирование JSON текста программы в промежуточное представление"""
+        program = json.loads(program_json)
+        return self.assembler.translate_to_intermediate(program.get('program', []))
+    
+    def decode(self, program_json) -> list:
+        """Декодированная программа: список (код операции, операнд, число элементов)"""
+        return [(cmd.opcode, cmd.operand, cmd.count) for cmd in self.translate(program_json)]
+    
+    @staticmethod
+    def decode_binary(data: bytes):
+        """
+        Декодирование бинарной программы или объектного файла
+        
+        Returns:
+            Кортеж (команды, сегменты данных [(базовый адрес, значения)])
+        """
+        fmt, offset = UVMBinaryFormat.detect(data)
+        if (fmt.checksum is not None
+                and UVMBinaryFormat.crc32(data[fmt.header_size:]) != fmt.checksum):
+            raise ValueError("Контрольная сумма программы не совпадает с заголовком")
+        with memoryview(data) as view:
+            segments = [(base, UVMBinaryFormat.unpack_words(view, start, length))
+                        for base, start, length in fmt.segments]
+        
+        code = data[offset:]
+        instructions = fmt.decode(code)
+        if fmt.offsets(code)[-1] != len(code):
+            raise ValueError("Последняя команда программы обрезана")
+        if fmt.count is not None and fmt.count != len(instructions):
+            raise ValueError(f"В заголовке {fmt.count} команд, декодировано {len(instructions)}")
+        if len(instructions) > UVMWeb.MAX_PROGRAM_COMMANDS:
+            raise ValueError(f"В программе {len(instructions)} команд, наибольшее число - "
+                             f"{UVMWeb.MAX_PROGRAM_COMMANDS}")
+        return instructions, segments
+    
+    @staticmethod
+    def init_segments(values) -> list:
+        """
+        Начальная память запроса {адрес: значение} (формат --init-memory)
+        в виде непрерывных сегментов
+        """
+        if not isinstance(values, dict):
+            raise ValueError("Начальная память задается объектом {адрес: значение}")
+        cells = {}
+        for addr, value in values.items():
+            if not (isinstance(addr, int) or str(addr).isdigit()):
+                raise ValueError(f"Некорректный адрес {addr!r}")
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError(f"Некорректное значение {value!r} по адресу {addr}")
+            cells[int(addr)] = value
+        return UVMBinaryFormat.segments_from_memory(cells)
+    
     def assemble_program(self, program_json):
         """Ассемблирует программу"""
         try:
-            program = json.loads(program_json)
-            commands = program.get('program', [])
+            intermediate = self.translate(program_json)
+            fmt = UVMBinaryFormat.for_program((cmd.opcode, cmd.operand, cmd.count)
+                                              for cmd in intermediate)
             
             result = {
                 'success': True,
@@ -61,130 +376,573 @@ class UVMWeb:
                 'hex_bytes': []
             }
             
-            for i, cmd in enumerate(commands):
-                opcode = cmd.get('opcode', '').upper()
-                operand = cmd.get('operand', 0)
+            for i, cmd in enumerate(intermediate):
+                opcode = self.mnemonics[cmd.opcode]
+                hex_str = ", ".join(f"0x{byte:02X}" for byte in self.assembler.encode_command(cmd, fmt))
                 
-                if opcode in self.opcodes:
-                    # Формируем байты
-                    byte1 = (self.opcodes[opcode] << 4) | ((operand >> 8) & 0x0F)
-                    byte2 = operand & 0xFF
-                    byte3 = 0
-                    
-                    hex_str = f"0x{byte1:02X}, 0x{byte2:02X}, 0x{byte3:02X}"
-                    
-                    command_info = {
-                        'index': i,
-                        'opcode': opcode,
-                        'operand': operand,
-                        'description': self.descriptions[opcode],
-                        'test': f"Тест (A={self.opcodes[opcode]}, B={operand}):",
-                        'hex_bytes': hex_str,
-                        'comment': cmd.get('comment', '')
-                    }
-                    
-                    result['commands'].append(command_info)
-                    result['output'].append(f"Команда {i}: {opcode} {operand}")
-                    result['hex_bytes'].append(hex_str)
-                else:
-                    result['output'].append(f"ОШИБКА: Неизвестная команда '{opcode}'")
+                command_info = {
+                    'index': i,
+                    'opcode': opcode,
+                    'operand': cmd.operand,
+                    'description': self.descriptions[opcode],
+                    'test': f"Тест (A={cmd.opcode}, B={cmd.operand}):",
+                    'hex_bytes': hex_str,
+                    'comment': cmd.comment
+                }
+                if cmd.count:
+                    command_info['count'] = cmd.count
+                
+                result['commands'].append(command_info)
+                suffix = f" N={cmd.count}" if cmd.count else ""
+                result['output'].append(f"Команда {i}: {opcode} {cmd.operand}{suffix}")
+                result['hex_bytes'].append(hex_str)
             
             return result
         
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    def execute_program(self, program_json):
-        """Выполняет программу"""
+    # Режимы ответа с шагами выполнения
+    MODES = ('steps', 'columns', 'summary')
+    
+    def execute_program(self, program_json, mode='steps'):
+        """
+        Выполняет программу
+        
+        Args:
+            program_json: JSON текст программы
+            mode: 'steps' - шаги словарями (steps и output),
+                'columns' - шаги параллельными массивами (columns),
+                'summary' - только итоговые ACC и память, без записи шагов
+        """
         try:
-            program = json.loads(program_json)
-            commands = program.get('program', [])
-            
-            # Сбрасываем состояние
-            self.reset()
+            instructions = self.decode(program_json)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+        return self.execute_instructions(instructions, mode=mode)
+    
+    def execute_instructions(self, instructions, segments=(), mode='steps'):
+        """
+        Выполняет декодированную программу
+        
+        Args:
+            instructions: список (код операции, операнд, число элементов)
+            segments: начальная память [(базовый адрес, значения)] поверх тестовых данных
+            mode: режим ответа, как у execute_program
+        """
+        try:
+            observer = self.observer(mode)
+            self.load_instructions(instructions, segments)
+            self.step(observer=observer)
             
             result = {
                 'success': True,
-                'steps': [],
-                'memory_dump': {},
-                'final_acc': self.acc,
-                'output': []
+                'memory_dump': self.memory_dump(),
+                'final_acc': self.acc
             }
-            
-            for i, cmd in enumerate(commands):
-                opcode = cmd.get('opcode', '').upper()
-                operand = cmd.get('operand', 0)
-                
-                step_info = {
-                    'index': i,
-                    'opcode': opcode,
-                    'operand': operand,
-                    'before_acc': self.acc
-                }
-                
-                if opcode == 'LOAD_CONST':
-                    self.acc = operand
-                    step_info['after_acc'] = self.acc
-                    step_info['description'] = f"LOAD_CONST {operand} → ACC={self.acc}"
-                    
-                elif opcode == 'LOAD_MEM':
-                    addr = self.acc + operand
-                    if 0 <= addr < self.memory_size:
-                        self.acc = self.memory[addr]
-                        step_info['after_acc'] = self.acc
-                        step_info['address'] = addr
-                        step_info['value'] = self.memory[addr]
-                        step_info['description'] = f"LOAD_MEM {operand} → MEM[{addr}]={self.acc}"
-                    else:
-                        step_info['error'] = f"Адрес {addr} вне памяти"
-                        
-                elif opcode == 'STORE_MEM':
-                    if 0 <= operand < self.memory_size:
-                        self.memory[operand] = self.acc
-                        step_info['address'] = operand
-                        step_info['value'] = self.acc
-                        step_info['after_acc'] = self.acc
-                        step_info['description'] = f"STORE_MEM {operand} ← ACC={self.acc}"
-                    else:
-                        step_info['error'] = f"Адрес {operand} вне памяти"
-                        
-                elif opcode == 'SQRT':
-                    src_addr = self.acc
-                    dst_addr = operand
-                    
-                    if 0 <= src_addr < self.memory_size and 0 <= dst_addr < self.memory_size:
-                        value = self.memory[src_addr]
-                        result_val = int(math.sqrt(abs(value)))
-                        self.memory[dst_addr] = result_val
-                        step_info['src_addr'] = src_addr
-                        step_info['dst_addr'] = dst_addr
-                        step_info['src_value'] = value
-                        step_info['result'] = result_val
-                        step_info['after_acc'] = self.acc
-                        step_info['description'] = f"SQRT MEM[{src_addr}]={value} → MEM[{dst_addr}]={result_val}"
-                    else:
-                        step_info['error'] = "Неверные адреса"
-                        
-                else:
-                    step_info['error'] = f"Неизвестная команда '{opcode}'"
-                
-                result['steps'].append(step_info)
-                result['output'].append(step_info.get('description', f"Команда {i}: {opcode} {operand}"))
-            
-            # Формируем дамп памяти
-            for addr in range(1000):
-                if self.memory[addr] != 0:
-                    result['memory_dump'][str(addr)] = self.memory[addr]
-            
-            result['final_acc'] = self.acc
-            
+            result.update(self.observed(mode, observer))
             return result
         
         except Exception as e:
             return {'success': False, 'error': str(e)}
+    
+    def observer(self, mode):
+        """Наблюдатель, записывающий шаги в режиме ответа mode (None для 'summary')"""
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим ответа '{mode}' (допустимы: "
+                             f"{', '.join(self.MODES)})")
+        if mode == 'steps':
+            return UVMStepRecorder(self.interpreter, self.mnemonics)
+        if mode == 'columns':
+            return UVMStepColumns(self.interpreter)
+        return None
+    
+    @staticmethod
+    def observed(mode, observer) -> dict:
+        """Поля ответа с записанными шагами"""
+        if mode == 'steps':
+            return {'steps': observer.steps, 'output': observer.output}
+        if mode == 'columns':
+            return {'columns': observer.columns()}
+        return {}
+    
+    def run(self, program_json, observer=None, track_writes=False):
+        """
+        Ассемблирование и выполнение программы с начальной памяти
+        
+        С track_writes записи команд сохраняются в журнал (write_log)
+        для запросов измененных ячеек по шагам.
+        
+        Returns:
+            Словарь с итоговым ACC (final_acc) и дампом памяти (memory_dump)
+        """
+        self.load(program_json, track_writes)
+        self.step(observer=observer)
+        return {'final_acc': self.acc, 'memory_dump': self.memory_dump()}
+    
+    def load(self, program_json, track_writes=False) -> int:
+        """
+        Ассемблирование программы и сброс состояния без выполнения
+        
+        Returns:
+            Число команд программы
+        """
+        return self.load_instructions(self.decode(program_json), track_writes=track_writes)
+    
+    def load_instructions(self, instructions, segments=(), track_writes=False) -> int:
+        """
+        Сброс состояния и загрузка декодированной программы без выполнения
+        
+        Список команд не изменяется, поэтому его можно разделять между
+        экземплярами (реестр программ).
+        
+        Returns:
+            Число команд программы
+        """
+        # Сбрасываем состояние
+        self.reset()
+        for base, values in segments:
+            if base < 0 or base + len(values) > self.memory_size:
+                raise ValueError(f"Начальная память {base}..{base + len(values) - 1} "
+                                 f"вне памяти данных")
+            self.store_block(base, values)
+        
+        # Команды пишут только по адресу B, поэтому измененные ячейки
+        # известны до выполнения
+        self.dirty.extend((operand, min(operand + (count or 1), self.memory_size))
+                          for opcode, operand, count in instructions
+                          if opcode in self.WRITE_OPCODES and operand < self.memory_size)
+        
+        self.interpreter.load_instructions(instructions)
+        self.write_log = UVMWriteLog(self.memory_size) if track_writes else None
+        return len(instructions)
+    
+    def step(self, count=None, observer=None) -> Optional[int]:
+        """
+        Выполнение следующих count команд загруженной программы (None - до конца)
+        
+        Returns:
+            Число выполненных команд (известно при ведении журнала записей)
+        """
+        if self.write_log is None:
+            self.interpreter.run(observer=observer, max_steps=count)
+            return None
+        
+        before = self.write_log.step
+        self.write_log.observer = observer
+        self.interpreter.run(observer=self.write_log, max_steps=count)
+        return self.write_log.step - before
+    
+    @staticmethod
+    def addresses(ranges, memory_size: int) -> list:
+        """Отсортированные адреса объединения диапазонов [начало, конец)"""
+        cells = set()
+        for start, end in ranges:
+            cells.update(range(start, end))
+            if len(cells) == memory_size:
+                break
+        return sorted(cells)
+    
+    def memory_dump(self) -> dict:
+        """
+        Ненулевые ячейки всей памяти
+        
+        Ненулевыми могут быть только начальные данные и ячейки, в которые
+        писали команды, поэтому просматриваются только измененные диапазоны.
+        """
+        memory = self.memory
+        return {str(addr): memory[addr] for addr in self.addresses(self.dirty, self.memory_size)
+                if memory[addr]}
+    
+    def query_memory(self, ranges=None, since_step=None, offset=0, limit=MEMORY_PAGE) -> dict:
+        """
+        Запрос ячеек памяти по диапазонам адресов с разбиением на страницы
+        
+        Args:
+            ranges: список диапазонов [начало, конец) (по умолчанию - вся память)
+            since_step: только ячейки, в которые писали после этого шага
+                (включая обнуленные); нужен журнал записей (run с track_writes).
+                Без него - ненулевые ячейки
+            offset: число пропускаемых ячеек
+            limit: наибольшее число ячеек в ответе
+        
+        Returns:
+            Словарь: cells {адрес: значение}, total (ячеек по запросу),
+            offset, limit, next_offset (None на последней странице)
+            и step (выполнено шагов - точка отсчета для следующего since_step)
+        """
+        if ranges is None:
+            ranges = [(0, self.memory_size)]
+        ranges = self.merge_ranges(ranges)
+        if not (isinstance(offset, int) and offset >= 0):
+            raise ValueError(f"Некорректное смещение {offset!r}")
+        if not (isinstance(limit, int) and 0 < limit <= self.MAX_MEMORY_PAGE):
+            raise ValueError(f"Размер страницы должен быть от 1 до {self.MAX_MEMORY_PAGE}")
+        
+        memory = self.memory
+        if since_step is None:
+            candidates = self.addresses(self.dirty, self.memory_size)
+        else:
+            if not isinstance(since_step, int):
+                raise ValueError(f"Некорректный шаг {since_step!r}")
+            if self.write_log is None:
+                raise ValueError("Журнал записей не ведется")
+            candidates = self.write_log.changed_since(since_step)
+        
+        selected = []
+        for start, end in ranges:
+            selected += candidates[bisect.bisect_left(candidates, start):
+                                   bisect.bisect_left(candidates, end)]
+        if since_step is None:
+            selected = [addr for addr in selected if memory[addr]]
+        
+        page = selected[offset:offset + limit]
+        return {
+            'cells': {str(addr): memory[addr] for addr in page},
+            'total': len(selected),
+            'offset': offset,
+            'limit': limit,
+            'next_offset': offset + limit if offset + limit < len(selected) else None,
+            'step': self.write_log.step if self.write_log is not None else None
+        }
+    
+    def merge_ranges(self, ranges) -> list:
+        """Проверка и объединение диапазонов адресов [начало, конец)"""
+        for item in ranges:
+            if not (isinstance(item, (list, tuple)) and len(item) == 2
+                    and all(isinstance(bound, int) for bound in item)
+                    and 0 <= item[0] < item[1]):
+                raise ValueError(f"Некорректный диапазон адресов {item!r}")
+        
+        merged = []
+        for start, end in sorted(ranges):
+            end = min(end, self.memory_size)
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            elif start < end:
+                merged.append([start, end])
+        return merged
 
-# Создаем экземпляр УВМ
-uvm = UVMWeb()
+class UVMPoolBusy(RuntimeError):
+    """Все экземпляры пула заняты дольше допустимого ожидания"""
+
+class UVMPool:
+    """
+    Пул заранее созданных экземпляров УВМ
+    
+    Каждый запрос получает собственный экземпляр, поэтому запросы
+    выполняются параллельно в потоках сервера, не изменяя состояние
+    друг друга. После запроса экземпляр сбрасывается (обнуляются только
+    измененные ячейки) и возвращается в пул. Если все экземпляры заняты
+    дольше timeout секунд, запрос получает UVMPoolBusy (ответ 503).
+    """
+    
+    def __init__(self, size: int = 8, factory=UVMWeb, timeout: float = 10.0):
+        self.size = size
+        self.timeout = timeout
+        # LIFO: недавно использованный экземпляр еще в кэше процессора
+        self.free = queue.LifoQueue()
+        for _ in range(size):
+            self.free.put(factory())
+    
+    def acquire(self) -> UVMWeb:
+        """Свободный экземпляр УВМ (ждет не дольше timeout секунд)"""
+        try:
+            return self.free.get(timeout=self.timeout)
+        except queue.Empty:
+            raise UVMPoolBusy(f"Все {self.size} экземпляров УВМ заняты, "
+                              f"повторите запрос позже") from None
+    
+    def release(self, vm: UVMWeb):
+        """Возврат экземпляра в пул"""
+        vm.reset()
+        self.free.put(vm)
+    
+    @contextlib.contextmanager
+    def checkout(self):
+        """Экземпляр УВМ на время запроса"""
+        vm = self.acquire()
+        try:
+            yield vm
+        finally:
+            self.release(vm)
+
+class UVMResultCache:
+    """
+    LRU кэш ответов API
+    
+    Каждое выполнение начинается с одной и той же начальной памяти, поэтому
+    ответ зависит только от программы и начального состояния. Ключ - хэш
+    нормализованного JSON программы (форматирование текста не влияет),
+    значение - готовое тело ответа.
+    """
+    
+    def __init__(self, max_bytes: int = 32 << 20, max_entry_size: int = 1 << 20):
+        """
+        Args:
+            max_bytes: наибольший общий размер ответов в кэше (байт)
+            max_entry_size: ответы больше этого размера (байт) не кэшируются
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_size = max_entry_size
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(kind: str, program_json, *state):
+        """Ключ ответа; None, если текст программы - некорректный JSON"""
+        try:
+            program = json.loads(program_json)
+        except (TypeError, ValueError):
+            return None
+        if isinstance(program, dict):
+            program = program.get('program', [])
+        normalized = json.dumps([kind, program, state], sort_keys=True, separators=(',', ':'),
+                                ensure_ascii=False)
+        return hashlib.sha256(normalized.encode('utf-8')).digest()
+    
+    def get(self, key):
+        """Тело ответа или None"""
+        with self.lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return body
+    
+    def put(self, key, body: str):
+        """Сохранение ответа; давно не использованные ответы вытесняются по общему размеру"""
+        # Размер строки в памяти процесса, а не длина в символах
+        size = sys.getsizeof(body)
+        if size > min(self.max_entry_size, self.max_bytes):
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= sys.getsizeof(old)
+            self.entries[key] = body
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= sys.getsizeof(evicted)
+    
+    def stats(self) -> dict:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries),
+                    'bytes': self.bytes, 'max_bytes': self.max_bytes}
+
+class UVMProgramRegistry:
+    """
+    Реестр программ в декодированном виде
+    
+    Программа (JSON или бинарный файл) ассемблируется или декодируется
+    один раз при регистрации; запросы выполнения ссылаются на нее по
+    идентификатору - хэшу команд и сегментов данных, поэтому повторная
+    регистрация той же программы возвращает тот же идентификатор.
+    При переполнении удаляется давно не использованная программа.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.programs = OrderedDict()  # Идентификатор -> (команды, сегменты)
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def program_id(instructions, segments) -> str:
+        digest = hashlib.sha256()
+        digest.update(UVMBinaryFormat.pack_segments(segments))
+        digest.update(json.dumps(instructions, separators=(',', ':')).encode())
+        return digest.hexdigest()[:24]
+    
+    def register(self, instructions, segments=()) -> str:
+        program_id = self.program_id(instructions, segments)
+        with self.lock:
+            if program_id in self.programs:
+                self.programs.move_to_end(program_id)
+            else:
+                self.programs[program_id] = (instructions, list(segments))
+                while len(self.programs) > self.capacity:
+                    self.programs.popitem(last=False)
+        return program_id
+    
+    def get(self, program_id: str):
+        """Кортеж (команды, сегменты) или None"""
+        with self.lock:
+            program = self.programs.get(program_id)
+            if program is not None:
+                self.programs.move_to_end(program_id)
+            return program
+    
+    def remove(self, program_id: str) -> bool:
+        with self.lock:
+            return self.programs.pop(program_id, None) is not None
+
+class UVMSession:
+    """Сеанс пошагового выполнения: экземпляр УВМ с загруженной программой"""
+    
+    def __init__(self, vm: UVMWeb, commands: int):
+        self.vm = vm
+        self.commands = commands
+        self.lock = threading.Lock()  # Запросы одного сеанса выполняются по очереди
+        self.last_used = time.monotonic()
+        # Сеанс закрыт, его экземпляр УВМ мог перейти к другому сеансу;
+        # запрос, ожидавший блокировку, проверяет флаг после ее получения
+        self.closed = False
+    
+    def state(self) -> dict:
+        interpreter = self.vm.interpreter
+        return {'acc': interpreter.acc, 'step': self.vm.write_log.step,
+                'position': interpreter.position, 'finished': interpreter.finished}
+
+class UVMSessionStore:
+    """
+    Сеансы пошагового выполнения
+    
+    Состояние УВМ хранится на сервере между запросами, поэтому шаг
+    выполнения стоит столько, сколько команд запрошено. Сеансы, к которым
+    не обращались дольше idle_timeout секунд, закрываются; число открытых
+    сеансов ограничено max_sessions. Экземпляры УВМ закрытых сеансов
+    сбрасываются и используются повторно.
+    """
+    
+    def __init__(self, max_sessions: int = 64, idle_timeout: float = 600.0):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = OrderedDict()  # В порядке последнего обращения
+        self.spare = []
+        self.lock = threading.Lock()
+    
+    def create(self, program_json) -> Optional[str]:
+        """
+        Открытие сеанса с программой
+        
+        Returns:
+            Идентификатор сеанса или None, если открыто max_sessions сеансов
+        """
+        with self.lock:
+            self._evict_expired()
+            if len(self.sessions) >= self.max_sessions:
+                return None
+            vm = self.spare.pop() if self.spare else None
+        
+        vm = vm or UVMWeb()
+        try:
+            commands = vm.load(program_json, track_writes=True)
+        except Exception:
+            self._release(vm)
+            raise
+        
+        with self.lock:
+            if len(self.sessions) >= self.max_sessions:
+                self._release(vm)
+                return None
+            session_id = secrets.token_urlsafe(12)
+            self.sessions[session_id] = UVMSession(vm, commands)
+        return session_id
+    
+    def get(self, session_id: str) -> Optional[UVMSession]:
+        """Сеанс по идентификатору (обновляет время последнего обращения)"""
+        with self.lock:
+            self._evict_expired()
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self.sessions.move_to_end(session_id)
+            return session
+    
+    def close(self, session_id: str) -> bool:
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        with session.lock:
+            session.closed = True
+            self._release(session.vm)
+        return True
+    
+    def _evict_expired(self):
+        """Закрытие сеансов, простаивающих дольше idle_timeout (под self.lock)"""
+        deadline = time.monotonic() - self.idle_timeout
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if session.last_used > deadline:
+                break
+            del self.sessions[session_id]
+            if session.lock.acquire(blocking=False):
+                session.closed = True
+                self._release(session.vm)
+                session.lock.release()
+            else:
+                # Экземпляр, занятый долгим запросом, не используется повторно;
+                # запросы, ожидающие блокировку, получат 404
+                session.closed = True
+    
+    def _release(self, vm: UVMWeb):
+        vm.reset()
+        self.spare.append(vm)
+
+# Пул экземпляров УВМ, кэш ответов, реестр программ и сеансы
+pool = UVMPool()
+# Потоковые ответы держат экземпляр, пока клиент читает, поэтому у них
+# собственный меньший пул
+stream_pool = UVMPool(size=pool.size // 2)
+cache = UVMResultCache()
+programs = UVMProgramRegistry()
+sessions = UVMSessionStore()
+# Потоки пакетного выполнения: по одному на экземпляр пула
+executor = ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix='uvm-batch')
+
+# Наибольшее число заданий в пакете
+MAX_BATCH = 1024
+
+def request_fields() -> Optional[dict]:
+    """Поля JSON тела запроса (пустое тело - без полей); None, если тело не объект"""
+    data = request.get_json(silent=True)
+    if data is None:
+        return {}
+    return data if isinstance(data, dict) else None
+
+def invalid_body():
+    return jsonify({'success': False, 'error': "Тело запроса должно быть JSON объектом"}), 400
+
+@app.errorhandler(UVMPoolBusy)
+def pool_busy(error):
+    response = jsonify({'success': False, 'error': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def process_local(action: str, hint: str):
+    """Ответ 409, если состояние процесса не общее для рабочих процессов (None иначе)"""
+    workers = app.config['UVM_WORKERS']
+    if workers <= 1:
+        return None
+    return jsonify({'success': False,
+                    'error': f"{action} недоступно: сервер запущен с {workers} рабочими "
+                             f"процессами, состояние каждого из них отдельное ({hint})"}), 409
+
+def cached_response(kind: str, program, compute, *state):
+    """
+    Ответ из кэша или результат compute(), сохраненный в кэш
+    
+    Заголовок X-UVM-Cache сообщает, был ли ответ взят из кэша.
+    """
+    key = cache.key(kind, program, *state)
+    body = cache.get(key) if key is not None else None
+    status = 'hit'
+    if body is None:
+        body = app.json.dumps(compute())
+        status = 'miss'
+        if key is not None:
+            cache.put(key, body)
+    
+    response = app.response_class(body, mimetype='application/json')
+    response.headers['X-UVM-Cache'] = status
+    return response
 
 @app.route('/')
 def index():
@@ -194,25 +952,442 @@ def index():
 @app.route('/api/assemble', methods=['POST'])
 def api_assemble():
     """API для ассемблирования"""
-    data = request.get_json()
+    data = request_fields()
+    if data is None:
+        return invalid_body()
     program = data.get('program', '')
     
-    result = uvm.assemble_program(program)
-    return jsonify(result)
+    def compute():
+        with pool.checkout() as uvm:
+            return uvm.assemble_program(program)
+    
+    return cached_response('assemble', program, compute)
 
 @app.route('/api/execute', methods=['POST'])
 def api_execute():
-    """API для выполнения программы"""
-    data = request.get_json()
+    """
+    API для выполнения программы
+    
+    Поле mode: 'steps' (по умолчанию), 'columns' или 'summary'
+    (см. UVMWeb.execute_program).
+    """
+    data = request_fields()
+    if data is None:
+        return invalid_body()
+    program = data.get('program', '')
+    mode = data.get('mode', 'steps')
+    
+    def compute():
+        with pool.checkout() as uvm:
+            return uvm.execute_program(program, mode)
+    
+    return cached_response('execute', program, compute, mode)
+
+def stream_execution(program, uvm: UVMWeb, cancelled: threading.Event):
+    """
+    Выполнение с потоковой выдачей шагов (NDJSON)
+    
+    Программа выполняется на экземпляре uvm из stream_pool в отдельном
+    потоке, запущенном сразу; каждая строка ответа - шаг, последняя
+    строка - итог {"type": "result", ...}. Очередь между потоками
+    ограничена (обратное давление). Событие cancelled (отключение
+    клиента или закрытие ответа) прерывает выполнение; по завершении
+    экземпляр возвращается в stream_pool.
+    """
+    batches = queue.Queue(maxsize=4)
+    
+    def worker():
+        try:
+            stream = UVMStepStream(uvm.interpreter, uvm.mnemonics, batches, cancelled)
+            try:
+                result = {'type': 'result', 'success': True, **uvm.run(program, stream)}
+            except Exception as e:
+                result = {'type': 'result', 'success': False, 'error': str(e)}
+            stream.flush()
+            stream.put(result)
+        finally:
+            stream_pool.release(uvm)
+    
+    def lines():
+        try:
+            while True:
+                item = batches.get()
+                if isinstance(item, dict):
+                    yield json.dumps(item, ensure_ascii=False) + '\n'
+                    return
+                yield ''.join(json.dumps(step, ensure_ascii=False) + '\n' for step in item)
+        finally:
+            cancelled.set()
+    
+    threading.Thread(target=worker, daemon=True).start()
+    return lines()
+
+@app.route('/api/execute/stream', methods=['POST'])
+def api_execute_stream():
+    """
+    API для выполнения программы с потоковой выдачей шагов (NDJSON)
+    
+    Потоки выполняются на отдельном пуле stream_pool: медленный клиент
+    занимает экземпляр, пока не прочитает ответ, и не должен занимать
+    экземпляры остальных запросов. Экземпляр берется до начала ответа,
+    поэтому при занятом пуле запрос получает 503.
+    """
+    data = request_fields()
+    if data is None:
+        return invalid_body()
+    program = data.get('program', '')
+    
+    uvm = stream_pool.acquire()
+    cancelled = threading.Event()
+    response = app.response_class(stream_execution(program, uvm, cancelled),
+                                  mimetype='application/x-ndjson')
+    # Ответ, закрытый без чтения, тоже освобождает экземпляр
+    response.call_on_close(cancelled.set)
+    return response
+
+@app.route('/api/memory', methods=['POST'])
+def api_memory():
+    """
+    API запроса памяти после выполнения программы
+    
+    Поля: program, ranges ([[начало, конец], ...], по умолчанию - вся память),
+    since_step (только ячейки, измененные после шага), offset, limit.
+    """
+    data = request_fields()
+    if data is None:
+        return invalid_body()
     program = data.get('program', '')
+    ranges = data.get('ranges')
+    since_step = data.get('since_step')
+    offset = data.get('offset', 0)
+    limit = data.get('limit', UVMWeb.MEMORY_PAGE)
+    
+    def compute():
+        with pool.checkout() as uvm:
+            try:
+                state = uvm.run(program, track_writes=True)
+                result = uvm.query_memory(ranges, since_step, offset, limit)
+            except Exception as e:
+                return {'success': False, 'error': str(e)}
+        return {'success': True, 'final_acc': state['final_acc'], **result}
+    
+    return cached_response('memory', program, compute, ranges, since_step, offset, limit)
+
+@app.route('/api/programs', methods=['POST'])
+def api_program_register():
+    """
+    API регистрации программы
+    
+    Тело запроса: JSON с полем program (JSON текст программы), бинарный
+    файл (application/octet-stream) или форма с файлом file (.bin/.uvo
+    или JSON). Возвращает идентификатор программы для /api/programs/<id>/execute.
+    """
+    refused = process_local("Регистрация программ через API",
+                            "загрузите программы при запуске: --preload")
+    if refused:
+        return refused
+    
+    # Формат определяется по типу тела и имени файла: первый байт
+    # бинарной программы может совпадать с '{'
+    upload = request.files.get('file')
+    if upload is not None:
+        source = upload.read()
+        binary = not (upload.filename or '').lower().endswith('.json')
+    elif request.mimetype == 'application/octet-stream':
+        source, binary = request.get_data(), True
+    else:
+        data = request_fields()
+        if data is None:
+            return invalid_body()
+        source, binary = data.get('program', ''), False
+    
+    try:
+        if binary:
+            instructions, segments = UVMWeb.decode_binary(source)
+        else:
+            with pool.checkout() as uvm:
+                instructions, segments = uvm.decode(source), []
+    except UVMPoolBusy:
+        raise
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    program_id = programs.register(instructions, segments)
+    return jsonify({'success': True, 'id': program_id, 'commands': len(instructions),
+                    'segments': len(segments)}), 201
+
+@app.route('/api/programs/<program_id>', methods=['GET'])
+def api_program_info(program_id):
+    """API описания зарегистрированной программы"""
+    program = programs.get(program_id)
+    if program is None:
+        return jsonify({'success': False, 'error': f"Программа {program_id} не найдена"}), 404
+    instructions, segments = program
+    return jsonify({'success': True, 'id': program_id, 'commands': len(instructions),
+                    'segments': [[base, len(values)] for base, values in segments]})
+
+@app.route('/api/programs/<program_id>', methods=['DELETE'])
+def api_program_remove(program_id):
+    """API удаления программы из реестра"""
+    refused = process_local("Удаление программ через API", "реестр задается --preload")
+    if refused:
+        return refused
+    if not programs.remove(program_id):
+        return jsonify({'success': False, 'error': f"Программа {program_id} не найдена"}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/programs/<program_id>/execute', methods=['POST'])
+def api_program_execute(program_id):
+    """
+    API выполнения зарегистрированной программы
+    
+    Поля: memory (начальная память {адрес: значение} поверх сегментов
+    программы), batch (список начальных памятей - программа выполняется
+    для каждой, результаты в поле results), mode (по умолчанию 'summary').
+    """
+    program = programs.get(program_id)
+    if program is None:
+        return jsonify({'success': False, 'error': f"Программа {program_id} не найдена"}), 404
+    instructions, segments = program
+    
+    data = request_fields()
+    if data is None:
+        return invalid_body()
+    mode = data.get('mode', 'summary')
+    batch = data.get('batch')
+    try:
+        if batch is None:
+            memories = [UVMWeb.init_segments(data.get('memory', {}))]
+        elif isinstance(batch, list):
+            if len(batch) > MAX_BATCH:
+                raise ValueError(f"В пакете {len(batch)} начальных памятей, "
+                                 f"наибольшее число - {MAX_BATCH}")
+            memories = [UVMWeb.init_segments(memory) for memory in batch]
+        else:
+            raise ValueError("Поле batch задается списком начальных памятей")
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    with pool.checkout() as uvm:
+        results = []
+        for memory in memories:
+            results.append(uvm.execute_instructions(instructions, segments + memory, mode))
+    
+    if batch is None:
+        return jsonify(results[0])
+    return jsonify({'success': all(result['success'] for result in results),
+                    'results': results})
+
+def prepare_batch(jobs, mode) -> list:
+    """
+    Задания пакета в виде (команды, сегменты, режим ответа)
     
-    result = uvm.execute_program(program)
-    return jsonify(result)
+    Программа, встречающаяся в нескольких заданиях, ассемблируется один
+    раз. Вместо некорректного задания в списке остается ответ с ошибкой.
+    """
+    decoded = {}
+    prepared = []
+    with pool.checkout() as uvm:
+        for job in jobs:
+            try:
+                if not isinstance(job, dict):
+                    raise ValueError("Задание пакета задается объектом")
+                if 'id' in job:
+                    program = programs.get(job['id'])
+                    if program is None:
+                        raise ValueError(f"Программа {job['id']} не найдена")
+                    instructions, segments = program
+                else:
+                    source = job.get('program', '')
+                    if not isinstance(source, str):
+                        raise ValueError("Поле program задается JSON текстом программы")
+                    if source not in decoded:
+                        try:
+                            decoded[source] = uvm.decode(source)
+                        except Exception as e:
+                            decoded[source] = e
+                    if isinstance(decoded[source], Exception):
+                        raise decoded[source]
+                    instructions, segments = decoded[source], []
+                memory = UVMWeb.init_segments(job.get('memory', {}))
+                prepared.append((instructions, segments + memory, job.get('mode', mode)))
+            except Exception as e:
+                prepared.append({'success': False, 'error': str(e)})
+    return prepared
+
+def execute_job(job) -> dict:
+    """Выполнение подготовленного задания на экземпляре из пула"""
+    if isinstance(job, dict):
+        return job
+    instructions, segments, mode = job
+    with pool.checkout() as uvm:
+        return uvm.execute_instructions(instructions, segments, mode)
+
+def stream_batch(prepared):
+    """
+    Потоковая выдача результатов пакета (NDJSON) по мере выполнения
+    
+    Каждая строка - результат задания с его номером {"type": "job",
+    "job": i, ...}, последняя - {"type": "done", ...}. Отключение клиента
+    отменяет еще не начатые задания.
+    """
+    futures = {executor.submit(execute_job, job): index for index, job in enumerate(prepared)}
+    success = True
+    try:
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except UVMPoolBusy as e:
+                # Ответ уже начат, поэтому ошибка передается в строке задания
+                result = {'success': False, 'error': str(e)}
+            success = success and result['success']
+            yield json.dumps({'type': 'job', 'job': futures[future], **result},
+                             ensure_ascii=False) + '\n'
+        yield json.dumps({'type': 'done', 'success': success, 'jobs': len(prepared)}) + '\n'
+    finally:
+        for future in futures:
+            future.cancel()
+
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    """
+    API пакетного выполнения
+    
+    Поле jobs - список заданий {program или id, memory, mode}; задания
+    выполняются параллельно на экземплярах пула. Поле mode задает режим
+    ответа по умолчанию ('summary'). Результаты возвращаются списком
+    results в порядке заданий или, со stream: true, потоком NDJSON по
+    мере выполнения.
+    """
+    data = request_fields()
+    if data is None:
+        return invalid_body()
+    jobs = data.get('jobs')
+    if not isinstance(jobs, list):
+        return jsonify({'success': False, 'error': "Поле jobs задается списком заданий"}), 400
+    if len(jobs) > MAX_BATCH:
+        return jsonify({'success': False,
+                        'error': f"В пакете {len(jobs)} заданий, наибольшее число - {MAX_BATCH}"}), 400
+    
+    prepared = prepare_batch(jobs, data.get('mode', 'summary'))
+    if data.get('stream'):
+        return app.response_class(stream_batch(prepared), mimetype='application/x-ndjson')
+    
+    results = list(executor.map(execute_job, prepared))
+    return jsonify({'success': all(result['success'] for result in results),
+                    'results': results})
+
+@app.route('/api/session', methods=['POST'])
+def api_session_create():
+    """API открытия сеанса пошагового выполнения (поле program)"""
+    refused = process_local("Открытие сеансов", "сеансам нужен --workers 1")
+    if refused:
+        return refused
+    data = request_fields()
+    if data is None:
+        return invalid_body()
+    try:
+        session_id = sessions.create(data.get('program', ''))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if session_id is None:
+        return jsonify({'success': False,
+                        'error': f"Открыто наибольшее число сеансов ({sessions.max_sessions})"}), 429
+    
+    session = sessions.get(session_id)
+    return jsonify({'success': True, 'session': session_id, 'commands': session.commands,
+                    'idle_timeout': sessions.idle_timeout, **session.state()}), 201
+
+def session_request(session_id, handler):
+    """Выполнение handler(session) под блокировкой сеанса; 404 для неизвестного сеанса"""
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({'success': False, 'error': f"Сеанс {session_id} не найден"}), 404
+    with session.lock:
+        # Сеанс мог быть закрыт, пока запрос ждал блокировку
+        if session.closed:
+            return jsonify({'success': False, 'error': f"Сеанс {session_id} закрыт"}), 404
+        try:
+            result = {**handler(session), **session.state()}
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return jsonify({'success': True, **result})
+
+@app.route('/api/session/<session_id>', methods=['GET'])
+def api_session_state(session_id):
+    """API состояния сеанса: ACC, выполнено шагов, позиция, завершено ли выполнение"""
+    return session_request(session_id, lambda session: {})
+
+@app.route('/api/session/<session_id>/step', methods=['POST'])
+def api_session_step(session_id):
+    """
+    API выполнения следующих команд сеанса
+    
+    Поля: count (число команд, по умолчанию 1), mode ('steps' по умолчанию,
+    'columns' или 'summary' - как у /api/execute).
+    """
+    data = request_fields()
+    if data is None:
+        return invalid_body()
+    count = data.get('count', 1)
+    mode = data.get('mode', 'steps')
+    
+    def handler(session):
+        if not (isinstance(count, int) and count > 0):
+            raise ValueError(f"Некорректное число команд {count!r}")
+        return run_session(session, count, mode)
+    
+    return session_request(session_id, handler)
+
+@app.route('/api/session/<session_id>/run', methods=['POST'])
+def api_session_run(session_id):
+    """
+    API выполнения сеанса до конца: итоговые ACC и память, как у /api/execute
+    (поле mode, по умолчанию 'summary')
+    """
+    data = request_fields()
+    if data is None:
+        return invalid_body()
+    mode = data.get('mode', 'summary')
+    
+    def handler(session):
+        result = run_session(session, None, mode)
+        return {**result, 'final_acc': session.vm.acc, 'memory_dump': session.vm.memory_dump()}
+    
+    return session_request(session_id, handler)
+
+def run_session(session, count, mode):
+    """Выполнение команд сеанса с записью шагов в виде mode"""
+    vm = session.vm
+    observer = vm.observer(mode)
+    executed = vm.step(count, observer)
+    return {'executed': executed, **vm.observed(mode, observer)}
+
+@app.route('/api/session/<session_id>/memory', methods=['POST'])
+def api_session_memory(session_id):
+    """API запроса памяти сеанса (поля как у /api/memory, без program)"""
+    data = request_fields()
+    if data is None:
+        return invalid_body()
+    return session_request(session_id, lambda session: session.vm.query_memory(
+        data.get('ranges'), data.get('since_step'), data.get('offset', 0),
+        data.get('limit', UVMWeb.MEMORY_PAGE)))
+
+@app.route('/api/session/<session_id>', methods=['DELETE'])
+def api_session_close(session_id):
+    """API закрытия сеанса"""
+    if not sessions.close(session_id):
+        return jsonify({'success': False, 'error': f"Сеанс {session_id} не найден"}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/cache', methods=['GET'])
+def api_cache():
+    """API статистики кэша ответов"""
+    return jsonify(cache.stats())
 
 @app.route('/api/reset', methods=['POST'])
 def api_reset():
-    """API для сброса состояния"""
-    uvm.reset()
+    """API для сброса состояния (экземпляры пула сбрасываются после каждого запроса)"""
     return jsonify({'success': True, 'message': 'Состояние сброшено'})
 
 @app.route('/api/example', methods=['GET'])
@@ -244,5 +1419,88 @@ def api_example():
     }
     return jsonify(example)
 
+def preload(paths=()) -> dict:
+    """
+    Подготовка приложения перед созданием рабочих процессов
+    
+    Компилирует шаблоны и регистрирует программы из файлов (JSON или
+    бинарных), чтобы они были общими для всех процессов.
+    
+    Returns:
+        Словарь {файл: идентификатор программы}
+    """
+    app.jinja_env.get_template('index.html')
+    registered = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.lower().endswith('.json'):
+            with pool.checkout() as uvm:
+                instructions, segments = uvm.decode(data), []
+        else:
+            instructions, segments = UVMWeb.decode_binary(data)
+        registered[path] = programs.register(instructions, segments)
+        print(f"Программа {path}: {registered[path]} ({len(instructions)} команд)")
+    return registered
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Web интерфейс УВМ',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры использования:
+  Разработка:   python uvm_web.py
+  Промышленный: python uvm_web.py --mode production --workers 4 --preload program.bin
+        """
+    )
+    parser.add_argument('--mode', choices=('dev', 'production'), default='dev',
+                       help='dev - сервер разработки Flask с отладчиком, '
+                            'production - prefork сервер (gunicorn, если установлен)')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес (по умолчанию 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=5000, help='Порт (по умолчанию 5000)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Рабочих процессов (по умолчанию - число ядер)')
+    parser.add_argument('--threads', type=int, default=pool.size,
+                       help=f'Потоков в процессе (по умолчанию {pool.size} - размер пула УВМ)')
+    parser.add_argument('--timeout', type=float, default=30.0,
+                       help='Таймаут соединения, секунд (по умолчанию 30)')
+    parser.add_argument('--max-request-size', type=int, default=16 << 20, metavar='BYTES',
+                       help='Наибольший размер тела запроса (по умолчанию 16 МБ)')
+    parser.add_argument('--max-sessions', type=int, default=sessions.max_sessions,
+                       help='Наибольшее число сеансов в процессе')
+    parser.add_argument('--session-timeout', type=float, default=sessions.idle_timeout,
+                       help='Время простоя сеанса до закрытия, секунд')
+    parser.add_argument('--preload', nargs='+', default=[], metavar='PROGRAM',
+                       help='Зарегистрировать программы до запуска рабочих процессов')
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'wsgiref'), default='auto',
+                       help='Prefork сервер режима production')
+    parser.add_argument('--access-log', action='store_true', help='Журнал запросов')
+    
+    args = parser.parse_args()
+    
+    app.config['MAX_CONTENT_LENGTH'] = args.max_request_size
+    sessions.max_sessions = args.max_sessions
+    sessions.idle_timeout = args.session_timeout
+    
+    if args.mode == 'dev':
+        preload(args.preload)
+        app.run(debug=True, host=args.host, port=args.port)
+        return
+    
+    from uvm_server import UVMServerConfig, serve
+    config = UVMServerConfig(args.host, args.port, args.workers, args.threads,
+                             args.timeout, args.server, args.access_log)
+    # Без fork запросы обрабатывает один процесс
+    app.config['UVM_WORKERS'] = config.workers if hasattr(os, 'fork') else 1
+    if app.config['UVM_WORKERS'] > 1:
+        print(f"⚠ Предупреждение: {config.workers} рабочих процессов - сеансы и регистрация "
+              f"программ через API отключены (ответ 409); программы загружаются --preload, "
+              f"для сеансов запустите с --workers 1", file=sys.stderr)
+    try:
+        serve(app, config, lambda: preload(args.preload))
+    except (OSError, ValueError) as e:
+        print(f"❌ Ошибка запуска сервера: {e}", file=sys.stderr)
+        sys.exit(1)
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    main()